@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Generate synthetic benchmark fixtures for every supported format
+
+Each format is written for the scenarios that make sense for it:
+    tall          - many rows / elements
+    wide          - many columns / a wide 2-D array
+    nested        - deeply nested structures (dicts, groups, structs)
+    many_members  - many arrays/datasets/variables in one file
+    complex_nan   - complex numbers and NaN/Infinity values
+
+Usage: python benchmarks/generate_fixtures.py [--scale small|medium|large] [--out DIR]
+"""
+
+import os
+import sys
+import json
+import pickle
+import argparse
+
+import numpy as np
+
+SCALES = {'small': 1, 'medium': 10, 'large': 100}
+SCENARIOS = ('tall', 'wide', 'nested', 'many_members', 'complex_nan')
+FORMATS = ('pkl', 'joblib', 'msgpack', 'npy', 'npz', 'h5', 'nc', 'mat', 'parquet', 'feather', 'arrow', 'avro')
+
+rng = np.random.default_rng(42)
+
+
+def nan_heavy(n):
+    values = rng.standard_normal(n)
+    values[rng.random(n) < 0.3] = np.nan
+    values[rng.random(n) < 0.01] = np.inf
+    values[rng.random(n) < 0.01] = -np.inf
+    return values
+
+
+def nested_dict(depth, plain=False):
+    node = {"leaf": list(range(5)) if plain else np.arange(5)}
+    for level in range(depth):
+        node = {"level": level, "name": f"node_{level}", "child": node, "siblings": [level] * 3}
+    return node
+
+
+# --- Builders -------------------------------------------------------------
+
+def build_object(scenario, scale, plain=False):
+    """Python object for pickle/joblib/msgpack; plain=True avoids numpy (msgpack)"""
+    if scenario == 'tall':
+        return [{"id": i, "value": float(i) * 0.5, "label": f"row_{i}"} for i in range(100000 * scale)]
+    if scenario == 'wide':
+        return {f"key_{i}": i for i in range(10000 * scale)}
+    if scenario == 'nested':
+        return nested_dict(50, plain)
+    if scenario == 'many_members':
+        if plain:
+            return {f"array_{i}": list(range(100)) for i in range(1000 * scale)}
+        return {f"array_{i}": rng.standard_normal(100) for i in range(1000 * scale)}
+    if scenario == 'complex_nan':
+        values = nan_heavy(10000 * scale)
+        if plain:
+            return values.tolist()
+        with np.errstate(invalid='ignore'):
+            complex_values = values + 1j * values[::-1]
+        return {"floats": values.tolist(), "complex": complex_values.tolist(), "array": values}
+    return None
+
+
+def build_array(scenario, scale):
+    if scenario == 'tall':
+        return rng.standard_normal(1000000 * scale)
+    if scenario == 'wide':
+        return rng.standard_normal((200, 5000 * scale))
+    if scenario == 'complex_nan':
+        real = nan_heavy(250000 * scale)
+        return (real + 1j * rng.standard_normal(real.size)).reshape(-1, 500)
+    return None
+
+
+def build_arrays(scenario, scale):
+    """Mapping of name -> array for multi-member formats"""
+    if scenario == 'many_members':
+        return {f"array_{i}": rng.standard_normal((20, 20)) for i in range(500 * scale)}
+    array = build_array(scenario, scale)
+    return None if array is None else {"data": array}
+
+
+def build_table(scenario, scale):
+    import pandas as pd
+    if scenario == 'tall':
+        n = 100000 * scale
+        return pd.DataFrame({
+            "id": np.arange(n),
+            "value": rng.standard_normal(n),
+            "label": [f"row_{i}" for i in range(n)],
+            "flag": rng.random(n) < 0.5,
+            "timestamp": pd.date_range('2020-01-01', periods=n, freq='s')
+        })
+    if scenario == 'wide':
+        return pd.DataFrame(rng.standard_normal((200, 500 * scale)), columns=[f"col_{i}" for i in range(500 * scale)])
+    if scenario == 'nested':
+        n = 10000 * scale
+        return pd.DataFrame({
+            "id": np.arange(n),
+            "tags": [[f"t{i % 7}", f"t{i % 11}"] for i in range(n)],
+            "point": [{"x": float(i), "y": {"z": i % 5, "w": [i, i + 1]}} for i in range(n)]
+        })
+    if scenario == 'complex_nan':
+        n = 100000 * scale
+        return pd.DataFrame({"a": nan_heavy(n), "b": nan_heavy(n)})
+    return None
+
+
+# --- Writers --------------------------------------------------------------
+
+def write_pkl(path, scenario, scale):
+    obj = build_object(scenario, scale)
+    if obj is None:
+        return False
+    with open(path, 'wb') as f:
+        pickle.dump(obj, f)
+    return True
+
+
+def write_joblib(path, scenario, scale):
+    import joblib
+    obj = build_object(scenario, scale)
+    if obj is None:
+        return False
+    joblib.dump(obj, path)
+    return True
+
+
+def write_msgpack(path, scenario, scale):
+    import msgpack
+    obj = build_object(scenario, scale, plain=True)
+    if obj is None:
+        return False
+    with open(path, 'wb') as f:
+        f.write(msgpack.packb(obj))
+    return True
+
+
+def write_npy(path, scenario, scale):
+    array = build_array(scenario, scale)
+    if array is None:
+        return False
+    np.save(path, array)
+    return True
+
+
+def write_npz(path, scenario, scale):
+    arrays = build_arrays(scenario, scale)
+    if arrays is None:
+        return False
+    np.savez(path, **arrays)
+    return True
+
+
+def write_h5(path, scenario, scale):
+    import h5py
+    with h5py.File(path, 'w') as f:
+        if scenario == 'nested':
+            group = f
+            for level in range(30):
+                group = group.create_group(f"level_{level}")
+                group.attrs["depth"] = level
+                group["values"] = np.arange(10)
+            return True
+        arrays = build_arrays(scenario, scale)
+        if arrays is None:
+            return False
+        for name, array in arrays.items():
+            f.create_dataset(name, data=array, chunks=True, compression='gzip')
+    return True
+
+
+def write_nc(path, scenario, scale):
+    from netCDF4 import Dataset
+    arrays = build_arrays(scenario, scale)
+    if arrays is None:
+        return False
+    with Dataset(path, 'w') as nc:
+        for name, array in arrays.items():
+            if np.iscomplexobj(array):
+                # NetCDF has no native complex type; keep the NaN-heavy real part
+                array = array.real
+            dims = []
+            for axis, size in enumerate(array.shape):
+                dim = f"{name}_dim{axis}"
+                nc.createDimension(dim, size)
+                dims.append(dim)
+            var = nc.createVariable(name, array.dtype, dims)
+            var[:] = array
+    return True
+
+
+def write_mat(path, scenario, scale):
+    from scipy.io import savemat
+    if scenario == 'nested':
+        savemat(path, {"root": nested_dict(20)})
+        return True
+    arrays = build_arrays(scenario, scale)
+    if arrays is None:
+        return False
+    savemat(path, arrays)
+    return True
+
+
+def write_parquet(path, scenario, scale):
+    df = build_table(scenario, scale)
+    if df is None:
+        return False
+    df.to_parquet(path)
+    return True
+
+
+def write_feather(path, scenario, scale):
+    df = build_table(scenario, scale)
+    if df is None:
+        return False
+    df.to_feather(path)
+    return True
+
+
+def write_arrow(path, scenario, scale):
+    import pyarrow as pa
+    df = build_table(scenario, scale)
+    if df is None:
+        return False
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table, max_chunksize=65536)
+    return True
+
+
+def write_avro(path, scenario, scale):
+    from avro.datafile import DataFileWriter
+    from avro.io import DatumWriter
+    import avro.schema
+
+    if scenario == 'tall':
+        fields = [{"name": "id", "type": "long"}, {"name": "value", "type": "double"}, {"name": "label", "type": "string"}]
+        records = ({"id": i, "value": i * 0.5, "label": f"row_{i}"} for i in range(100000 * scale))
+    elif scenario == 'wide':
+        fields = [{"name": f"col_{i}", "type": "double"} for i in range(500 * scale)]
+        records = ({f"col_{i}": float(r + i) for i in range(500 * scale)} for r in range(200))
+    elif scenario == 'nested':
+        inner = {"type": "record", "name": "Inner", "fields": [{"name": "z", "type": "long"}, {"name": "w", "type": {"type": "array", "items": "long"}}]}
+        point = {"type": "record", "name": "Point", "fields": [{"name": "x", "type": "double"}, {"name": "y", "type": inner}]}
+        fields = [{"name": "id", "type": "long"}, {"name": "point", "type": point}]
+        records = ({"id": i, "point": {"x": float(i), "y": {"z": i % 5, "w": [i, i + 1]}}} for i in range(10000 * scale))
+    elif scenario == 'complex_nan':
+        fields = [{"name": "a", "type": "double"}]
+        records = ({"a": v} for v in nan_heavy(100000 * scale).tolist())
+    else:
+        return False
+
+    schema = avro.schema.parse(json.dumps({"type": "record", "name": "Row", "fields": fields}))
+    with open(path, 'wb') as f:
+        writer = DataFileWriter(f, DatumWriter(), schema)
+        for record in records:
+            writer.append(record)
+        writer.close()
+    return True
+
+
+WRITERS = {
+    'pkl': write_pkl, 'joblib': write_joblib, 'msgpack': write_msgpack,
+    'npy': write_npy, 'npz': write_npz, 'h5': write_h5, 'nc': write_nc, 'mat': write_mat,
+    'parquet': write_parquet, 'feather': write_feather, 'arrow': write_arrow, 'avro': write_avro
+}
+
+
+def generate(out_dir, scale_name, formats=FORMATS, scenarios=SCENARIOS):
+    scale = SCALES[scale_name]
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for fmt in formats:
+        for scenario in scenarios:
+            path = os.path.join(out_dir, f"{scenario}.{fmt}")
+            try:
+                if WRITERS[fmt](path, scenario, scale):
+                    written.append(path)
+                    print(f"wrote {path} ({os.path.getsize(path):,} bytes)")
+                elif os.path.exists(path):
+                    os.remove(path)
+            except ImportError as e:
+                print(f"skipped {fmt}/{scenario}: {e}", file=sys.stderr)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate benchmark fixtures")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures'))
+    parser.add_argument('--formats', default=','.join(FORMATS))
+    args = parser.parse_args()
+
+    generate(os.path.join(args.out, args.scale), args.scale, formats=args.formats.split(','))
+
+
+if __name__ == "__main__":
+    main()
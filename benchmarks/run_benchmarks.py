@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Run every converter against the benchmark fixtures and record wall time, peak RSS and output size
+
+Usage:
+    python benchmarks/run_benchmarks.py [--scale small] [--repeat 3] [--output report.json]
+    python benchmarks/run_benchmarks.py --baseline baseline.json   # compare and flag regressions
+    python benchmarks/run_benchmarks.py --save-baseline baseline.json
+
+Exits with status 1 when a result regresses beyond --threshold relative to the baseline.
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import argparse
+import platform
+import subprocess
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'python')
+
+CONVERTERS = {
+    '.pkl': 'convert_pkl.py',
+    '.joblib': 'convert_joblib.py',
+    '.msgpack': 'convert_msgpack.py',
+    '.npy': 'convert_npy.py',
+    '.npz': 'convert_npy.py',
+    '.h5': 'convert_h5.py',
+    '.nc': 'convert_netcdf.py',
+    '.mat': 'convert_mat.py',
+    '.parquet': 'convert_parquet.py',
+    '.feather': 'convert_feather.py',
+    '.arrow': 'convert_arrow.py',
+    '.avro': 'convert_avro.py'
+}
+
+METRICS = ('wall_seconds', 'peak_rss_bytes', 'output_bytes')
+
+
+def run_once(script, fixture, timeout):
+    """Run one conversion; return wall time, peak RSS of the child and stdout size"""
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, script, fixture], stdout=stdout, stderr=stderr)
+        peak_rss = None
+        if hasattr(os, 'wait4'):
+            # wait4 reports the child's own resource usage, unlike getrusage(RUSAGE_CHILDREN)
+            # which accumulates the maximum over every child this process has reaped
+            deadline = start + timeout
+            while True:
+                pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+                if pid:
+                    break
+                if time.perf_counter() > deadline:
+                    process.kill()
+                    pid, status, usage = os.wait4(process.pid, 0)
+                    break
+                time.sleep(0.005)
+            wall = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is kilobytes on Linux and bytes on macOS
+            peak_rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+        else:
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            wall = time.perf_counter() - start
+
+        output_bytes = stdout.tell()
+        stderr.seek(0)
+        error = stderr.read().decode('utf-8', errors='replace')[-2000:] if process.returncode else None
+
+    return {
+        "wall_seconds": wall,
+        "peak_rss_bytes": peak_rss,
+        "output_bytes": output_bytes,
+        "exit_code": process.returncode,
+        "error": error
+    }
+
+
+def run_benchmarks(fixture_dir, repeat, timeout, only=None):
+    results = {}
+    for fixture in sorted(glob.glob(os.path.join(fixture_dir, '*'))):
+        name, ext = os.path.splitext(os.path.basename(fixture))
+        script = CONVERTERS.get(ext)
+        if script is None:
+            continue
+        key = f"{ext[1:]}/{name}"
+        if only and not any(pattern in key for pattern in only):
+            continue
+
+        runs = [run_once(os.path.join(PYTHON_DIR, script), fixture, timeout) for _ in range(repeat)]
+        ok_runs = [r for r in runs if r["exit_code"] == 0]
+        best = ok_runs or runs
+        results[key] = {
+            "fixture_bytes": os.path.getsize(fixture),
+            # Minimum wall time is the least noisy estimate; RSS and output size are deterministic-ish
+            "wall_seconds": min(r["wall_seconds"] for r in best),
+            "peak_rss_bytes": max((r["peak_rss_bytes"] or 0) for r in best) or None,
+            "output_bytes": max(r["output_bytes"] for r in best),
+            "runs": len(runs),
+            "failures": len(runs) - len(ok_runs),
+            "error": None if ok_runs else runs[-1]["error"]
+        }
+        status = "FAILED" if not ok_runs else f"{results[key]['wall_seconds']:.3f}s"
+        print(f"{key:32s} {status}", file=sys.stderr)
+    return results
+
+
+def compare(report, baseline, threshold):
+    """Print a comparison table; return the list of regressed keys"""
+    regressions = []
+    print(f"{'benchmark':32s} " + " ".join(f"{m:>22s}" for m in METRICS))
+    for key in sorted(report["results"]):
+        current = report["results"][key]
+        previous = baseline["results"].get(key)
+        if previous is None:
+            print(f"{key:32s} {'(not in baseline)':>22s}")
+            continue
+        cells, regressed = [], False
+        for metric in METRICS:
+            new, old = current.get(metric), previous.get(metric)
+            if not new or not old:
+                cells.append(f"{'-':>22s}")
+                continue
+            ratio = new / old
+            if ratio > threshold:
+                regressed = True
+            cells.append(f"{ratio:>20.2f}x{'!' if ratio > threshold else ' '}")
+        if current.get("failures") and not previous.get("failures"):
+            regressed = True
+        if regressed:
+            regressions.append(key)
+        print(f"{key:32s} " + " ".join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the converters")
+    parser.add_argument('--scale', default='small')
+    parser.add_argument('--fixtures', default=None, help="Fixture directory (default: benchmarks/fixtures/<scale>)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--only', default='', help="Comma-separated substrings of benchmark keys to run")
+    parser.add_argument('--output', default=None, help="Write the JSON report here")
+    parser.add_argument('--baseline', default=None, help="Compare against a saved report")
+    parser.add_argument('--save-baseline', default=None, help="Also write the report as a baseline")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Ratio above which a metric counts as a regression")
+    args = parser.parse_args()
+
+    fixture_dir = args.fixtures or os.path.join(BENCH_DIR, 'fixtures', args.scale)
+    if not os.path.isdir(fixture_dir):
+        print(f"No fixtures in {fixture_dir}. Run: python benchmarks/generate_fixtures.py --scale {args.scale}", file=sys.stderr)
+        sys.exit(2)
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "repeat": args.repeat
+        },
+        "results": run_benchmarks(fixture_dir, args.repeat, args.timeout, [o for o in args.only.split(',') if o])
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+    elif not args.output and not args.save_baseline:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Compact encoding of numeric arrays in converter output
+
+Numeric arrays are emitted as {"_buffer": <base64 of the little-endian bytes>,
+"dtype": ..., "shape": [...]} instead of nested JSON lists. A float64 takes
+about 11 characters instead of about 20, no element is formatted in Python or
+parsed in the extension, and NaN and Infinity are kept exactly. The webview
+wraps the bytes in the matching typed array (see src/utils/TypedBuffers.ts).
+Complex arrays are stored as interleaved real/imaginary parts.
+
+Arrays without a typed-array equivalent (strings, objects, records, dates) and
+masked arrays with masked elements still become lists.
+"""
+
+import base64
+import numpy as np
+
+# numpy dtype kind + itemsize -> dtype name the webview understands; floats
+# without a typed array (half, long double) are widened
+TYPED_DTYPES = {
+    'b1': 'bool',
+    'i1': 'int8', 'i2': 'int16', 'i4': 'int32', 'i8': 'int64',
+    'u1': 'uint8', 'u2': 'uint16', 'u4': 'uint32', 'u8': 'uint64',
+    'f2': 'float32', 'f4': 'float32', 'f8': 'float64', 'f12': 'float64', 'f16': 'float64',
+    'c8': 'complex64', 'c16': 'complex128', 'c24': 'complex128', 'c32': 'complex128'
+}
+
+
+def encode_array(arr):
+    """Return the compact encoding of a numeric array, or None if it has to stay a list"""
+    if np.ma.isMaskedArray(arr):
+        if np.ma.getmaskarray(arr).any():
+            return None  # tolist() turns masked elements into null
+        arr = arr.data
+    arr = np.asarray(arr)
+    name = TYPED_DTYPES.get(f"{arr.dtype.kind}{arr.dtype.itemsize}")
+    if name is None:
+        return None
+    data = np.ascontiguousarray(arr, dtype=np.dtype(name).newbyteorder('<'))
+    return {
+        "_buffer": base64.b64encode(data.tobytes()).decode('ascii'),
+        "dtype": name,
+        "shape": list(arr.shape)
+    }
+
+
+def array_values(arr):
+    """The JSON value for an array's elements: the compact encoding, or a nested list"""
+    encoded = encode_array(arr)
+    return encoded if encoded is not None else arr.tolist()
+
+
+def encoded_bytes(dtype):
+    """Output bytes per element of an encoded array of this dtype, or None if it would be a list"""
+    name = TYPED_DTYPES.get(f"{dtype.kind}{dtype.itemsize}")
+    return np.dtype(name).itemsize * 4 / 3 if name is not None else None
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Check which modules are importable without importing them
+
+Uses importlib.util.find_spec, which only locates a module, so checking the
+whole dependency list takes milliseconds instead of the seconds it takes to
+import numpy, pandas, pyarrow and friends.
+
+The result is written to a manifest stamped with the interpreter and the
+modification times of its site-packages directories. Installing or removing
+a package changes those times, so the extension can trust the manifest
+without starting Python as long as the stamp still matches. Results for
+other modules (checked when another format was opened) are kept while the
+stamp is unchanged.
+"""
+
+import os
+import sys
+import json
+import site
+import argparse
+import importlib.util
+
+
+def environment_stamp():
+    paths = {}
+    for directory in site.getsitepackages():
+        try:
+            paths[directory] = str(os.stat(directory).st_mtime_ns)
+        except OSError:
+            continue
+    return {
+        "executable": sys.executable,
+        "version": sys.version,
+        "site_packages": paths
+    }
+
+
+def module_available(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check which modules are installed")
+    parser.add_argument('modules', nargs='*')
+    parser.add_argument('--manifest', default=None, help="Write the result and environment stamp here")
+    args = parser.parse_args()
+
+    modules = {name: module_available(name) for name in args.modules}
+    missing = [name for name, found in modules.items() if not found]
+
+    if args.manifest:
+        stamp = environment_stamp()
+        known = {}
+        try:
+            with open(args.manifest) as f:
+                previous = json.load(f)
+            if previous.get("stamp") == stamp:
+                known = previous.get("modules", {})
+        except (OSError, ValueError):
+            pass
+        known.update(modules)
+        tmp_path = args.manifest + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"stamp": stamp, "modules": known}, f)
+        os.replace(tmp_path, args.manifest)
+
+    print(json.dumps({"missing": missing}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Compressed single-file inputs (.pkl.gz, .npy.zst, .msgpack.xz, .joblib.bz2, ...)
+
+The wrapper is recognised by its magic bytes, not the file name, and is
+decompressed as a stream: converters read it like a file opened with 'rb',
+nothing is written to disk, and reading stops as soon as the converter has
+what it needs (a .npy preview only decompresses the header and the leading
+elements). Such streams read forwards only.
+
+gzip is decoded on several cores by rapidgzip when it is installed; zstd
+needs the zstandard package and lz4 the lz4 package.
+"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import struct
+
+# Leading bytes of each wrapper
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'\x04\x22\x4d\x18', 'lz4'),
+)
+SUFFIXES = ('.gz', '.bz2', '.xz', '.zst', '.lz4')
+# Rough decompressed size relative to the file when the wrapper does not record it
+COMPRESSION_RATIO = 4
+DECODE_THREADS = os.cpu_count() or 1
+
+
+def detect(file_path):
+    """The codec wrapping the file ('gzip', 'bz2', 'xz', 'zstd', 'lz4'), or None"""
+    with open(file_path, 'rb') as f:
+        head = f.read(6)
+    for magic, codec in MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def inner_extension(file_path):
+    """Extension of the wrapped file: '.npy' for data.npy.zst"""
+    root, ext = os.path.splitext(file_path)
+    if ext.lower() in SUFFIXES:
+        ext = os.path.splitext(root)[1]
+    return ext.lower()
+
+
+def open_stream(file_path, codec):
+    """Binary file object with the decompressed contents"""
+    if codec == 'gzip':
+        try:
+            import rapidgzip
+            stream = rapidgzip.open(file_path, parallelization=DECODE_THREADS)
+        except ImportError:
+            stream = gzip.open(file_path, 'rb')
+    elif codec == 'bz2':
+        stream = bz2.open(file_path, 'rb')
+    elif codec == 'xz':
+        stream = lzma.open(file_path, 'rb')
+    elif codec == 'zstd':
+        import zstandard
+        stream = zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), read_across_frames=True)
+    elif codec == 'lz4':
+        import lz4.frame
+        stream = lz4.frame.open(file_path, 'rb')
+    else:
+        raise ValueError(f"Unknown compression: {codec}")
+    # Buffered for readline() and peek(), which pickle and msgpack use
+    return stream if hasattr(stream, 'peek') else io.BufferedReader(stream)
+
+
+def open_input(file_path):
+    """The file's contents, decompressed if it is wrapped"""
+    codec = detect(file_path)
+    return open(file_path, 'rb') if codec is None else open_stream(file_path, codec)
+
+
+def data_size(file_path):
+    """Size of the file's contents after decompression (estimated when the wrapper does not record it)"""
+    file_size = os.path.getsize(file_path)
+    codec = detect(file_path)
+    if codec is None:
+        return file_size
+    with open(file_path, 'rb') as f:
+        if codec == 'gzip' and file_size >= 18:
+            # The trailer holds the size modulo 2^32 (of the last member only)
+            f.seek(-4, os.SEEK_END)
+            size = struct.unpack('<I', f.read(4))[0]
+            if size >= file_size:
+                return size
+        elif codec == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                zstandard = None
+            if zstandard is not None:
+                try:
+                    # Recorded in the frame header unless the writer streamed
+                    size = zstandard.frame_content_size(f.read(18))
+                except zstandard.ZstdError:
+                    size = -1
+                if size > 0:
+                    return size
+    return COMPRESSION_RATIO * file_size
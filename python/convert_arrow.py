@@ -3,6 +3,10 @@
 
 import sys
 import json
+from perf import PerfRecorder, partial
+from memory_budget import MemoryBudget, PANDAS_EXPANSION
+from output_budget import OutputBudget, Sliced, preview, PARTIAL_ROWS
+from sampling import SAMPLE_SEED, sample_record_batches, shown
 import pyarrow as pa
 
 def convert_array(arr, max_elements=1000):
@@ -27,11 +31,15 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
         # Read Arrow IPC file
         with pa.memory_map(file_path, 'r') as source:
             reader = pa.ipc.open_file(source)
+            perf.mark('open')
             
             # Get schema
             schema_dict = {
@@ -41,17 +49,36 @@ def main():
                 ]
             }
             
-            # Read table
-            table = reader.read_all()
+            # Read table, or only the record batches a random sample falls in
+            sampled_rows = None
+            if SAMPLE_SEED is not None:
+                table, sampled_rows, num_rows = sample_record_batches(reader, 1000)
+            else:
+                table = reader.read_all()
+                num_rows = len(table)
+            perf.mark('read')
             
             # Convert to pandas for easier JSON conversion
             try:
                 import pandas as pd
-                df = table.to_pandas()
+                # The memory-mapped table is cheap; converting all of it to pandas may not be
+                estimated_bytes = PANDAS_EXPANSION * table.nbytes
+                if budget.allows(estimated_bytes):
+                    # The first rows first, as converting all of them can take a while
+                    partial(preview({
+                        "file_type": "arrow",
+                        "schema": schema_dict,
+                        "num_rows": num_rows,
+                        "data": table.slice(0, PARTIAL_ROWS).to_pylist()
+                    }))
+                    df = table.to_pandas()
+                else:
+                    df = table.slice(0, 1000).to_pandas()
+                    budget.skip("rows", estimated_bytes, "Converted the first 1000 rows only")
                 
-                if len(df) > 1000:
+                if num_rows > 1000:
                     data_records = df.head(1000).to_dict(orient='records')
-                    note = f"Table truncated. Showing first 1000 of {len(df)} rows"
+                    note = f"Table truncated. Showing {shown(1000)} of {num_rows} rows"
                 else:
                     data_records = df.to_dict(orient='records')
                     note = None
@@ -59,28 +86,36 @@ def main():
                 result = {
                     "file_type": "arrow",
                     "schema": schema_dict,
-                    "num_rows": len(table),
+                    "num_rows": num_rows,
                     "num_columns": len(table.columns),
                     "data": data_records
                 }
                 
                 if note:
                     result["_note"] = note
+                    if sampled_rows is not None:
+                        result["sample_rows"] = sampled_rows
                     
             except ImportError:
                 # Fallback without pandas
                 result = {
                     "file_type": "arrow",
                     "schema": schema_dict,
-                    "num_rows": len(table),
+                    "num_rows": num_rows,
                     "num_columns": len(table.columns),
                     "columns": {
-                        col: convert_array(table[col])
+                        col: Sliced(len(table[col]), lambda n, arr=table[col]: convert_array(arr, n), 'elements')
                         for col in table.column_names
                     }
                 }
         
-        print(json.dumps(result, indent=2, default=str))
+        output = OutputBudget()
+        result = output.fit(result)
+        perf.mark('sanitize')
+        
+        budget.report(result)
+        output.report(result)
+        perf.emit(result, default=str)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load Arrow file: {str(e)}",
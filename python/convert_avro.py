@@ -3,6 +3,52 @@
 
 import sys
 import json
+from perf import PerfRecorder
+from output_budget import OutputBudget
+import os
+from sampling import SAMPLE_SEED, sample_units, shown
+
+def scan_blocks(reader, file_end):
+    """Offsets and record counts of every block, reading only the block headers.
+
+    Scans from the reader's current position and stops in front of a block
+    that is still being written, so the file position ends up after the last
+    complete block.
+    """
+    source = reader.reader
+    blocks = []
+    while source.tell() < file_end:
+        offset = source.tell()
+        try:
+            count = reader.raw_decoder.read_long()
+            size = reader.raw_decoder.read_long()
+        except Exception:  # Header cut short (the error type differs between avro packages)
+            source.seek(offset)
+            break
+        if source.tell() + size + len(reader.sync_marker) > file_end:
+            source.seek(offset)
+            break
+        source.seek(size + len(reader.sync_marker), 1)
+        blocks.append((offset, count))
+    return blocks
+
+def read_sample(reader, file_end, n=1000):
+    """Read n random records, decoding only the blocks they fall in (weighted by record count)"""
+    blocks = scan_blocks(reader, file_end)
+    starts = [sum(count for _, count in blocks[:i]) for i in range(len(blocks))]
+    records = []
+    rows = []
+    for block, offsets in sample_units([count for _, count in blocks], n):
+        # Records inside a block can only be decoded in order
+        reader.reader.seek(blocks[block][0])
+        reader.block_count = 0
+        wanted = set(offsets.tolist())
+        for offset in range(int(offsets[-1]) + 1):
+            record = next(reader)
+            if offset in wanted:
+                records.append(record)
+                rows.append(starts[block] + offset)
+    return records, rows, sum(count for _, count in blocks)
 
 def main():
     if len(sys.argv) != 2:
@@ -10,27 +56,36 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
     
     try:
         from avro.datafile import DataFileReader
         from avro.io import DatumReader
+        perf.mark('imports')
         
         records = []
         with open(file_path, 'rb') as f:
             reader = DataFileReader(f, DatumReader())
+            perf.mark('open')
             
             # Get schema (use get_meta method)
             schema = json.loads(reader.meta.get('avro.schema').decode('utf-8'))
             
             # Read records
-            total_records = 0
-            for i, record in enumerate(reader):
-                if i >= 1000:  # Limit to 1000 records
-                    break
-                records.append(record)
-                total_records = i + 1
+            sampled_rows = None
+            if SAMPLE_SEED is not None:
+                records, sampled_rows, total_records = read_sample(reader, os.path.getsize(file_path))
+            else:
+                total_records = 0
+                for i, record in enumerate(reader):
+                    if i >= 1000:  # Limit to 1000 records
+                        break
+                    records.append(record)
+                    total_records = i + 1
             
             reader.close()
+        perf.mark('read')
         
         result = {
             "file_type": "avro",
@@ -39,10 +94,16 @@ def main():
             "data": records
         }
         
-        if total_records >= 1000:
+        if sampled_rows is not None:
+            if total_records > 1000:
+                result["_note"] = f"Records truncated. Showing {shown(1000)} of {total_records} records"
+                result["sample_rows"] = sampled_rows
+        elif total_records >= 1000:
             result["_note"] = f"Records truncated. Showing first 1000 records"
         
-        print(json.dumps(result, indent=2, default=str))
+        output = OutputBudget()
+        result = output.report(output.fit(result))
+        perf.emit(result, default=str)
     except ImportError:
         print(json.dumps({
             "error": "Missing Python package: avro\n\nInstall with: pip install avro-python3",
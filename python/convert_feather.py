@@ -3,6 +3,42 @@
 
 import sys
 import json
+import os
+from perf import PerfRecorder, partial
+from memory_budget import MemoryBudget, PANDAS_EXPANSION
+from output_budget import OutputBudget, preview, PARTIAL_ROWS
+from sampling import SAMPLE_SEED, sample_positions, sample_record_batches, shown
+
+def read_leading_rows(file_path, max_rows=1000):
+    """Read the first max_rows rows of a Feather v2 file and count the rest batch by batch"""
+    import pyarrow as pa
+    with pa.memory_map(file_path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        batches = []
+        num_rows = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if num_rows < max_rows:
+                batches.append(batch)
+            num_rows += batch.num_rows
+        table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, max_rows)
+        return table.to_pandas(), num_rows
+
+def first_rows(file_path, max_rows=PARTIAL_ROWS):
+    """The first rows of a Feather v2 file as dicts, reading only its first record batch"""
+    import pyarrow as pa
+    with pa.memory_map(file_path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        if reader.num_record_batches == 0:
+            return []
+        return reader.get_batch(0).slice(0, max_rows).to_pylist()
+
+def read_sample(file_path, n=1000):
+    """Read n random rows of a Feather v2 file, keeping one record batch at a time"""
+    import pyarrow as pa
+    with pa.memory_map(file_path, 'r') as source:
+        table, rows, num_rows = sample_record_batches(pa.ipc.open_file(source), n)
+        return table.to_pandas(), rows, num_rows
 
 def main():
     if len(sys.argv) != 2:
@@ -10,17 +46,44 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
         import pandas as pd
+        perf.mark('imports')
         
-        # Read feather file
-        df = pd.read_feather(file_path)
+        # Read feather file. The footer carries no uncompressed sizes, so the estimate is
+        # based on the file size; Feather v1 files cannot be read partially.
+        estimated_bytes = PANDAS_EXPANSION * os.path.getsize(file_path)
+        df = None
+        sampled_rows = None
+        try:
+            if SAMPLE_SEED is not None:
+                df, sampled_rows, num_rows = read_sample(file_path)
+            elif not budget.allows(estimated_bytes):
+                df, num_rows = read_leading_rows(file_path)
+                budget.skip("rows", estimated_bytes, "Read the first 1000 rows only")
+        except Exception:
+            df = None
+        if df is None:
+            # The first rows first, as reading the whole file can take a while
+            try:
+                partial(preview({"file_type": "feather", "data": first_rows(file_path)}))
+            except Exception:
+                pass  # Feather v1 has no record batches to read on their own
+            df = pd.read_feather(file_path)
+            num_rows = len(df)
+            if SAMPLE_SEED is not None:
+                sampled_rows = sample_positions(num_rows, 1000)
+                df = df.iloc[sampled_rows]
+        perf.mark('read')
         
         # Convert to JSON
-        if len(df) > 1000:
+        if num_rows > 1000:
             data_records = df.head(1000).to_dict(orient='records')
-            note = f"DataFrame truncated. Showing first 1000 of {len(df)} rows"
+            note = f"DataFrame truncated. Showing {shown(1000)} of {num_rows} rows"
         else:
             data_records = df.to_dict(orient='records')
             note = None
@@ -31,14 +94,21 @@ def main():
                 "columns": df.columns.tolist(),
                 "dtypes": {k: str(v) for k, v in df.dtypes.items()}
             },
-            "shape": df.shape,
+            "shape": (num_rows, df.shape[1]),
             "data": data_records
         }
         
         if note:
             result["_note"] = note
+            if sampled_rows is not None:
+                result["sample_rows"] = sampled_rows
+        output = OutputBudget()
+        result = output.fit(result)
+        perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2, default=str))
+        budget.report(result)
+        output.report(result)
+        perf.emit(result, default=str)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load Feather file: {str(e)}",
@@ -3,51 +3,60 @@
 
 import sys
 import json
+from perf import PerfRecorder, progress, partial
+from sampling import preview_elements, shown
+from array_encoding import array_values, encoded_bytes
+from output_budget import OutputBudget, Sliced, plain, preview
+from h5_chunks import chunked
 import math
 import h5py
 import numpy as np
 
-def convert_dataset(dataset, max_elements=1000):
-    """Convert HDF5 dataset to JSON-serializable format"""
-    data = dataset[()]
-    
-    # Handle numpy arrays
-    if isinstance(data, np.ndarray):
-        # Handle complex arrays
-        if np.iscomplexobj(data):
-            if data.size > max_elements:
-                preview = data.flatten()[:max_elements]
-                return {
-                    "_type": "hdf5.dataset",
-                    "dtype": str(data.dtype),
-                    "shape": data.shape,
-                    "size": int(data.size),
-                    "preview": [{"real": float(x.real), "imag": float(x.imag)} for x in preview],
-                    "_note": f"Complex dataset truncated. Showing first {max_elements} of {data.size} elements"
-                }
-            return {
-                "_type": "hdf5.dataset",
-                "dtype": str(data.dtype),
-                "shape": data.shape,
-                "data": [{"real": float(x.real), "imag": float(x.imag)} for x in data.flatten()]
-            }
-        
-        # Handle regular arrays
-        if data.size > max_elements:
-            return {
-                "_type": "hdf5.dataset",
-                "dtype": str(data.dtype),
-                "shape": data.shape,
-                "size": int(data.size),
-                "preview": data.flatten()[:max_elements].tolist(),
-                "_note": f"Dataset truncated. Showing first {max_elements} of {data.size} elements"
-            }
+def preview_dataset(dataset, max_elements):
+    """Preview a large dataset by reading only the rows that hold the previewed elements"""
+    # The previewed rows (random ones in sample mode) can span many compressed chunks
+    preview = preview_elements(chunked(dataset), max_elements)
+    kind = "Complex dataset" if np.iscomplexobj(preview) else "Dataset"
+    return {
+        "_type": "hdf5.dataset",
+        "dtype": str(dataset.dtype),
+        "shape": list(dataset.shape),
+        "size": int(dataset.size),
+        "preview": array_values(preview),
+        "_note": f"{kind} truncated. Showing {shown(max_elements)} of {dataset.size} elements"
+    }
+
+def read_dataset(dataset, max_elements):
+    """Read a dataset with at most max_elements elements"""
+    progress(f"Reading {dataset.name}")
+    try:
+        # Never materialize a dataset that will be truncated anyway
+        if dataset.size > max_elements:
+            return preview_dataset(dataset, max_elements)
+        data = dataset[()]
         return {
             "_type": "hdf5.dataset",
             "dtype": str(data.dtype),
-            "shape": data.shape,
-            "data": data.tolist()
+            "shape": list(data.shape),
+            "data": array_values(data)
         }
+    except Exception as e:
+        return {
+            "_type": "hdf5.dataset",
+            "_error": f"Failed to read dataset: {str(e)}",
+            "dtype": str(dataset.dtype),
+            "shape": list(dataset.shape)
+        }
+
+def convert_dataset(dataset):
+    """Convert HDF5 dataset to JSON-serializable format.
+
+    Arrays are read when the output budget reaches them, with as many elements
+    as it allows (see output_budget.py).
+    """
+    if dataset.shape:
+        return Sliced(dataset.size, lambda n: read_dataset(dataset, n), 'elements', encoded_bytes(dataset.dtype))
+    data = dataset[()]
     
     # Handle scalar values
     if isinstance(data, (np.integer, np.floating)):
@@ -67,51 +76,59 @@ def convert_dataset(dataset, max_elements=1000):
     
     return str(data)
 
-def explore_group(group, max_depth=10, current_depth=0):
-    """Recursively explore HDF5 group structure"""
-    
-    if current_depth > max_depth:
-        return {"_note": "Max depth reached"}
-    
+def explore_group(group):
+    """Describe one level of an HDF5 group; its members are explored as the output budget reaches them"""
     result = {
         "_type": "hdf5.group",
         "_attributes": {k: str(v) for k, v in group.attrs.items()} if group.attrs else {}
     }
     
     for key in group.keys():
-        item = group[key]
-        
-        if isinstance(item, h5py.Group):
-            result[key] = explore_group(item, max_depth, current_depth + 1)
-        elif isinstance(item, h5py.Dataset):
-            try:
-                result[key] = convert_dataset(item)
-            except Exception as e:
-                result[key] = {
-                    "_type": "hdf5.dataset",
-                    "_error": f"Failed to read dataset: {str(e)}",
-                    "dtype": str(item.dtype),
-                    "shape": item.shape
-                }
+        result[key] = group[key]
     
     return result
 
+def expand(obj):
+    """Convert one level of the HDF5 tree for OutputBudget.fit"""
+    if isinstance(obj, h5py.Group):
+        return explore_group(obj)
+    if isinstance(obj, h5py.Dataset):
+        try:
+            return convert_dataset(obj)
+        except Exception as e:
+            return {
+                "_type": "hdf5.dataset",
+                "_error": f"Failed to read dataset: {str(e)}",
+                "dtype": str(obj.dtype),
+                "shape": list(obj.shape)
+            }
+    return plain(obj)
+
 def main():
     if len(sys.argv) != 2:
         print(json.dumps({"error": "Usage: convert_h5.py <file_path>"}))
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
     
     try:
         with h5py.File(file_path, 'r') as f:
+            perf.mark('open')
+            # The tree with a few elements of each dataset first, as the full walk can take a while
+            partial({"file_type": "hdf5", "data": preview(f, expand)})
+            # Datasets are read and sanitized together while walking the tree
+            output = OutputBudget()
             result = {
                 "file_type": "hdf5",
                 "_attributes": {k: str(v) for k, v in f.attrs.items()} if f.attrs else {},
-                "data": explore_group(f)
+                "data": output.fit(f, expand)
             }
+        perf.mark('read')
         
-        print(json.dumps(result, indent=2))
+        output.report(result)
+        perf.emit(result)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load HDF5 file: {str(e)}",
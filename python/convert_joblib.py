@@ -3,16 +3,70 @@
 
 import sys
 import json
+from perf import PerfRecorder
+from memory_budget import MemoryBudget, OBJECT_EXPANSION
+from compressed import detect, open_stream, data_size
+from sampling import preview_elements, preview_rows, shown
+from output_budget import OutputBudget, Sliced
 import math
+import warnings
 import joblib
 import numpy as np
 from datetime import datetime, date
 
-def convert_to_serializable(obj, max_depth=10, current_depth=0):
-    """Convert Python objects to JSON-serializable format"""
-    
-    if current_depth > max_depth:
-        return f"<Max depth reached: {type(obj).__name__}>"
+def convert_array(arr, n):
+    """Convert numpy array to JSON-serializable format, showing at most n elements"""
+    elements = arr.flatten() if arr.size <= n else preview_elements(arr, n)
+    if np.iscomplexobj(arr):
+        kind = "Complex array"
+        values = [{"real": float(x.real), "imag": float(x.imag)} for x in elements]
+    else:
+        # Elements are converted by the output budget, which handles NaN/Infinity
+        kind = "Array"
+        values = list(elements)
+    if arr.size <= n:
+        return {
+            "_type": "numpy.ndarray",
+            "dtype": str(arr.dtype),
+            "shape": list(arr.shape),
+            "data": values
+        }
+    return {
+        "_type": "numpy.ndarray",
+        "dtype": str(arr.dtype),
+        "shape": list(arr.shape),
+        "size": int(arr.size),
+        "preview": values,
+        "_note": f"{kind} truncated. Showing {shown(n)} of {arr.size} elements"
+    }
+
+def convert_frame(df, n):
+    """Convert pandas DataFrame to JSON-serializable format, showing at most n rows"""
+    rows = df if len(df) <= n else preview_rows(df, n)
+    # Replace NaN with None for JSON compatibility
+    records = rows.replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"}).to_dict(orient='records')
+    if len(df) <= n:
+        return {
+            "_type": "pandas.DataFrame",
+            "shape": list(df.shape),
+            "columns": df.columns.tolist(),
+            "data": records
+        }
+    return {
+        "_type": "pandas.DataFrame",
+        "shape": list(df.shape),
+        "columns": df.columns.tolist(),
+        "dtypes": {str(k): str(v) for k, v in df.dtypes.items()},
+        "preview": records,
+        "_note": f"DataFrame truncated. Showing {shown(n)} of {len(df)} rows"
+    }
+
+def expand(obj):
+    """Convert one level of a Python object to JSON-serializable format.
+
+    Containers keep their items as they are; OutputBudget.fit converts those in
+    turn, as far as the output budget allows (see output_budget.py).
+    """
     
     # Handle None
     if obj is None:
@@ -39,46 +93,7 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
             "imag": float(obj.imag)
         }
     if isinstance(obj, np.ndarray):
-        # Handle complex arrays
-        if np.iscomplexobj(obj):
-            if obj.size > 1000:
-                preview = obj.flatten()[:100]
-                return {
-                    "_type": "numpy.ndarray",
-                    "dtype": str(obj.dtype),
-                    "shape": obj.shape,
-                    "size": int(obj.size),
-                    "preview": [{"real": float(x.real), "imag": float(x.imag)} for x in preview],
-                    "_note": f"Complex array truncated. Showing first 100 of {obj.size} elements"
-                }
-            return {
-                "_type": "numpy.ndarray",
-                "dtype": str(obj.dtype),
-                "shape": obj.shape,
-                "data": [{"real": float(x.real), "imag": float(x.imag)} for x in obj.flatten()]
-            }
-        
-        # Handle regular arrays
-        if obj.size > 1000:
-            preview = obj.flatten()[:100]
-            # Convert each element to handle NaN/Infinity
-            preview_list = [convert_to_serializable(x, max_depth, current_depth + 1) for x in preview]
-            return {
-                "_type": "numpy.ndarray",
-                "dtype": str(obj.dtype),
-                "shape": obj.shape,
-                "size": int(obj.size),
-                "preview": preview_list,
-                "_note": f"Array truncated. Showing first 100 of {obj.size} elements"
-            }
-        # Convert each element to handle NaN/Infinity
-        data_list = [convert_to_serializable(x, max_depth, current_depth + 1) for x in obj.flatten()]
-        return {
-            "_type": "numpy.ndarray",
-            "dtype": str(obj.dtype),
-            "shape": obj.shape,
-            "data": data_list
-        }
+        return Sliced(obj.size, lambda n: convert_array(obj, n), 'elements')
     
     # Handle datetime
     if isinstance(obj, (datetime, date)):
@@ -93,51 +108,30 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
     
     # Handle dict
     if isinstance(obj, dict):
-        return {
-            str(k): convert_to_serializable(v, max_depth, current_depth + 1)
-            for k, v in obj.items()
-        }
+        return {str(k): v for k, v in obj.items()}
     
     # Handle list, tuple, set
-    if isinstance(obj, (list, tuple, set)):
-        result = [convert_to_serializable(item, max_depth, current_depth + 1) for item in obj]
-        if isinstance(obj, tuple):
-            return {"_type": "tuple", "data": result}
-        elif isinstance(obj, set):
-            return {"_type": "set", "data": result}
-        return result
+    if isinstance(obj, list):
+        return obj
+    if isinstance(obj, tuple):
+        return {"_type": "tuple", "data": list(obj)}
+    if isinstance(obj, set):
+        return {"_type": "set", "data": list(obj)}
     
-    # Handle pandas DataFrame
-    try:
-        import pandas as pd
+    # Handle pandas DataFrame. pandas objects can only be present if loading
+    # imported pandas, so look it up instead of paying its import time here
+    pd = sys.modules.get('pandas')
+    if pd is not None:
         if isinstance(obj, pd.DataFrame):
-            # Replace NaN with None for JSON compatibility
-            obj_clean = obj.replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"})
-            if len(obj) > 1000:
-                return {
-                    "_type": "pandas.DataFrame",
-                    "shape": obj.shape,
-                    "columns": obj.columns.tolist(),
-                    "dtypes": {k: str(v) for k, v in obj.dtypes.items()},
-                    "preview": obj_clean.head(100).to_dict(orient='records'),
-                    "_note": f"DataFrame truncated. Showing first 100 of {len(obj)} rows"
-                }
-            return {
-                "_type": "pandas.DataFrame",
-                "shape": obj.shape,
-                "columns": obj.columns.tolist(),
-                "data": obj_clean.to_dict(orient='records')
-            }
+            return Sliced(len(obj), lambda n: convert_frame(obj, n), 'rows')
         if isinstance(obj, pd.Series):
             # Replace NaN with None for JSON compatibility
-            series_clean = obj.replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"})
+            clean = lambda n: obj.iloc[:n].replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"}).tolist()
             return {
                 "_type": "pandas.Series",
                 "name": obj.name,
-                "data": series_clean.tolist()
+                "data": Sliced(len(obj), clean, 'elements')
             }
-    except ImportError:
-        pass
     
     # Handle custom objects (like sklearn models)
     if hasattr(obj, '__dict__'):
@@ -148,22 +142,19 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
         if 'sklearn' in obj_type:
             if hasattr(obj, 'get_params'):
                 try:
-                    attributes['parameters'] = convert_to_serializable(obj.get_params(), max_depth, current_depth + 1)
+                    attributes['parameters'] = obj.get_params()
                 except:
                     pass
             if hasattr(obj, 'feature_importances_'):
                 try:
-                    attributes['feature_importances'] = obj.feature_importances_.tolist()
+                    attributes['feature_importances'] = obj.feature_importances_
                 except:
                     pass
         
-        # Get regular attributes
+        # Get regular attributes (an attribute that fails to convert is shown by its type name)
         for key, value in obj.__dict__.items():
             if not key.startswith('_'):
-                try:
-                    attributes[key] = convert_to_serializable(value, max_depth, current_depth + 1)
-                except:
-                    attributes[key] = f"<{type(value).__name__}>"
+                attributes[key] = value
         
         return {
             "_type": obj_type,
@@ -179,16 +170,43 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
-        data = joblib.load(file_path)
+        estimated_bytes = OBJECT_EXPANSION * data_size(file_path)
+        codec = detect(file_path)
+        if codec is not None:
+            # Decompressed here rather than by joblib, which cannot read zstd and decodes gzip
+            # on one core; arrays in a compressed stream cannot be memory-mapped
+            with open_stream(file_path, codec) as f:
+                data = joblib.load(f)
+            if not budget.allows(estimated_bytes):
+                budget.skip("arrays", estimated_bytes, "Compressed file, loaded in full")
+        elif budget.allows(estimated_bytes):
+            data = joblib.load(file_path)
+        else:
+            # Memory-map the arrays so that only the previewed elements are paged in;
+            # joblib warns and loads normally when the file is compressed
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                data = joblib.load(file_path, mmap_mode='r')
+            compressed = any('mmap_mode' in str(w.message) for w in caught)
+            budget.skip("arrays", estimated_bytes,
+                        "Compressed file, loaded in full" if compressed else "Memory-mapped instead of loaded")
+        perf.mark('read')
         
+        output = OutputBudget()
         result = {
             "file_type": "joblib",
-            "data": convert_to_serializable(data)
+            "data": output.fit(data, expand)
         }
+        perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2))
+        budget.report(result)
+        output.report(result)
+        perf.emit(result)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load Joblib file: {str(e)}",
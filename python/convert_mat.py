@@ -3,14 +3,60 @@
 
 import sys
 import json
+from perf import PerfRecorder, partial
+from memory_budget import MemoryBudget
+from sampling import preview_elements, shown
+from array_encoding import array_values
+from output_budget import OutputBudget, Sliced
+import math
 import numpy as np
 from datetime import datetime, date
 
-def convert_to_serializable(obj, max_depth=10, current_depth=0):
-    """Convert MATLAB objects to JSON-serializable format"""
-    
-    if current_depth > max_depth:
-        return f"<Max depth reached: {type(obj).__name__}>"
+# Bytes per element by MATLAB class, for estimating a variable before loading it.
+# Cells, structs and objects are counted as one pointer per element.
+MATLAB_CLASS_BYTES = {
+    'double': 8, 'single': 4, 'logical': 1, 'char': 4, 'sparse': 8,
+    'int8': 1, 'uint8': 1, 'int16': 2, 'uint16': 2,
+    'int32': 4, 'uint32': 4, 'int64': 8, 'uint64': 8
+}
+
+def truncated_array(dtype, shape, preview, how):
+    """Describe an array by the preview of its elements that fits the output budget"""
+    size = math.prod(shape)
+    kind = "Complex array" if np.iscomplexobj(preview) else "Array"
+    return {
+        "_type": "matlab.array",
+        "dtype": str(dtype),
+        "shape": list(shape),
+        "size": int(size),
+        "preview": array_values(preview),
+        "_note": f"{kind} truncated. Showing {how} of {size} elements"
+    }
+
+def convert_array(arr, n):
+    if arr.size > n:
+        return truncated_array(arr.dtype, arr.shape, preview_elements(arr, n), shown(n))
+    return {
+        "_type": "matlab.array",
+        "dtype": str(arr.dtype),
+        "shape": list(arr.shape),
+        "data": array_values(arr)
+    }
+
+def convert_sparse(matrix, n):
+    size = math.prod(matrix.shape)
+    if size > n:
+        # Only the first n elements are shown, so densify just the rows holding them
+        rows = math.ceil(n / max(matrix.shape[1], 1))
+        return truncated_array(matrix.dtype, matrix.shape, matrix.tocsr()[:rows].toarray().reshape(-1)[:n], f"first {n}")
+    return convert_array(matrix.toarray(), n)
+
+def expand(obj):
+    """Convert one level of a MATLAB object to JSON-serializable format.
+
+    Containers keep their items as they are; OutputBudget.fit converts those in
+    turn, as far as the output budget allows (see output_budget.py).
+    """
     
     # Handle None
     if obj is None:
@@ -37,41 +83,7 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
             "imag": float(obj.imag)
         }
     if isinstance(obj, np.ndarray):
-        # Handle complex arrays
-        if np.iscomplexobj(obj):
-            if obj.size > 1000:
-                preview = obj.flatten()[:100]
-                return {
-                    "_type": "matlab.array",
-                    "dtype": str(obj.dtype),
-                    "shape": obj.shape,
-                    "size": int(obj.size),
-                    "preview": [{"real": float(x.real), "imag": float(x.imag)} for x in preview],
-                    "_note": f"Complex array truncated. Showing first 100 of {obj.size} elements"
-                }
-            return {
-                "_type": "matlab.array",
-                "dtype": str(obj.dtype),
-                "shape": obj.shape,
-                "data": [{"real": float(x.real), "imag": float(x.imag)} for x in obj.flatten()]
-            }
-        
-        # Handle regular arrays
-        if obj.size > 1000:
-            return {
-                "_type": "matlab.array",
-                "dtype": str(obj.dtype),
-                "shape": obj.shape,
-                "size": int(obj.size),
-                "preview": obj.flatten()[:100].tolist(),
-                "_note": f"Array truncated. Showing first 100 of {obj.size} elements"
-            }
-        return {
-            "_type": "matlab.array",
-            "dtype": str(obj.dtype),
-            "shape": obj.shape,
-            "data": obj.tolist()
-        }
+        return Sliced(obj.size, lambda n: convert_array(obj, n), 'elements')
     
     # Handle bytes
     if isinstance(obj, bytes):
@@ -83,15 +95,14 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
     # Handle dict (MATLAB structures)
     if isinstance(obj, dict):
         return {
-            str(k): convert_to_serializable(v, max_depth, current_depth + 1)
+            str(k): v
             for k, v in obj.items()
             if not k.startswith('__')  # Skip MATLAB metadata fields
         }
     
     # Handle list, tuple
     if isinstance(obj, (list, tuple)):
-        result = [convert_to_serializable(item, max_depth, current_depth + 1) for item in obj]
-        return result
+        return list(obj)
     
     # Handle scipy sparse matrices
     try:
@@ -100,9 +111,9 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
             return {
                 "_type": "matlab.sparse",
                 "format": obj.format,
-                "shape": obj.shape,
+                "shape": list(obj.shape),
                 "nnz": obj.nnz,
-                "data": convert_to_serializable(obj.toarray())
+                "data": Sliced(math.prod(obj.shape), lambda n: convert_sparse(obj, n), 'elements')
             }
     except ImportError:
         pass
@@ -116,12 +127,39 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
-        from scipy.io import loadmat
+        from scipy.io import loadmat, whosmat
+        perf.mark('imports')
+        
+        # Estimate every variable from its header and only load the ones that fit
+        too_large = {}
+        try:
+            headers = whosmat(file_path)
+        except NotImplementedError:
+            headers = []  # Let loadmat report unsupported (v7.3) files
+        for name, shape, matlab_class in headers:
+            estimated_bytes = math.prod(shape) * MATLAB_CLASS_BYTES.get(matlab_class, 8)
+            if not budget.allows(estimated_bytes):
+                too_large[name] = (shape, matlab_class)
+                budget.skip(name, estimated_bytes, "Not loaded")
+        
+        # The variables' headers first, as loading them can take a while
+        if headers:
+            partial({
+                "file_type": "matlab",
+                "variables": {name: {"class": matlab_class, "shape": shape} for name, shape, matlab_class in headers}
+            })
         
         # Load MATLAB file
-        mat_data = loadmat(file_path, squeeze_me=True, struct_as_record=False)
+        variable_names = None
+        if too_large:
+            variable_names = [name for name, _, _ in headers if name not in too_large]
+        mat_data = loadmat(file_path, squeeze_me=True, struct_as_record=False, variable_names=variable_names)
+        perf.mark('read')
         
         # Remove MATLAB metadata
         filtered_data = {
@@ -129,13 +167,24 @@ def main():
             if not k.startswith('__')
         }
         
+        output = OutputBudget()
         result = {
             "file_type": "matlab",
-            "variables": list(filtered_data.keys()),
-            "data": convert_to_serializable(filtered_data)
+            "variables": list(filtered_data.keys()) + list(too_large),
+            "data": output.fit(filtered_data, expand)
         }
+        for name, (shape, matlab_class) in too_large.items():
+            result["data"][name] = {
+                "_type": "matlab.array",
+                "class": matlab_class,
+                "shape": shape,
+                "_note": "Not loaded: exceeds the memory budget"
+            }
+        perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2))
+        budget.report(result)
+        output.report(result)
+        perf.emit(result)
     except ImportError:
         print(json.dumps({
             "error": "Missing Python package: scipy\n\nInstall with: pip install scipy",
@@ -3,14 +3,21 @@
 
 import sys
 import json
+from perf import PerfRecorder
+from memory_budget import MemoryBudget, OBJECT_EXPANSION
+from compressed import open_input, data_size
+from sampling import SAMPLE_SEED, reservoir_sample, shown
+from output_budget import OutputBudget
+import itertools
 import msgpack
 from datetime import datetime, date
 
-def convert_to_serializable(obj, max_depth=10, current_depth=0):
-    """Convert objects to JSON-serializable format"""
-    
-    if current_depth > max_depth:
-        return f"<Max depth reached: {type(obj).__name__}>"
+def expand(obj):
+    """Convert one level of an unpacked object to JSON-serializable format.
+
+    Containers keep their items as they are; OutputBudget.fit converts those in
+    turn, as far as the output budget allows (see output_budget.py).
+    """
     
     # Handle None
     if obj is None:
@@ -33,38 +40,119 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
     
     # Handle dict
     if isinstance(obj, dict):
-        return {
-            str(k): convert_to_serializable(v, max_depth, current_depth + 1)
-            for k, v in obj.items()
-        }
+        return {str(k): v for k, v in obj.items()}
     
     # Handle list, tuple
-    if isinstance(obj, (list, tuple)):
-        result = [convert_to_serializable(item, max_depth, current_depth + 1) for item in obj]
-        if isinstance(obj, tuple):
-            return {"_type": "tuple", "data": result}
-        return result
+    if isinstance(obj, list):
+        return obj
+    if isinstance(obj, tuple):
+        return {"_type": "tuple", "data": list(obj)}
     
     # Fallback
     return str(obj)
 
+def read_items(f, max_items=1000):
+    """Unpack at most max_items entries of a top-level array or map, one entry at a time.
+
+    Keeps the first entries, or in sample mode a reservoir sample of all of them.
+    Returns (data, total_items, sampled positions or None), or (None, None, None)
+    if the top-level value is not a container.
+    """
+    # Peeked rather than read, as decompressed input cannot seek back
+    first = f.peek(1)[:1]
+    if not first:
+        return None, None, None
+    marker = first[0]
+    unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+    is_map = 0x80 <= marker <= 0x8f or marker in (0xde, 0xdf)
+    if 0x90 <= marker <= 0x9f or marker in (0xdc, 0xdd):
+        total = unpacker.read_array_header()
+        entries = (unpacker.unpack() for _ in range(total))
+    elif is_map:
+        total = unpacker.read_map_header()
+        entries = ((unpacker.unpack(), unpacker.unpack()) for _ in range(total))
+    else:
+        return None, None, None
+    positions = None
+    if SAMPLE_SEED is not None and total > max_items:
+        picked, positions, _ = reservoir_sample(entries, max_items)
+    else:
+        picked = list(itertools.islice(entries, max_items))
+    return (dict(picked) if is_map else picked), total, positions
+
+def read_stream(f, max_items=1000):
+    """Unpack a stream of objects written one after another (e.g. a log), one object at a time.
+
+    f must be positioned at the start of the stream. Keeps the first objects, or
+    in sample mode a reservoir sample of all of them.
+    Returns (objects, total_objects, sampled positions or None).
+    """
+    unpacker = msgpack.Unpacker(f, raw=False, strict_map_key=False)
+    if SAMPLE_SEED is not None:
+        objects, positions, total = reservoir_sample(unpacker, max_items)
+        return objects, total, positions if total > max_items else None
+    objects = []
+    total = 0
+    for obj in unpacker:
+        if total < max_items:
+            objects.append(obj)
+        total += 1
+    return objects, total, None
+
 def main():
     if len(sys.argv) != 2:
         print(json.dumps({"error": "Usage: convert_msgpack.py <file_path>"}))
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
-        with open(file_path, 'rb') as f:
-            data = msgpack.unpack(f, raw=False, strict_map_key=False)
+        estimated_bytes = OBJECT_EXPANSION * data_size(file_path)
+        total_items = None
+        total_objects = None
+        sampled_items = None
+        with open_input(file_path) as f:
+            perf.mark('open')
+            if budget.allows(estimated_bytes):
+                try:
+                    data = msgpack.unpack(f, raw=False, strict_map_key=False)
+                except msgpack.ExtraData:
+                    with open_input(file_path) as stream:
+                        data, total_objects, sampled_items = read_stream(stream)
+            else:
+                data, total_items, sampled_items = read_items(f)
+                if total_items is None:
+                    action = "Not loaded"
+                elif sampled_items is not None:
+                    action = "Sampled 1000 items while streaming"
+                else:
+                    action = "Read the first 1000 items only"
+                budget.skip("file", estimated_bytes, action)
+        perf.mark('read')
         
+        output = OutputBudget()
         result = {
             "file_type": "msgpack",
-            "data": convert_to_serializable(data)
+            "data": output.fit(data, expand)
         }
+        if total_objects is not None:
+            result["num_objects"] = total_objects
+            if total_objects > 1000:
+                result["_note"] = f"Stream truncated. Showing {shown(1000)} of {total_objects} objects"
+                if sampled_items is not None:
+                    result["sample_rows"] = sampled_items
+        if total_items is not None and total_items > 1000:
+            result["_note"] = f"Data truncated. Showing {shown(1000)} of {total_items} items"
+            if sampled_items is not None:
+                result["sample_rows"] = sampled_items
+        perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2))
+        budget.report(result)
+        output.report(result)
+        perf.emit(result)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load MessagePack file: {str(e)}",
@@ -3,6 +3,10 @@
 
 import sys
 import json
+from perf import PerfRecorder, progress, partial
+from sampling import preview_elements, shown
+from array_encoding import array_values, encoded_bytes
+from output_budget import OutputBudget, Sliced, preview
 import numpy as np
 
 def convert_array(arr, max_elements=1000):
@@ -11,29 +15,48 @@ def convert_array(arr, max_elements=1000):
         return {
             "_type": "numpy.ndarray",
             "dtype": str(arr.dtype),
-            "shape": arr.shape,
+            "shape": list(arr.shape),
             "size": int(arr.size),
-            "preview": arr.flatten()[:max_elements].tolist(),
+            "preview": array_values(arr.flatten()[:max_elements]),
             "_note": f"Array truncated. Showing first {max_elements} of {arr.size} elements"
         }
     return {
         "_type": "numpy.ndarray",
         "dtype": str(arr.dtype),
-        "shape": arr.shape,
-        "data": arr.tolist()
+        "shape": list(arr.shape),
+        "data": array_values(arr)
     }
 
+def convert_variable(var, max_elements=1000):
+    """Convert a variable, reading only the previewed rows when it will be truncated anyway"""
+    progress(f"Reading variable {var.name}")
+    if var.shape and var.size > max_elements:
+        preview = preview_elements(var, max_elements)
+        return {
+            "_type": "numpy.ndarray",
+            "dtype": str(preview.dtype),
+            "shape": list(var.shape),
+            "size": int(var.size),
+            "preview": array_values(preview),
+            "_note": f"Array truncated. Showing {shown(max_elements)} of {var.size} elements"
+        }
+    return convert_array(var[:], max_elements)
+
 def main():
     if len(sys.argv) != 2:
         print(json.dumps({"error": "Usage: convert_netcdf.py <file_path>"}))
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
     
     try:
         from netCDF4 import Dataset
+        perf.mark('imports')
         
         nc = Dataset(file_path, 'r')
+        perf.mark('open')
         
         # Get dimensions
         dimensions = {
@@ -45,10 +68,12 @@ def main():
             name: nc.getncattr(name) for name in nc.ncattrs()
         }
         
-        # Get variables
+        # Get variables; their data is read when the output budget reaches it, with as
+        # many elements as it allows
         variables = {}
-        for var_name in nc.variables:
-            var = nc.variables[var_name]
+        for var_name, var in nc.variables.items():
+            # Variable-length strings have the Python str type rather than a numpy dtype
+            item_bytes = encoded_bytes(var.dtype) if isinstance(var.dtype, np.dtype) else None
             variables[var_name] = {
                 "dimensions": var.dimensions,
                 "dtype": str(var.dtype),
@@ -56,7 +81,7 @@ def main():
                 "attributes": {
                     name: var.getncattr(name) for name in var.ncattrs()
                 },
-                "data": convert_array(var[:])
+                "data": Sliced(var.size, lambda n, var=var: convert_variable(var, n), 'elements', item_bytes)
             }
         
         # Get groups (if any)
@@ -69,10 +94,16 @@ def main():
             "variables": variables,
             "groups": groups
         }
+        # Every variable with a few of its elements first, as reading them all can take a while
+        partial(preview(result))
+        output = OutputBudget()
+        result = output.fit(result)
         
         nc.close()
+        perf.mark('read')
         
-        print(json.dumps(result, indent=2, default=str))
+        output.report(result)
+        perf.emit(result, default=str)
     except ImportError:
         print(json.dumps({
             "error": "Missing Python package: netCDF4\n\nInstall with: pip install netCDF4",
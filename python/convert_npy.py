@@ -3,48 +3,114 @@
 
 import sys
 import json
+from perf import PerfRecorder, progress, partial
+from memory_budget import MemoryBudget
+from sampling import SAMPLE_SEED, preview_elements, shown
+from array_encoding import array_values, encoded_bytes
+from output_budget import OutputBudget, Sliced, preview
+from compressed import detect, open_stream
 import math
 import numpy as np
 import os
 
+def preview_array(dtype, shape, preview, max_elements, how=None):
+    """Describe a truncated array from its shape and the previewed elements"""
+    size = math.prod(shape)
+    how = how or shown(max_elements)
+    kind = "Complex array" if np.iscomplexobj(preview) else "Array"
+    return {
+        "_type": "numpy.ndarray",
+        "dtype": str(dtype),
+        "shape": list(shape),
+        "size": int(size),
+        "preview": array_values(preview),
+        "_note": f"{kind} truncated. Showing {how} of {size} elements"
+    }
+
 def convert_array(arr, max_elements=1000):
     """Convert numpy array to JSON-serializable format"""
-    # Handle complex arrays
-    if np.iscomplexobj(arr):
-        if arr.size > max_elements:
-            preview = arr.flatten()[:max_elements]
-            return {
-                "_type": "numpy.ndarray",
-                "dtype": str(arr.dtype),
-                "shape": arr.shape,
-                "size": int(arr.size),
-                "preview": [{"real": float(x.real), "imag": float(x.imag)} for x in preview],
-                "_note": f"Complex array truncated. Showing first {max_elements} of {arr.size} elements"
-            }
-        return {
-            "_type": "numpy.ndarray",
-            "dtype": str(arr.dtype),
-            "shape": arr.shape,
-            "data": [{"real": float(x.real), "imag": float(x.imag)} for x in arr.flatten()]
-        }
-    
-    # Handle regular arrays
     if arr.size > max_elements:
-        return {
-            "_type": "numpy.ndarray",
-            "dtype": str(arr.dtype),
-            "shape": arr.shape,
-            "size": int(arr.size),
-            "preview": arr.flatten()[:max_elements].tolist(),
-            "_note": f"Array truncated. Showing first {max_elements} of {arr.size} elements"
-        }
+        return preview_array(arr.dtype, arr.shape, preview_elements(arr, max_elements), max_elements)
+    
     return {
         "_type": "numpy.ndarray",
         "dtype": str(arr.dtype),
-        "shape": arr.shape,
-        "data": arr.tolist()
+        "shape": list(arr.shape),
+        "data": array_values(arr)
     }
 
+def sliced_array(arr):
+    """The array, converted with as many elements as the output budget allows"""
+    return Sliced(arr.size, lambda n: convert_array(arr, n), 'elements', encoded_bytes(arr.dtype))
+
+def load_npy(file_path):
+    """Memory-map the array so that only the previewed elements are read from disk"""
+    try:
+        return np.load(file_path, mmap_mode='r')
+    except ValueError:
+        # Arrays of Python objects cannot be memory-mapped
+        return np.load(file_path)
+
+def read_header(f):
+    """Shape, storage order and dtype from a .npy header, leaving f at the first element"""
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+def stream_preview(f, key, budget, max_elements=1000):
+    """Preview a large array from a .npy stream that is decompressed as it is read.
+
+    Only the header and the leading elements are decompressed. Returns None when
+    the array has to be read whole instead (small, objects, or a random sample or
+    column-major array that fits the budget).
+    """
+    shape, fortran_order, dtype = read_header(f)
+    size = math.prod(shape)
+    estimated_bytes = size * dtype.itemsize
+    # Random samples and row-major previews of column-major arrays need the whole array
+    fits = budget.allows(estimated_bytes)
+    if size <= max_elements or dtype.hasobject or (fits and (SAMPLE_SEED is not None or fortran_order)):
+        return None
+    if SAMPLE_SEED is not None:
+        budget.skip(key, estimated_bytes, "Previewed the first elements instead of a random sample")
+    elif fortran_order:
+        budget.skip(key, estimated_bytes, "Previewed in storage (column-major) order")
+    # The elements follow the header in storage order, so the preview is a prefix of the stream
+    preview = np.frombuffer(f.read(max_elements * dtype.itemsize), dtype=dtype, count=max_elements)
+    return preview_array(dtype, shape, preview, max_elements, f"first {max_elements}")
+
+def sliced_stream(open_npy, key, budget):
+    """A .npy stream (an .npz member or a compressed .npy), converted with as many
+    elements as the output budget allows, decompressing only the leading bytes of
+    large arrays. open_npy() opens the stream at its start; it cannot seek back.
+    """
+    with open_npy() as f:
+        shape, _, dtype = read_header(f)
+    loaded = []
+
+    def take(n):
+        if not loaded:
+            progress(f"Reading {key}")
+            with open_npy() as f:
+                preview = stream_preview(f, key, budget, n)
+            if preview is not None:
+                return preview
+            with open_npy() as f:
+                loaded.append(np.lib.format.read_array(f))
+        return convert_array(loaded[0], n)
+
+    return Sliced(math.prod(shape), take, 'elements', encoded_bytes(dtype))
+
+def convert_npz_member(data, key, budget):
+    """Convert one .npz member, decompressing only the leading bytes of large arrays"""
+    name = key + '.npy' if key + '.npy' in data.zip.namelist() else key
+    return sliced_stream(lambda: data.zip.open(name), key, budget)
+
+def convert_compressed_npy(file_path, codec, budget):
+    """Convert a compressed .npy (e.g. .npy.zst), decompressing only the leading bytes of large arrays"""
+    return sliced_stream(lambda: open_stream(file_path, codec), "array", budget)
+
 def main():
     if len(sys.argv) != 2:
         print(json.dumps({"error": "Usage: convert_npy.py <file_path>"}))
@@ -52,31 +118,52 @@ def main():
     
     file_path = sys.argv[1]
     ext = os.path.splitext(file_path)[1].lower()
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
+    output = OutputBudget()
     
     try:
+        codec = detect(file_path)
         if ext == '.npz':
             # Handle .npz (compressed archive of multiple arrays)
             data = np.load(file_path)
-            arrays = {}
-            
-            for key in data.files:
-                arrays[key] = convert_array(data[key])
+            perf.mark('open')
+            # Members are decompressed lazily (as the output budget reaches them), so
+            # reading and sanitizing overlap
+            arrays = {key: convert_npz_member(data, key, budget) for key in data.files}
+            # A few elements of each member first, as decompressing them can take a while
+            partial({"file_type": "npz", "arrays": list(data.files), "data": preview(arrays)})
             
             result = {
                 "file_type": "npz",
                 "num_arrays": len(data.files),
                 "arrays": list(data.files),
-                "data": arrays
+                "data": output.fit(arrays)
             }
+            perf.mark('read')
+        elif codec is not None:
+            # Handle a compressed .npy, which cannot be memory-mapped
+            array = convert_compressed_npy(file_path, codec, budget)
+            partial({"file_type": "npy", "data": preview(array)})
+            result = {
+                "file_type": "npy",
+                "data": output.fit(array)
+            }
+            perf.mark('read')
         else:
             # Handle .npy (single array)
-            data = np.load(file_path)
+            data = load_npy(file_path)
+            perf.mark('read')
             result = {
                 "file_type": "npy",
-                "data": convert_array(data)
+                "data": output.fit(sliced_array(data))
             }
+            perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2))
+        budget.report(result)
+        output.report(result)
+        perf.emit(result)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load NumPy file: {str(e)}",
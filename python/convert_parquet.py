@@ -3,25 +3,42 @@
 
 import sys
 import json
+from perf import PerfRecorder, partial
+from memory_budget import MemoryBudget, PANDAS_EXPANSION
+from output_budget import OutputBudget, preview, PARTIAL_ROWS
+from sampling import SAMPLE_SEED, sample_units, shown
+import pyarrow as pa
 import pyarrow.parquet as pq
 import numpy as np
 
-def convert_value(val):
-    """Convert numpy/arrow types to JSON-serializable format"""
-    if isinstance(val, (np.integer, np.int64, np.int32)):
-        return int(val)
-    if isinstance(val, (np.floating, np.float64, np.float32)):
-        return float(val)
-    if isinstance(val, np.ndarray):
-        return val.tolist()
-    if isinstance(val, bytes):
-        try:
-            return val.decode('utf-8')
-        except:
-            return f"<bytes: {len(val)} bytes>"
-    if pd.isna(val):
-        return None
-    return val
+def read_sample(parquet_file, n=1000):
+    """Read n random rows, decoding only the row groups they fall in (one at a time)"""
+    metadata = parquet_file.metadata
+    group_rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    starts = np.cumsum([0] + group_rows[:-1])
+    tables = []
+    rows = []
+    for group, offsets in sample_units(group_rows, n):
+        tables.append(parquet_file.read_row_group(group).take(offsets))
+        rows.extend(int(starts[group] + offset) for offset in offsets)
+    return pa.concat_tables(tables).to_pandas(), rows
+
+def read_leading_rows(parquet_file, file_metadata, n=1000):
+    """Read the first n rows, decoding only the row groups they fall in.
+
+    The first PARTIAL_ROWS are reported as a partial result as soon as they are
+    read, as decoding a large first row group can take a while.
+    """
+    batches = []
+    rows = 0
+    for batch in parquet_file.iter_batches(batch_size=PARTIAL_ROWS):
+        if not batches:
+            partial(preview({"file_type": "parquet", "metadata": file_metadata, "data": batch.to_pylist()}))
+        batches.append(batch.slice(0, n - rows))
+        rows += batches[-1].num_rows
+        if rows >= n:
+            break
+    return pa.Table.from_batches(batches, schema=parquet_file.schema_arrow).to_pandas()
 
 def main():
     if len(sys.argv) != 2:
@@ -29,46 +46,70 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
         import pandas as pd
-        
-        # Read parquet file
-        df = pd.read_parquet(file_path)
+        perf.mark('imports')
         
         # Get metadata
         parquet_file = pq.ParquetFile(file_path)
         metadata = parquet_file.metadata
+        file_metadata = {
+            "num_rows": metadata.num_rows,
+            "num_columns": metadata.num_columns,
+            "num_row_groups": metadata.num_row_groups,
+            "format_version": metadata.format_version,
+            "created_by": metadata.created_by
+        }
+        perf.mark('open')
+        
+        # Only the rows shown are read; the estimate is for the note when the whole file would not fit
+        estimated_bytes = PANDAS_EXPANSION * sum(
+            metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups)
+        )
+        sampled_rows = None
+        if SAMPLE_SEED is not None and metadata.num_rows > 1000:
+            df, sampled_rows = read_sample(parquet_file)
+        else:
+            df = read_leading_rows(parquet_file, file_metadata)
+            if not budget.allows(estimated_bytes):
+                budget.skip("rows", estimated_bytes, "Read the first 1000 rows only")
+        num_rows = metadata.num_rows
+        perf.mark('read')
         
         # Convert to JSON
-        if len(df) > 1000:
+        if num_rows > 1000:
             data_records = df.head(1000).to_dict(orient='records')
-            note = f"DataFrame truncated. Showing first 1000 of {len(df)} rows"
+            note = f"DataFrame truncated. Showing {shown(1000)} of {num_rows} rows"
         else:
             data_records = df.to_dict(orient='records')
             note = None
         
         result = {
             "file_type": "parquet",
-            "metadata": {
-                "num_rows": metadata.num_rows,
-                "num_columns": metadata.num_columns,
-                "num_row_groups": metadata.num_row_groups,
-                "format_version": metadata.format_version,
-                "created_by": metadata.created_by
-            },
+            "metadata": file_metadata,
             "schema": {
                 "columns": df.columns.tolist(),
                 "dtypes": {k: str(v) for k, v in df.dtypes.items()}
             },
-            "shape": df.shape,
+            "shape": (num_rows, df.shape[1]),
             "data": data_records
         }
         
         if note:
             result["_note"] = note
+            if sampled_rows is not None:
+                result["sample_rows"] = sampled_rows
+        output = OutputBudget()
+        result = output.fit(result)
+        perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2, default=str))
+        budget.report(result)
+        output.report(result)
+        perf.emit(result, default=str)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load Parquet file: {str(e)}",
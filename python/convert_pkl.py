@@ -3,16 +3,72 @@
 
 import sys
 import json
+from perf import PerfRecorder
+from memory_budget import MemoryBudget, OBJECT_EXPANSION
+from compressed import open_input, data_size
+from sampling import preview_elements, preview_rows, shown
+from output_budget import OutputBudget, Sliced
 import pickle
 import math
-import numpy as np
 from datetime import datetime, date
 
-def convert_to_serializable(obj, max_depth=10, current_depth=0):
-    """Convert Python objects to JSON-serializable format"""
-    
-    if current_depth > max_depth:
-        return f"<Max depth reached: {type(obj).__name__}>"
+def convert_array(arr, n):
+    """Convert numpy array to JSON-serializable format, showing at most n elements"""
+    np = sys.modules['numpy']
+    complex_values = np.iscomplexobj(arr)
+    elements = arr.flatten() if arr.size <= n else preview_elements(arr, n)
+    # Elements are converted by the output budget, which handles NaN/Infinity
+    values = [{"real": float(x.real), "imag": float(x.imag)} for x in elements] if complex_values else list(elements)
+    if arr.size <= n:
+        return {
+            "_type": "numpy.ndarray",
+            "dtype": str(arr.dtype),
+            "shape": list(arr.shape),
+            "data": values
+        }
+    kind = "Complex array" if complex_values else "Array"
+    return {
+        "_type": "numpy.ndarray",
+        "dtype": str(arr.dtype),
+        "shape": list(arr.shape),
+        "size": int(arr.size),
+        "preview": values,
+        "_note": f"{kind} truncated. Showing {shown(n)} of {arr.size} elements"
+    }
+
+def convert_frame(df, n):
+    """Convert pandas DataFrame to JSON-serializable format, showing at most n rows"""
+    np = sys.modules['numpy']
+    rows = df if len(df) <= n else preview_rows(df, n)
+    # Replace NaN with None for JSON compatibility
+    records = rows.replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"}).to_dict(orient='records')
+    if len(df) <= n:
+        return {
+            "_type": "pandas.DataFrame",
+            "shape": list(df.shape),
+            "columns": df.columns.tolist(),
+            "data": records
+        }
+    return {
+        "_type": "pandas.DataFrame",
+        "shape": list(df.shape),
+        "columns": df.columns.tolist(),
+        "dtypes": {str(k): str(v) for k, v in df.dtypes.items()},
+        "preview": records,
+        "_note": f"DataFrame truncated. Showing {shown(n)} of {len(df)} rows"
+    }
+
+def convert_series(series, n):
+    np = sys.modules['numpy']
+    # Replace NaN with None for JSON compatibility
+    return series.iloc[:n].replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"}).tolist()
+
+def expand(obj):
+    """Convert one level of a Python object to JSON-serializable format.
+
+    Containers keep their items as they are; OutputBudget.fit converts those in
+    turn, as far as the output budget allows (see output_budget.py).
+    """
     
     # Handle None
     if obj is None:
@@ -30,63 +86,25 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
             return "Infinity" if obj > 0 else "-Infinity"
         return obj
     
+    # numpy and pandas objects can only be present if unpickling imported those
+    # libraries, so they are looked up rather than imported (saves their import
+    # time for plain-Python pickles)
+    np = sys.modules.get('numpy')
+    pd = sys.modules.get('pandas')
+    
     # Handle numpy types
-    if isinstance(obj, np.integer):
+    if np is not None and isinstance(obj, np.integer):
         return int(obj)
-    if isinstance(obj, np.floating):
-        val = float(obj)
-        if math.isnan(val):
-            return None  # Convert NaN to null
-        elif math.isinf(val):
-            return "Infinity" if val > 0 else "-Infinity"
-        return val
-    if isinstance(obj, (complex, np.complexfloating)):
+    if np is not None and isinstance(obj, np.floating):
+        return expand(float(obj))
+    if isinstance(obj, complex) or (np is not None and isinstance(obj, np.complexfloating)):
         return {
             "_type": "complex",
             "real": float(obj.real),
             "imag": float(obj.imag)
         }
-    if isinstance(obj, np.ndarray):
-        # Handle complex arrays
-        if np.iscomplexobj(obj):
-            if obj.size > 1000:
-                preview = obj.flatten()[:100]
-                return {
-                    "_type": "numpy.ndarray",
-                    "dtype": str(obj.dtype),
-                    "shape": obj.shape,
-                    "size": int(obj.size),
-                    "preview": [{"real": float(x.real), "imag": float(x.imag)} for x in preview],
-                    "_note": f"Complex array truncated. Showing first 100 of {obj.size} elements"
-                }
-            return {
-                "_type": "numpy.ndarray",
-                "dtype": str(obj.dtype),
-                "shape": obj.shape,
-                "data": [{"real": float(x.real), "imag": float(x.imag)} for x in obj.flatten()]
-            }
-        
-        # Handle regular arrays
-        if obj.size > 1000:
-            preview = obj.flatten()[:100]
-            # Convert each element to handle NaN/Infinity
-            preview_list = [convert_to_serializable(x, max_depth, current_depth + 1) for x in preview]
-            return {
-                "_type": "numpy.ndarray",
-                "dtype": str(obj.dtype),
-                "shape": obj.shape,
-                "size": int(obj.size),
-                "preview": preview_list,
-                "_note": f"Array truncated. Showing first 100 of {obj.size} elements"
-            }
-        # Convert each element to handle NaN/Infinity
-        data_list = [convert_to_serializable(x, max_depth, current_depth + 1) for x in obj.flatten()]
-        return {
-            "_type": "numpy.ndarray",
-            "dtype": str(obj.dtype),
-            "shape": obj.shape,
-            "data": data_list
-        }
+    if np is not None and isinstance(obj, np.ndarray):
+        return Sliced(obj.size, lambda n: convert_array(obj, n), 'elements')
     
     # Handle datetime
     if isinstance(obj, (datetime, date)):
@@ -101,57 +119,32 @@ def convert_to_serializable(obj, max_depth=10, current_depth=0):
     
     # Handle dict
     if isinstance(obj, dict):
-        return {
-            str(k): convert_to_serializable(v, max_depth, current_depth + 1)
-            for k, v in obj.items()
-        }
+        return {str(k): v for k, v in obj.items()}
     
     # Handle list, tuple, set
-    if isinstance(obj, (list, tuple, set)):
-        result = [convert_to_serializable(item, max_depth, current_depth + 1) for item in obj]
-        if isinstance(obj, tuple):
-            return {"_type": "tuple", "data": result}
-        elif isinstance(obj, set):
-            return {"_type": "set", "data": result}
-        return result
+    if isinstance(obj, list):
+        return obj
+    if isinstance(obj, tuple):
+        return {"_type": "tuple", "data": list(obj)}
+    if isinstance(obj, (set, frozenset)):
+        return {"_type": "set", "data": list(obj)}
     
     # Handle pandas DataFrame
-    try:
-        import pandas as pd
+    if pd is not None:
         if isinstance(obj, pd.DataFrame):
-            # Replace NaN with None for JSON compatibility
-            obj_clean = obj.replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"})
-            if len(obj) > 1000:
-                return {
-                    "_type": "pandas.DataFrame",
-                    "shape": obj.shape,
-                    "columns": obj.columns.tolist(),
-                    "dtypes": {k: str(v) for k, v in obj.dtypes.items()},
-                    "preview": obj_clean.head(100).to_dict(orient='records'),
-                    "_note": f"DataFrame truncated. Showing first 100 of {len(obj)} rows"
-                }
-            return {
-                "_type": "pandas.DataFrame",
-                "shape": obj.shape,
-                "columns": obj.columns.tolist(),
-                "data": obj_clean.to_dict(orient='records')
-            }
+            return Sliced(len(obj), lambda n: convert_frame(obj, n), 'rows')
         if isinstance(obj, pd.Series):
-            # Replace NaN with None for JSON compatibility
-            series_clean = obj.replace({np.nan: None, np.inf: "Infinity", -np.inf: "-Infinity"})
             return {
                 "_type": "pandas.Series",
                 "name": obj.name,
-                "data": series_clean.tolist()
+                "data": Sliced(len(obj), lambda n: convert_series(obj, n), 'elements')
             }
-    except ImportError:
-        pass
     
     # Handle custom objects
     if hasattr(obj, '__dict__'):
         return {
             "_type": f"{type(obj).__module__}.{type(obj).__name__}",
-            "_attributes": convert_to_serializable(obj.__dict__, max_depth, current_depth + 1)
+            "_attributes": obj.__dict__
         }
     
     # Fallback
@@ -163,17 +156,33 @@ def main():
         sys.exit(1)
     
     file_path = sys.argv[1]
+    perf = PerfRecorder()
+    perf.mark('imports')
+    budget = MemoryBudget()
     
     try:
-        with open(file_path, 'rb') as f:
+        # A pickle can only be loaded whole, so refuse files that would not fit
+        estimated_bytes = OBJECT_EXPANSION * data_size(file_path)
+        if not budget.allows(estimated_bytes):
+            budget.skip("file", estimated_bytes, "Not loaded")
+            result = budget.report({"file_type": "pickle", "data": None})
+            perf.emit(result)
+            return
+        
+        with open_input(file_path) as f:
+            perf.mark('open')
             data = pickle.load(f)
+        perf.mark('read')
         
+        output = OutputBudget()
         result = {
             "file_type": "pickle",
-            "data": convert_to_serializable(data)
+            "data": output.fit(data, expand)
         }
+        perf.mark('sanitize')
         
-        print(json.dumps(result, indent=2))
+        output.report(result)
+        perf.emit(result)
     except Exception as e:
         print(json.dumps({
             "error": f"Failed to load pickle file: {str(e)}",
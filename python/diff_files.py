@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""Compare two data files of the same format: structure first, then content
+
+Content is compared by hashing the raw storage units of both files in
+parallel, without decoding them:
+    Parquet  - every column chunk of every row group
+    HDF5     - every chunk of a chunked dataset (located with the chunk index),
+               or row-aligned byte ranges of a contiguous one. NetCDF-4 files
+               are HDF5 files and are compared the same way.
+    NumPy    - row-aligned byte ranges of .npy data; .npz members by the
+               CRC-32 the zip archive already stores
+Only units whose hashes differ are decoded, and their rows/elements are
+compared to report the actual differences. Arrow/Feather and Avro files (and
+Parquet files whose row groups are laid out differently) are compared as
+decoded record batches; other formats by a whole-file hash.
+
+Progress goes to stderr; the result is one JSON object on stdout.
+
+Usage: diff_files.py <left> <right> [--max-differences N]
+"""
+
+import os
+import sys
+import json
+import math
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from perf import progress
+
+DEFAULT_MAX_DIFFERENCES = 200
+# Row groups whose sizes differ that are listed one by one
+MAX_LISTED_GROUPS = 10
+# Size of the byte ranges contiguous data is hashed in
+RANGE_BYTES = 16 * 1024 * 1024
+READ_BYTES = 4 * 1024 * 1024
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+
+TABLE_EXTENSIONS = ('.parquet', '.arrow', '.feather', '.avro')
+HDF5_EXTENSIONS = ('.h5', '.hdf5', '.nc', '.nc4', '.netcdf')
+
+
+# --- Hashing --------------------------------------------------------------
+
+def hash_range(file_path, offset, length):
+    """BLAKE2 digest of length bytes at offset; hashlib releases the GIL, so ranges hash in parallel"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            block = f.read(min(READ_BYTES, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def hash_ranges(pool, left_path, left_ranges, right_path, right_ranges):
+    """Hash (offset, length) ranges of both files concurrently; returns (left digests, right digests)"""
+    left = [pool.submit(hash_range, left_path, offset, length) for offset, length in left_ranges]
+    right = [pool.submit(hash_range, right_path, offset, length) for offset, length in right_ranges]
+    return [future.result() for future in left], [future.result() for future in right]
+
+
+# --- Result ---------------------------------------------------------------
+
+class Report:
+    """Collects structural and content differences, capping how many rows/elements are listed"""
+
+    def __init__(self, max_differences):
+        self.max_differences = max_differences
+        self.structure = []
+        self.units = []
+        self.compared = 0
+        self.hash_equal = 0
+        self.listed = 0
+        self.truncated = False
+
+    def structure_difference(self, item, left, right):
+        self.structure.append({"item": item, "left": sanitize(left), "right": sanitize(right)})
+
+    def room(self):
+        return max(0, self.max_differences - self.listed)
+
+    def opaque(self, name, note):
+        """Record a unit that differs but cannot be compared value by value"""
+        self.units.append({
+            "unit": name,
+            "differences": [],
+            "total_differences": None,
+            "identical_after_decoding": False,
+            "_note": note
+        })
+
+    def unit(self, name, differences, total_differences):
+        """Record a decoded unit; differences are the listed rows/elements"""
+        self.units.append({
+            "unit": name,
+            "differences": differences,
+            "total_differences": int(total_differences),
+            # The raw bytes differed but the values are the same (e.g. other compression)
+            "identical_after_decoding": total_differences == 0
+        })
+        self.listed += len(differences)
+        if len(differences) < total_differences:
+            self.truncated = True
+
+    def result(self, fmt, left, right, unit_name):
+        different = [unit for unit in self.units if not unit["identical_after_decoding"]]
+        return {
+            "format": fmt,
+            "left": left,
+            "right": right,
+            "identical": not self.structure and not different,
+            "structure": self.structure,
+            "content": {
+                "unit": unit_name,
+                "compared": self.compared,
+                "hash_equal": self.hash_equal,
+                "decoded": len(self.units),
+                "different": len(different),
+                "units": self.units,
+                "truncated": self.truncated
+            }
+        }
+
+
+def sanitize(value):
+    """Make numpy/Arrow values JSON-serializable"""
+    if hasattr(value, 'tolist'):
+        value = value.tolist()
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        return value
+    if isinstance(value, complex):
+        return {"real": sanitize(value.real), "imag": sanitize(value.imag)}
+    if isinstance(value, dict):
+        return {str(k): sanitize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(v) for v in value]
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return f"<bytes: {len(value)} bytes>"
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# --- Arrays (NumPy, HDF5) -------------------------------------------------
+
+def element_differences(left, right, start, shape, report, order='C'):
+    """Compare two equally shaped array blocks; start is the block's position in the full array.
+
+    Returns (listed differences, total number of differing elements).
+    """
+    import numpy as np
+    left = np.asarray(left)
+    right = np.asarray(right)
+    with np.errstate(invalid='ignore'):
+        mask = left != right
+        if left.dtype.kind in 'fc' and right.dtype.kind in 'fc':
+            mask &= ~(np.isnan(left) & np.isnan(right))
+    mask = np.asarray(mask)
+    total = int(np.count_nonzero(mask))
+    positions = np.argwhere(mask)[:report.room()]
+    differences = []
+    for position in positions:
+        index = tuple(int(s + p) for s, p in zip(start, position))
+        if shape is not None and len(index) == 1 and len(shape) > 1:
+            # A flat range of storage; report the element's index in the array
+            index = tuple(int(i) for i in np.unravel_index(index[0], shape, order=order))
+        differences.append({
+            "index": list(index),
+            "left": sanitize(left[tuple(position)]),
+            "right": sanitize(right[tuple(position)])
+        })
+    return differences, total
+
+
+def row_ranges(shape, itemsize):
+    """Split an array into blocks of whole rows of about RANGE_BYTES; yields (first row, end row)"""
+    rows = shape[0] if shape else 1
+    row_bytes = max(1, math.prod(shape[1:]) * itemsize) if shape else itemsize
+    step = max(1, RANGE_BYTES // row_bytes)
+    for first in range(0, rows, step):
+        yield first, min(rows, first + step)
+
+
+# --- NumPy ----------------------------------------------------------------
+
+def read_npy_header(file_path):
+    """Return (shape, fortran_order, dtype, data offset) from a .npy header"""
+    import numpy as np
+    with open(file_path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        return shape, fortran_order, dtype, f.tell()
+
+
+def compare_npy(left, right, pool, report):
+    import numpy as np
+    left_shape, left_fortran, left_dtype, left_offset = read_npy_header(left)
+    right_shape, right_fortran, right_dtype, right_offset = read_npy_header(right)
+    for item, a, b in (("shape", left_shape, right_shape), ("dtype", str(left_dtype), str(right_dtype)),
+                       ("fortran_order", left_fortran, right_fortran)):
+        if a != b:
+            report.structure_difference(item, a, b)
+    if report.structure:
+        return "byte range"
+    if left_dtype.hasobject:
+        # Pickled object arrays have no fixed-size elements to line up
+        return compare_whole_files(left, right, pool, report)
+
+    # Flat element ranges in storage order
+    size = math.prod(left_shape)
+    element_ranges = list(row_ranges((size,), left_dtype.itemsize))
+    left_ranges = [(left_offset + first * left_dtype.itemsize, (end - first) * left_dtype.itemsize) for first, end in element_ranges]
+    right_ranges = [(right_offset + first * left_dtype.itemsize, (end - first) * left_dtype.itemsize) for first, end in element_ranges]
+    progress(f"Hashing {len(element_ranges)} byte ranges", force=True)
+    left_hashes, right_hashes = hash_ranges(pool, left, left_ranges, right, right_ranges)
+
+    left_data = np.memmap(left, dtype=left_dtype, mode='r', offset=left_offset, shape=(size,))
+    right_data = np.memmap(right, dtype=left_dtype, mode='r', offset=right_offset, shape=(size,))
+    order = 'F' if left_fortran else 'C'
+    for (first, end), a, b in zip(element_ranges, left_hashes, right_hashes):
+        report.compared += 1
+        if a == b:
+            report.hash_equal += 1
+            continue
+        differences, total = element_differences(left_data[first:end], right_data[first:end], (first,), left_shape, report, order)
+        report.unit(f"elements {first}-{end - 1}", differences, total)
+    return "byte range"
+
+
+def compare_npz(left, right, report):
+    """Members with the same CRC-32 and size (from the zip directory) are equal without reading them"""
+    import zipfile
+    import numpy as np
+    with zipfile.ZipFile(left) as left_zip, zipfile.ZipFile(right) as right_zip:
+        left_members = {info.filename: info for info in left_zip.infolist()}
+        right_members = {info.filename: info for info in right_zip.infolist()}
+    for name in sorted(set(left_members) ^ set(right_members)):
+        report.structure_difference(f"member {name}", "present" if name in left_members else "missing",
+                                    "present" if name in right_members else "missing")
+
+    left_arrays = np.load(left)
+    right_arrays = np.load(right)
+    for name in sorted(set(left_members) & set(right_members)):
+        report.compared += 1
+        a, b = left_members[name], right_members[name]
+        if a.CRC == b.CRC and a.file_size == b.file_size:
+            report.hash_equal += 1
+            continue
+        key = name[:-4] if name.endswith('.npy') else name
+        progress(f"Comparing member {key}", force=True)
+        left_array, right_array = left_arrays[key], right_arrays[key]
+        if left_array.shape != right_array.shape or left_array.dtype != right_array.dtype:
+            report.structure_difference(f"member {key}", f"{left_array.dtype} {left_array.shape}",
+                                        f"{right_array.dtype} {right_array.shape}")
+            continue
+        differences, total = element_differences(left_array, right_array, (0,) * left_array.ndim, None, report)
+        report.unit(f"member {key}", differences, total)
+    return "member"
+
+
+# --- HDF5 -----------------------------------------------------------------
+
+def hdf5_items(f):
+    """Map path -> h5py object for every group and dataset in the file"""
+    import h5py
+    items = {'/': f}
+    f.visititems(lambda name, obj: items.__setitem__('/' + name, obj) if isinstance(obj, (h5py.Group, h5py.Dataset)) else None)
+    return items
+
+
+def storage_layout(dataset):
+    """What must match for the raw chunks of two datasets to be comparable byte for byte"""
+    return (dataset.chunks, dataset.compression, dataset.compression_opts, dataset.shuffle,
+            dataset.fletcher32, dataset.scaleoffset, str(dataset.dtype))
+
+
+def chunk_index(dataset):
+    """Map chunk offset -> (byte offset, size) for every allocated chunk"""
+    chunks = {}
+    if hasattr(dataset.id, 'chunk_iter'):
+        # One pass over the chunk index (HDF5 1.12.3+); get_chunk_info(i) searches it from the start
+        dataset.id.chunk_iter(lambda info: chunks.__setitem__(tuple(info.chunk_offset), (info.byte_offset, info.size)))
+    else:
+        for i in range(dataset.id.get_num_chunks()):
+            info = dataset.id.get_chunk_info(i)
+            chunks[tuple(info.chunk_offset)] = (info.byte_offset, info.size)
+    return chunks
+
+
+def compare_dataset_blocks(path, left, right, blocks, report):
+    """Decode and compare the given blocks (tuples of slices) of two datasets"""
+    for block in blocks:
+        start = tuple(s.start for s in block)
+        differences, total = element_differences(left[block], right[block], start, None, report)
+        report.unit(f"{path} [{', '.join(f'{s.start}:{s.stop}' for s in block)}]", differences, total)
+
+
+def compare_dataset(path, left_path, left, right_path, right, pool, report):
+    if left.shape != right.shape or left.dtype != right.dtype:
+        report.structure_difference(f"{path} (dataset)", f"{left.dtype} {left.shape}", f"{right.dtype} {right.shape}")
+        return
+    if not left.shape:
+        report.compared += 1
+        differences, total = element_differences(left[()], right[()], (), None, report)
+        if total:
+            report.unit(path, differences, total)
+        return
+
+    progress(f"Comparing {path}", force=True)
+    if left.chunks and storage_layout(left) == storage_layout(right) and left.dtype.kind != 'O':
+        left_chunks, right_chunks = chunk_index(left), chunk_index(right)
+        offsets = sorted(set(left_chunks) | set(right_chunks))
+        # Chunks allocated in only one file are compared by value (the other holds the fill value)
+        hashed = [offset for offset in offsets if offset in left_chunks and offset in right_chunks]
+        left_hashes, right_hashes = hash_ranges(
+            pool, left_path, [left_chunks[offset] for offset in hashed],
+            right_path, [right_chunks[offset] for offset in hashed]
+        )
+        equal = {offset for offset, a, b in zip(hashed, left_hashes, right_hashes) if a == b}
+        report.compared += len(offsets)
+        report.hash_equal += len(equal)
+        blocks = [
+            tuple(slice(o, min(o + c, s)) for o, c, s in zip(offset, left.chunks, left.shape))
+            for offset in offsets if offset not in equal
+        ]
+        compare_dataset_blocks(path, left, right, blocks, report)
+        return
+
+    row_blocks = list(row_ranges(left.shape, left.dtype.itemsize))
+    left_offset, right_offset = left.id.get_offset(), right.id.get_offset()
+    if not left.chunks and not right.chunks and left_offset is not None and right_offset is not None \
+            and left.dtype.kind != 'O' and left.id.get_storage_size() == right.id.get_storage_size():
+        # Contiguous data: hash row-aligned byte ranges
+        row_bytes = math.prod(left.shape[1:]) * left.dtype.itemsize
+        left_hashes, right_hashes = hash_ranges(
+            pool, left_path, [(left_offset + first * row_bytes, (end - first) * row_bytes) for first, end in row_blocks],
+            right_path, [(right_offset + first * row_bytes, (end - first) * row_bytes) for first, end in row_blocks]
+        )
+        differing = [rows for rows, a, b in zip(row_blocks, left_hashes, right_hashes) if a != b]
+        report.compared += len(row_blocks)
+        report.hash_equal += len(row_blocks) - len(differing)
+    else:
+        # Different chunking/filters or variable-length data: compare values block by block
+        differing = row_blocks
+        report.compared += len(row_blocks)
+    blocks = [(slice(first, end),) + tuple(slice(0, s) for s in left.shape[1:]) for first, end in differing]
+    compare_dataset_blocks(path, left, right, blocks, report)
+
+
+def compare_hdf5(left, right, pool, report):
+    import h5py
+    with h5py.File(left, 'r') as left_file, h5py.File(right, 'r') as right_file:
+        left_items, right_items = hdf5_items(left_file), hdf5_items(right_file)
+        for path in sorted(set(left_items) ^ set(right_items)):
+            report.structure_difference(path, "present" if path in left_items else "missing",
+                                        "present" if path in right_items else "missing")
+        for path in sorted(set(left_items) & set(right_items)):
+            a, b = left_items[path], right_items[path]
+            if isinstance(a, h5py.Dataset) != isinstance(b, h5py.Dataset):
+                report.structure_difference(path, type(a).__name__, type(b).__name__)
+                continue
+            left_attrs = {k: str(v) for k, v in a.attrs.items()}
+            right_attrs = {k: str(v) for k, v in b.attrs.items()}
+            for name in sorted(set(left_attrs) | set(right_attrs)):
+                if left_attrs.get(name) != right_attrs.get(name):
+                    report.structure_difference(f"{path} @{name}", left_attrs.get(name), right_attrs.get(name))
+            if isinstance(a, h5py.Dataset):
+                compare_dataset(path, left, a, right, b, pool, report)
+    return "chunk"
+
+
+# --- Tables (Parquet, Arrow/Feather, Avro) --------------------------------
+
+def column_differences(left, right):
+    """Row positions where two Arrow columns differ (nulls and NaNs equal themselves)"""
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    try:
+        equal = pc.equal(left, right)
+        both_null = pc.and_(pc.is_null(left), pc.is_null(right))
+        equal = pc.or_(pc.fill_null(equal, False), both_null)
+        if pa.types.is_floating(left.type):
+            equal = pc.or_(equal, pc.fill_null(pc.and_(pc.is_nan(left), pc.is_nan(right)), False))
+        return np.flatnonzero(~equal.to_numpy(zero_copy_only=False))
+    except (pa.ArrowNotImplementedError, pa.ArrowInvalid, pa.ArrowTypeError):
+        # Nested types: compare the Python values
+        left_values, right_values = left.to_pylist(), right.to_pylist()
+        return np.array([i for i, (a, b) in enumerate(zip(left_values, right_values))
+                         if sanitize(a) != sanitize(b)], dtype=np.int64)
+
+
+def row_differences(left, right, offset, report, columns=None):
+    """Compare two aligned record batches/tables; returns (listed differences, differing rows)"""
+    import numpy as np
+    columns = left.schema.names if columns is None else columns
+    per_column = {name: column_differences(left.column(name), right.column(name)) for name in columns}
+    rows = np.unique(np.concatenate([positions for positions in per_column.values()] or [np.empty(0, dtype=np.int64)]))
+    differences = []
+    for row in rows[:report.room()]:
+        differing = [name for name in columns if np.isin(row, per_column[name])]
+        differences.append({
+            "row": int(offset + row),
+            "columns": {
+                name: {
+                    "left": sanitize(left.column(name)[int(row)].as_py()),
+                    "right": sanitize(right.column(name)[int(row)].as_py())
+                } for name in differing
+            }
+        })
+    return differences, len(rows)
+
+
+def aligned_batches(left_batches, right_batches):
+    """Pair up two streams of (offset, batch) into equally long slices; yields (offset, left, right)"""
+    left = right = None
+    offset = 0
+    while True:
+        while left is None or left.num_rows == 0:
+            left = next(left_batches, (None, None))[1]
+            if left is None:
+                return
+        while right is None or right.num_rows == 0:
+            right = next(right_batches, (None, None))[1]
+            if right is None:
+                return
+        n = min(left.num_rows, right.num_rows)
+        yield offset, left.slice(0, n), right.slice(0, n)
+        left, right = left.slice(n), right.slice(n)
+        offset += n
+
+
+def compare_schemas(left_schema, right_schema, report):
+    compare_fields({field.name: str(field.type) for field in left_schema},
+                   {field.name: str(field.type) for field in right_schema}, report)
+
+
+def compare_fields(left_fields, right_fields, report):
+    """Report columns missing on one side or typed differently (types as strings by name)"""
+    for name in list(left_fields) + [name for name in right_fields if name not in left_fields]:
+        if left_fields.get(name) != right_fields.get(name):
+            report.structure_difference(f"column {name}", left_fields.get(name, "missing"), right_fields.get(name, "missing"))
+
+
+def compare_decoded_tables(left, right, report, count_rows=True):
+    """Compare two tabular files batch by batch in decoded form, aligning rows by position"""
+    from table_source import iter_batches
+    counts = [0, 0]
+
+    def counted(batches, side):
+        for offset, batch in batches:
+            counts[side] += batch.num_rows
+            yield offset, batch
+
+    left_batches, right_batches = counted(iter_batches(left), 0), counted(iter_batches(right), 1)
+    for offset, a, b in aligned_batches(left_batches, right_batches):
+        progress(f"Compared {offset:,} rows")
+        report.compared += 1
+        shared = [name for name in a.schema.names
+                  if name in b.schema.names and a.schema.field(name).type == b.schema.field(name).type]
+        differences, total = row_differences(a, b, offset, report, shared)
+        if total:
+            report.unit(f"rows {offset}-{offset + a.num_rows - 1}", differences, total)
+    if count_rows:
+        # Run the longer file to its end to count its rows
+        for _ in left_batches:
+            pass
+        for _ in right_batches:
+            pass
+        if counts[0] != counts[1]:
+            report.structure_difference("num_rows", counts[0], counts[1])
+    return "batch"
+
+
+def column_chunk_range(column):
+    """(offset, length) of a column chunk's pages, including its dictionary page"""
+    start = column.data_page_offset
+    if column.has_dictionary_page and column.dictionary_page_offset is not None:
+        start = column.dictionary_page_offset
+    return start, column.total_compressed_size
+
+
+def compare_parquet(left, right, pool, report):
+    import numpy as np
+    import pyarrow.parquet as pq
+    left_file, right_file = pq.ParquetFile(left), pq.ParquetFile(right)
+    left_meta, right_meta = left_file.metadata, right_file.metadata
+    compare_schemas(left_file.schema_arrow, right_file.schema_arrow, report)
+    if left_meta.num_rows != right_meta.num_rows:
+        report.structure_difference("num_rows", left_meta.num_rows, right_meta.num_rows)
+
+    left_groups = [left_meta.row_group(i).num_rows for i in range(left_meta.num_row_groups)]
+    right_groups = [right_meta.row_group(i).num_rows for i in range(right_meta.num_row_groups)]
+    if left_groups != right_groups:
+        # Rewritten with other row group sizes: chunks don't line up, compare decoded rows
+        if len(left_groups) != len(right_groups):
+            report.structure_difference("row_groups", len(left_groups), len(right_groups))
+        resized = [i for i, (a, b) in enumerate(zip(left_groups, right_groups)) if a != b]
+        for i in resized[:MAX_LISTED_GROUPS]:
+            report.structure_difference(f"row group {i} num_rows", left_groups[i], right_groups[i])
+        if len(resized) > MAX_LISTED_GROUPS:
+            report.structure_difference(f"row group num_rows ({len(resized) - MAX_LISTED_GROUPS} more differ)", "…", "…")
+        return compare_decoded_tables(left, right, report, count_rows=False)
+
+    # One unit per column chunk present in both files with the same physical type
+    units = []
+    for group in range(len(left_groups)):
+        left_group, right_group = left_meta.row_group(group), right_meta.row_group(group)
+        right_columns = {right_group.column(j).path_in_schema: right_group.column(j) for j in range(right_group.num_columns)}
+        for j in range(left_group.num_columns):
+            left_column = left_group.column(j)
+            right_column = right_columns.get(left_column.path_in_schema)
+            if right_column is not None and right_column.physical_type == left_column.physical_type:
+                units.append((group, left_column.path_in_schema, column_chunk_range(left_column), column_chunk_range(right_column)))
+    progress(f"Hashing {len(units)} column chunks", force=True)
+    left_hashes, right_hashes = hash_ranges(pool, left, [unit[2] for unit in units], right, [unit[3] for unit in units])
+    report.compared = len(units)
+
+    differing = {}
+    for (group, path, _, _), a, b in zip(units, left_hashes, right_hashes):
+        if a == b:
+            report.hash_equal += 1
+        else:
+            # Nested columns are read through their top-level field
+            differing.setdefault(group, set()).add(path.split('.')[0])
+
+    starts = np.cumsum([0] + left_groups[:-1])
+    for group, columns in sorted(differing.items()):
+        progress(f"Comparing row group {group}", force=True)
+        columns = sorted(columns)
+        a = left_file.read_row_group(group, columns=columns)
+        b = right_file.read_row_group(group, columns=columns)
+        shared = [name for name in columns
+                  if name in b.schema.names and a.schema.field(name).type == b.schema.field(name).type]
+        differences, total = row_differences(a, b, int(starts[group]), report, shared)
+        report.unit(f"row group {group} ({', '.join(columns)})", differences, total)
+    return "column chunk"
+
+
+def compare_arrow(left, right, report):
+    from table_source import open_arrow
+    left_schema, _ = open_arrow(left)
+    right_schema, _ = open_arrow(right)
+    compare_schemas(left_schema, right_schema, report)
+    return compare_decoded_tables(left, right, report)
+
+
+def compare_avro(left, right, report):
+    from table_source import read_avro_schema
+    # The writer schemas in the headers, not types inferred from decoded records (a
+    # field that is null throughout the first batch would have type null)
+    left_schema, right_schema = read_avro_schema(left), read_avro_schema(right)
+    compare_fields({field['name']: json.dumps(field['type']) for field in left_schema.get('fields', [])},
+                   {field['name']: json.dumps(field['type']) for field in right_schema.get('fields', [])}, report)
+    return compare_decoded_tables(left, right, report)
+
+
+# --- Other formats --------------------------------------------------------
+
+def compare_whole_files(left, right, pool, report):
+    """Byte comparison for formats without a row-level diff"""
+    left_size, right_size = os.path.getsize(left), os.path.getsize(right)
+    if left_size != right_size:
+        report.structure_difference("file_size", left_size, right_size)
+    size = min(left_size, right_size)
+    ranges = [(offset, min(RANGE_BYTES, size - offset)) for offset in range(0, size, RANGE_BYTES)]
+    left_hashes, right_hashes = hash_ranges(pool, left, ranges, right, ranges)
+    report.compared = len(ranges)
+    report.hash_equal = sum(a == b for a, b in zip(left_hashes, right_hashes))
+    if report.hash_equal < len(ranges):
+        first = next(i for i, (a, b) in enumerate(zip(left_hashes, right_hashes)) if a != b)
+        report.opaque(f"bytes from {first * RANGE_BYTES}",
+                      f"{len(ranges) - report.hash_equal} of {len(ranges)} byte ranges differ; "
+                      "row-level comparison is not available for this format")
+    return "byte range"
+
+
+def file_format(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == '.parquet':
+        return 'parquet'
+    if ext in ('.arrow', '.feather'):
+        return 'arrow'
+    if ext == '.avro':
+        return 'avro'
+    if ext in ('.npy', '.npz'):
+        return ext[1:]
+    if ext in HDF5_EXTENSIONS:
+        import h5py
+        # NetCDF-3 files are not HDF5
+        return 'hdf5' if h5py.is_hdf5(file_path) else 'file'
+    return 'file'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two data files")
+    parser.add_argument('left')
+    parser.add_argument('right')
+    parser.add_argument('--max-differences', type=int, default=DEFAULT_MAX_DIFFERENCES)
+    args = parser.parse_args()
+
+    report = Report(args.max_differences)
+    try:
+        fmt = file_format(args.left)
+        if file_format(args.right) != fmt or (fmt == 'file' and
+                os.path.splitext(args.left)[1].lower() != os.path.splitext(args.right)[1].lower()):
+            raise ValueError("Both files must have the same format")
+
+        with ThreadPoolExecutor(HASH_WORKERS) as pool:
+            if fmt == 'parquet':
+                unit = compare_parquet(args.left, args.right, pool, report)
+            elif fmt == 'arrow':
+                unit = compare_arrow(args.left, args.right, report)
+            elif fmt == 'avro':
+                unit = compare_avro(args.left, args.right, report)
+            elif fmt == 'npy':
+                unit = compare_npy(args.left, args.right, pool, report)
+            elif fmt == 'npz':
+                unit = compare_npz(args.left, args.right, report)
+            elif fmt == 'hdf5':
+                unit = compare_hdf5(args.left, args.right, pool, report)
+            else:
+                unit = compare_whole_files(args.left, args.right, pool, report)
+
+        print(json.dumps(report.result(fmt, args.left, args.right, unit), indent=2))
+    except Exception as e:
+        print(json.dumps({
+            "error": f"Comparison failed: {str(e)}",
+            "error_type": type(e).__name__
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
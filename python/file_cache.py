@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Helpers for on-disk caches keyed by file identity"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+
+# A temporary file this old belongs to a process that was killed before it could rename
+# or remove it; younger ones may still be written by a concurrent build
+STALE_TMP_SECONDS = 3600
+
+
+def file_identity(file_path):
+    """Return a dict identifying the current contents of a file (path, size, mtime)"""
+    stat = os.stat(file_path)
+    return {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def cache_key(file_path, *parts):
+    """Build a stable cache key from file identity plus any extra parts"""
+    payload = json.dumps([file_identity(file_path)] + [str(p) for p in parts], sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def cache_dir(cache_root, file_path, *parts):
+    """Return (and create) the cache directory for a file and key parts.
+
+    Creating one for a new version of a file removes those left by its older versions.
+    """
+    path = os.path.join(cache_root, cache_key(file_path, *parts))
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+        identity = file_identity(file_path)
+        write_json(os.path.join(path, 'source.json'), identity)
+        evict_stale(cache_root, identity)
+    return path
+
+
+def evict_stale(cache_root, identity):
+    """Remove cache directories built from an earlier version of the file"""
+    for name in os.listdir(cache_root):
+        source = read_json(os.path.join(cache_root, name, 'source.json'))
+        if isinstance(source, dict) and source.get("path") == identity["path"] and source != identity:
+            shutil.rmtree(os.path.join(cache_root, name), ignore_errors=True)
+
+
+def remove_stale_tmp(cache_root):
+    """Remove temporary files left in cache directories by killed processes"""
+    if not os.path.isdir(cache_root):
+        return
+    cutoff = time.time() - STALE_TMP_SECONDS
+    for name in os.listdir(cache_root):
+        directory = os.path.join(cache_root, name)
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.listdir(directory):
+            path = os.path.join(directory, entry)
+            try:
+                if entry.endswith('.tmp') and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def read_json(path, default=None):
+    """Read a JSON file, returning default if it is missing or corrupt"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    """Atomically write a JSON file"""
+    # A private temporary file, as concurrent processes may write the same path
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_array(path, array):
+    """Atomically write an .npy file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Parallel chunk decompression for compressed HDF5 datasets
+
+h5py decompresses the chunks a selection touches one after another on one
+thread. ChunkedReader fetches them raw with read_direct_chunk instead and
+decompresses them on a thread pool (zlib and numpy release the GIL), each
+task writing its part of the selection straight into the result.
+
+Only gzip, shuffle and fletcher32 (and lzf, when the lzf package is
+installed) are decoded here. Datasets with other filters (szip, blosc,
+scale-offset, ...), uncompressed or contiguous datasets, and non-numeric
+dtypes are read by h5py as before, as are selections within a single chunk
+and everything on single-core machines.
+"""
+
+import os
+import zlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+FILTER_DEFLATE = 1
+FILTER_SHUFFLE = 2
+FILTER_FLETCHER32 = 3
+FILTER_LZF = 32000
+COMPRESSION_FILTERS = (FILTER_DEFLATE, FILTER_LZF)
+DECODE_THREADS = os.cpu_count() or 1
+
+try:
+    import lzf
+except ImportError:
+    lzf = None
+
+
+def dataset_filters(dataset):
+    """Filter ids of a dataset, in the order they were applied when writing"""
+    plist = dataset.id.get_create_plist()
+    return [plist.get_filter(i)[0] for i in range(plist.get_nfilters())]
+
+
+def supports(dataset):
+    """Whether ChunkedReader can decode the dataset's chunks itself"""
+    if dataset.chunks is None or dataset.is_virtual or dataset.dtype.kind not in 'biufc':
+        return False
+    filters = dataset_filters(dataset)
+    supported = {FILTER_DEFLATE, FILTER_SHUFFLE, FILTER_FLETCHER32}
+    if lzf is not None:
+        supported.add(FILTER_LZF)
+    return any(f in COMPRESSION_FILTERS for f in filters) and all(f in supported for f in filters)
+
+
+def chunked(dataset):
+    """The dataset wrapped in a ChunkedReader if its chunks can be decoded in parallel, else the dataset"""
+    # On one core the pool only adds overhead to what h5py does in C
+    return ChunkedReader(dataset) if DECODE_THREADS > 1 and supports(dataset) else dataset
+
+
+def axis_index(key, length):
+    """Indices selected along one axis by an int, slice or sequence of ints; None for other keys"""
+    if isinstance(key, (int, np.integer)):
+        return np.array([key + length if key < 0 else key])
+    if isinstance(key, slice):
+        return np.arange(*key.indices(length))
+    index = np.asarray(key)
+    if index.ndim != 1 or index.dtype.kind not in 'iu':
+        return None
+    return np.where(index < 0, index + length, index)
+
+
+def chunk_groups(index, chunk):
+    """[(chunk number, positions in the selection, offsets within the chunk)] along one axis"""
+    chunk_of = index // chunk
+    order = np.argsort(chunk_of, kind='stable')
+    numbers, starts = np.unique(chunk_of[order], return_index=True)
+    groups = []
+    for number, positions in zip(numbers, np.split(order, starts[1:])):
+        groups.append((int(number), positions, index[positions] - number * chunk))
+    return groups
+
+
+def as_slice(index):
+    """A slice equivalent to an index array if it is a contiguous ascending run, else None"""
+    if len(index) and index[-1] - index[0] + 1 == len(index) and np.all(np.diff(index) == 1):
+        return slice(int(index[0]), int(index[-1]) + 1)
+    return None
+
+
+def block_index(indices):
+    """Index selecting the outer product of per-axis index arrays, as plain slices where possible"""
+    slices = [as_slice(index) for index in indices]
+    if all(s is not None for s in slices):
+        return tuple(slices)
+    return np.ix_(*indices)
+
+
+class ChunkedReader:
+    """Read-only array-like over a compressed HDF5 dataset whose selections decompress chunks in parallel.
+
+    Supports ints, slices and sequences of ints per axis (like h5py, plus
+    unsorted and repeated indices); anything else is passed on to h5py.
+    """
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.shape = dataset.shape
+        self.dtype = dataset.dtype
+        self.size = dataset.size
+        self.ndim = dataset.ndim
+        self.chunks = dataset.chunks
+        self.filters = dataset_filters(dataset)
+        self.chunk_bytes = int(np.prod(self.chunks)) * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        keys = key if isinstance(key, tuple) else (key,)
+        if any(k is Ellipsis for k in keys):
+            at = keys.index(Ellipsis)
+            keys = keys[:at] + (slice(None),) * (self.ndim - len(keys) + 1) + keys[at + 1:]
+        keys = keys + (slice(None),) * (self.ndim - len(keys))
+        indices = [axis_index(k, n) for k, n in zip(keys, self.shape)] if len(keys) == self.ndim else [None]
+        if any(index is None for index in indices):
+            return self.dataset[key]
+
+        groups = [chunk_groups(index, chunk) for index, chunk in zip(indices, self.chunks)]
+        if np.prod([len(axis_groups) for axis_groups in groups]) < 2:
+            return self.dataset[key]  # One chunk: nothing to parallelize
+
+        out = np.empty([len(index) for index in indices], dtype=self.dtype.newbyteorder('='))
+
+        def read(combination):
+            offset = tuple(number * chunk for (number, _, _), chunk in zip(combination, self.chunks))
+            block = self.read_chunk(offset)
+            out[block_index([positions for _, positions, _ in combination])] = \
+                block[block_index([local for _, _, local in combination])]
+
+        with ThreadPoolExecutor(DECODE_THREADS) as pool:
+            # list() re-raises errors from the workers
+            list(pool.map(read, itertools.product(*groups)))
+
+        # Integer keys drop their axis, as in numpy
+        dropped = tuple(axis for axis, k in enumerate(keys) if isinstance(k, (int, np.integer)))
+        return out.reshape([n for axis, n in enumerate(out.shape) if axis not in dropped])
+
+    def read_chunk(self, offset):
+        """Decode the whole chunk starting at offset"""
+        dsid = self.dataset.id
+        if dsid.get_chunk_info_by_coord(offset).byte_offset is None:
+            # Never written
+            return np.full(self.chunks, self.dataset.fillvalue, dtype=self.dtype)
+        filter_mask, data = dsid.read_direct_chunk(offset)
+        # Undo the filters in reverse; a set bit in the mask means that filter was skipped for this chunk
+        for i in reversed(range(len(self.filters))):
+            if filter_mask & (1 << i):
+                continue
+            if self.filters[i] == FILTER_DEFLATE:
+                data = zlib.decompress(data)
+            elif self.filters[i] == FILTER_LZF:
+                data = lzf.decompress(data, self.chunk_bytes)
+            elif self.filters[i] == FILTER_SHUFFLE:
+                data = np.frombuffer(data, dtype=np.uint8).reshape(self.dtype.itemsize, -1).T.tobytes()
+            elif self.filters[i] == FILTER_FLETCHER32:
+                data = data[:-4]
+        return np.frombuffer(data, dtype=self.dtype).reshape(self.chunks)
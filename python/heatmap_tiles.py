@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""Serve multi-resolution heatmap tiles for 2-D arrays (.npy/.npz, HDF5, NetCDF, MATLAB)
+
+Level 0 is the array at full resolution. Level L is the array downsampled by
+2**L using a block mean (or max). Levels >= 1 are built on demand by streaming
+the source in row stripes and cached on disk as float32 .npy files, so only the
+tiles covering the current viewport ever need to be read. A MATLAB v5 variable
+can only be loaded whole, so it is loaded once and cached as level 0 too.
+
+Building a level streams {"progress": ...} lines; the last line is the result.
+"""
+
+import sys
+import os
+import json
+import math
+import signal
+import argparse
+import tempfile
+import warnings
+import zipfile
+import numpy as np
+
+from file_cache import cache_dir, read_json, write_json, save_array, remove_stale_tmp
+
+TILE_SIZE = 256
+STRIPE_BYTES = 64 * 1024 * 1024
+
+NPY_EXTENSIONS = ('.npy',)
+NPZ_EXTENSIONS = ('.npz',)
+HDF5_EXTENSIONS = ('.h5', '.hdf5')
+NETCDF_EXTENSIONS = ('.nc', '.nc4', '.netcdf')
+MAT_EXTENSIONS = ('.mat',)
+
+MAT_CLASS_DTYPES = {
+    'double': np.float64, 'single': np.float32,
+    'int8': np.int8, 'uint8': np.uint8, 'int16': np.int16, 'uint16': np.uint16,
+    'int32': np.int32, 'uint32': np.uint32, 'int64': np.int64, 'uint64': np.uint64,
+    'logical': np.uint8
+}
+
+
+def emit(message):
+    print(json.dumps(message), flush=True)
+
+
+def is_numeric_dtype(dtype):
+    return np.dtype(dtype).kind in 'biufc'
+
+
+def to_real(block):
+    """Convert a block to float64, using magnitude for complex data and NaN for masked values"""
+    if np.ma.isMaskedArray(block):
+        block = np.ma.filled(block.astype(np.complex128 if np.iscomplexobj(block) else np.float64), np.nan)
+    if np.iscomplexobj(block):
+        return np.abs(block)
+    return np.asarray(block, dtype=np.float64)
+
+
+class ArraySource:
+    """A 2-D view over an array-like object, selecting leading indices for N-D data"""
+
+    def __init__(self, array, name, index=(), closer=None, in_memory=False):
+        if len(array.shape) < 2:
+            raise ValueError(f"'{name}' is not a 2-D array (shape {tuple(array.shape)})")
+        if not is_numeric_dtype(array.dtype):
+            raise ValueError(f"'{name}' has non-numeric dtype {array.dtype}")
+        leading = len(array.shape) - 2
+        index = tuple(index)[:leading]
+        index = index + (0,) * (leading - len(index))
+        self.array = array
+        self.name = name
+        self.index = index
+        self.shape = tuple(int(s) for s in array.shape[-2:])
+        self.dtype = np.dtype(array.dtype)
+        self._closer = closer
+        # Whether reading any part of the array loads all of it
+        self.in_memory = in_memory
+
+    def read(self, r0, r1, c0=0, c1=None):
+        if c1 is None:
+            c1 = self.shape[1]
+        return to_real(self.array[self.index + (slice(r0, r1), slice(c0, c1))])
+
+    def close(self):
+        if self._closer is not None:
+            self._closer()
+
+
+class NpzMember:
+    """Row-range reads of an .npz member, decompressing from the stream instead of loading it
+
+    Reads move forward through the member, so the stripes of a pyramid build cost
+    one pass; a read behind the current position decompresses again from the start.
+    """
+
+    def __init__(self, file_path, member):
+        self._zip = zipfile.ZipFile(file_path)
+        self._f = self._zip.open(member)
+        version = np.lib.format.read_magic(self._f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(self._f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(self._f)
+        self.shape = shape
+        self.dtype = dtype
+        self._data_offset = self._f.tell()
+        self._loaded = None
+        if fortran_order:
+            # Rows are not contiguous in Fortran order
+            self._f.seek(0)
+            self._loaded = np.lib.format.read_array(self._f)
+
+    def __getitem__(self, key):
+        if self._loaded is not None:
+            return self._loaded[key]
+        *leading, rows, cols = key
+        cols_total = self.shape[-1]
+        first = np.ravel_multi_index(tuple(leading) + (rows.start, 0), self.shape) if rows.stop > rows.start else 0
+        count = (rows.stop - rows.start) * cols_total
+        self._f.seek(self._data_offset + first * self.dtype.itemsize)
+        block = np.frombuffer(self._f.read(count * self.dtype.itemsize), dtype=self.dtype, count=count)
+        return block.reshape(rows.stop - rows.start, cols_total)[:, cols]
+
+    def close(self):
+        self._f.close()
+        self._zip.close()
+
+
+class MatVariable:
+    """A MATLAB v5 variable, with its shape from the header and its data loaded on first read"""
+
+    def __init__(self, file_path, variable):
+        from scipy.io import whosmat
+        for name, shape, mclass in whosmat(file_path):
+            if name == variable and mclass in MAT_CLASS_DTYPES:
+                self.shape = tuple(shape)
+                self.dtype = np.dtype(MAT_CLASS_DTYPES[mclass])
+                break
+        else:
+            raise ValueError(f"'{variable}' is not a numeric array")
+        self._file_path = file_path
+        self._variable = variable
+        self._loaded = None
+
+    def __getitem__(self, key):
+        if self._loaded is None:
+            from scipy.io import loadmat
+            self._loaded = np.asarray(loadmat(self._file_path, variable_names=[self._variable])[self._variable])
+        return self._loaded[key]
+
+
+def npz_member_name(file_path, variable):
+    with zipfile.ZipFile(file_path) as zf:
+        names = zf.namelist()
+    return variable + '.npy' if variable + '.npy' in names else variable
+
+
+def read_npz_headers(file_path):
+    """Read array headers from an .npz archive without loading the arrays"""
+    headers = {}
+    with zipfile.ZipFile(file_path) as zf:
+        for member in zf.namelist():
+            if not member.endswith('.npy'):
+                continue
+            with zf.open(member) as f:
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+            headers[member[:-4]] = (shape, dtype)
+    return headers
+
+
+def list_variables(file_path):
+    """List numeric arrays with at least two dimensions"""
+    ext = os.path.splitext(file_path)[1].lower()
+    candidates = []
+
+    def add(name, shape, dtype):
+        if len(shape) >= 2 and is_numeric_dtype(dtype):
+            candidates.append({"name": name, "shape": [int(s) for s in shape], "dtype": str(np.dtype(dtype))})
+
+    if ext in NPY_EXTENSIONS:
+        arr = np.load(file_path, mmap_mode='r')
+        add('', arr.shape, arr.dtype)
+    elif ext in NPZ_EXTENSIONS:
+        for name, (shape, dtype) in read_npz_headers(file_path).items():
+            add(name, shape, dtype)
+    elif ext in HDF5_EXTENSIONS or (ext in MAT_EXTENSIONS and is_hdf5(file_path)):
+        import h5py
+        with h5py.File(file_path, 'r') as f:
+            def visit(name, item):
+                if isinstance(item, h5py.Dataset):
+                    add(name, item.shape, item.dtype)
+            f.visititems(visit)
+    elif ext in NETCDF_EXTENSIONS:
+        from netCDF4 import Dataset
+        with Dataset(file_path, 'r') as nc:
+            for name, var in nc.variables.items():
+                add(name, var.shape, var.dtype)
+    elif ext in MAT_EXTENSIONS:
+        from scipy.io import whosmat
+        for name, shape, mclass in whosmat(file_path):
+            if mclass in MAT_CLASS_DTYPES:
+                add(name, shape, MAT_CLASS_DTYPES[mclass])
+    else:
+        raise ValueError(f"Unsupported file type for heatmaps: {ext}")
+
+    return candidates
+
+
+def is_hdf5(file_path):
+    with open(file_path, 'rb') as f:
+        header = f.read(520)
+    # MATLAB v7.3 files are HDF5 with a 512-byte user block
+    return b'\x89HDF\r\n\x1a\n' in header
+
+
+def open_source(file_path, variable, index=()):
+    """Open a variable as a lazily sliced 2-D ArraySource"""
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext in NPY_EXTENSIONS:
+        return ArraySource(np.load(file_path, mmap_mode='r'), variable or 'array', index)
+    if ext in NPZ_EXTENSIONS:
+        member = NpzMember(file_path, npz_member_name(file_path, variable))
+        return ArraySource(member, variable, index, closer=member.close)
+    if ext in HDF5_EXTENSIONS or (ext in MAT_EXTENSIONS and is_hdf5(file_path)):
+        import h5py
+        from h5_chunks import chunked
+        f = h5py.File(file_path, 'r')
+        # Pyramid levels are built from stripes that span every chunk across the array
+        return ArraySource(chunked(f[variable]), variable, index, closer=f.close)
+    if ext in NETCDF_EXTENSIONS:
+        from netCDF4 import Dataset
+        nc = Dataset(file_path, 'r')
+        return ArraySource(nc.variables[variable], variable, index, closer=nc.close)
+    if ext in MAT_EXTENSIONS:
+        return ArraySource(MatVariable(file_path, variable), variable, index, in_memory=True)
+
+    raise ValueError(f"Unsupported file type for heatmaps: {ext}")
+
+
+def num_levels(shape, tile_size):
+    largest = max(shape)
+    if largest <= tile_size:
+        return 1
+    return int(math.ceil(math.log2(largest / tile_size))) + 1
+
+
+def level_shape(shape, level):
+    factor = 2 ** level
+    return (int(math.ceil(shape[0] / factor)), int(math.ceil(shape[1] / factor)))
+
+
+def reduce_2x2(block, mode):
+    """Downsample a 2-D block by 2 in both dimensions, ignoring NaNs"""
+    rows, cols = block.shape
+    if rows % 2 or cols % 2:
+        padded = np.full((rows + rows % 2, cols + cols % 2), np.nan)
+        padded[:rows, :cols] = block
+        block = padded
+    blocks = block.reshape(block.shape[0] // 2, 2, block.shape[1] // 2, 2)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        if mode == 'max':
+            return np.nanmax(blocks, axis=(1, 3))
+        return np.nanmean(blocks, axis=(1, 3))
+
+
+def stripe_rows(cols):
+    """Number of rows (even) to read per stripe so a stripe stays within STRIPE_BYTES"""
+    rows = STRIPE_BYTES // max(cols * 8, 1)
+    return max(2, rows - rows % 2)
+
+
+class Pyramid:
+    """On-disk cache of downsampled levels for one variable"""
+
+    def __init__(self, source, cache_root, file_path, mode, tile_size):
+        self.source = source
+        self.mode = mode
+        self.tile_size = tile_size
+        self.num_levels = num_levels(source.shape, tile_size)
+        self.dir = cache_dir(cache_root, file_path, source.name, source.index, mode)
+        self.meta_path = os.path.join(self.dir, 'meta.json')
+        self.meta = read_json(self.meta_path, {})
+
+    def level_path(self, level):
+        return os.path.join(self.dir, f'level_{level}.npy')
+
+    def save_stats(self, vmin, vmax):
+        self.meta.update({
+            "min": None if vmin is None or math.isnan(vmin) else float(vmin),
+            "max": None if vmax is None or math.isnan(vmax) else float(vmax)
+        })
+        write_json(self.meta_path, self.meta)
+
+    def read(self, r0, r1, c0=0, c1=None):
+        """Read from level 0: the source, or its cached copy if reading the source loads it whole"""
+        if not self.source.in_memory:
+            return self.source.read(r0, r1, c0, c1)
+        return np.asarray(self.level(0)[r0:r1, c0:c1], dtype=np.float64)
+
+    def ensure_stats(self):
+        if "min" in self.meta:
+            return
+        if self.num_levels > 1:
+            # Building level 1 makes a full pass over the source and records min/max
+            self.level(1)
+            return
+        block = self.read(0, self.source.shape[0])
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.save_stats(np.nanmin(block) if block.size else None,
+                            np.nanmax(block) if block.size else None)
+
+    def level(self, level):
+        """Return an array-like for the given level, building it if needed"""
+        if level == 0 and not self.source.in_memory:
+            return None
+        path = self.level_path(level)
+        if not os.path.exists(path):
+            if level == 0:
+                emit({"progress": f"Loading '{self.source.name}'..."})
+                save_array(path, self.source.read(0, self.source.shape[0]))
+            else:
+                self._build(level)
+        return np.load(path, mmap_mode='r')
+
+    def _build(self, level):
+        if level == 1:
+            if self.source.in_memory:
+                self.level(0)
+            parent_shape = self.source.shape
+            read = self.read
+        else:
+            parent = self.level(level - 1)
+            parent_shape = parent.shape
+            read = lambda r0, r1: np.asarray(parent[r0:r1], dtype=np.float64)
+
+        out_shape = level_shape(self.source.shape, level)
+        # Each draw runs its own process, so two of them can build the same level at once;
+        # each builds into its own file and the last rename wins
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=f'level_{level}.', suffix='.tmp')
+        os.close(fd)
+        try:
+            out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=out_shape)
+
+            vmin, vmax = math.inf, -math.inf
+            step = stripe_rows(parent_shape[1])
+            for r0 in range(0, parent_shape[0], step):
+                r1 = min(r0 + step, parent_shape[0])
+                emit({"progress": f"Building zoom 1:{2 ** level} ({r0:,} of {parent_shape[0]:,} rows)"})
+                block = read(r0, r1)
+                if level == 1 and block.size:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter('ignore', RuntimeWarning)
+                        block_min, block_max = np.nanmin(block), np.nanmax(block)
+                    if not math.isnan(block_min):
+                        vmin, vmax = min(vmin, block_min), max(vmax, block_max)
+                out[r0 // 2:r0 // 2 + (r1 - r0 + 1) // 2] = reduce_2x2(block, self.mode)
+
+            out.flush()
+            del out
+            os.replace(tmp_path, self.level_path(level))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        if level == 1:
+            self.save_stats(None if vmin == math.inf else vmin,
+                            None if vmax == -math.inf else vmax)
+
+    def tile(self, level, row, col):
+        shape = level_shape(self.source.shape, level)
+        r0, c0 = row * self.tile_size, col * self.tile_size
+        r1, c1 = min(r0 + self.tile_size, shape[0]), min(c0 + self.tile_size, shape[1])
+        if r0 >= r1 or c0 >= c1:
+            return None
+        if level == 0:
+            block = self.read(r0, r1, c0, c1)
+        else:
+            block = np.asarray(self.level(level)[r0:r1, c0:c1], dtype=np.float64)
+        return {
+            "level": level,
+            "row": row,
+            "col": col,
+            "shape": [r1 - r0, c1 - c0],
+            "data": [None if math.isnan(v) else float('%.6g' % v) for v in block.ravel().tolist()]
+        }
+
+
+def parse_tiles(spec):
+    """Parse 'row:col,row:col' into a list of (row, col) tuples"""
+    tiles = []
+    for item in spec.split(','):
+        item = item.strip()
+        if item:
+            row, col = item.split(':')
+            tiles.append((int(row), int(col)))
+    return tiles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve heatmap tiles for 2-D arrays")
+    parser.add_argument('file_path')
+    parser.add_argument('--list', action='store_true', help="List 2-D numeric variables")
+    parser.add_argument('--variable', default='')
+    parser.add_argument('--index', default='', help="Comma-separated indices for leading dimensions")
+    parser.add_argument('--level', type=int, default=0)
+    parser.add_argument('--tiles', default='', help="Comma-separated row:col tile coordinates")
+    parser.add_argument('--mode', choices=['mean', 'max'], default='mean')
+    parser.add_argument('--tile-size', type=int, default=TILE_SIZE)
+    parser.add_argument('--cache-dir', default=None)
+    args = parser.parse_args()
+
+    # Cancelling a build terminates the process; exit normally so its temporary level is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+
+    try:
+        if args.list:
+            emit({"variables": list_variables(args.file_path)})
+            return
+
+        cache_root = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.file_path)), '.heatmap-cache')
+        remove_stale_tmp(cache_root)
+        index = tuple(int(i) for i in args.index.split(',') if i.strip())
+        source = open_source(args.file_path, args.variable, index)
+        try:
+            pyramid = Pyramid(source, cache_root, args.file_path, args.mode, args.tile_size)
+            pyramid.ensure_stats()
+            tiles = [pyramid.tile(args.level, row, col) for row, col in parse_tiles(args.tiles)]
+            result = {
+                "variable": args.variable,
+                "shape": list(source.shape),
+                "dtype": str(source.dtype),
+                "tile_size": args.tile_size,
+                "num_levels": pyramid.num_levels,
+                "mode": args.mode,
+                "min": pyramid.meta.get("min"),
+                "max": pyramid.meta.get("max"),
+                "tiles": [t for t in tiles if t is not None]
+            }
+        finally:
+            source.close()
+
+        emit(result)
+    except Exception as e:
+        emit({
+            "error": f"Failed to build heatmap tiles: {str(e)}",
+            "error_type": type(e).__name__
+        })
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Sorted key index over one column of a tabular file (Parquet, Feather, Arrow, Avro)
+
+--build makes one streaming pass over the column (reusing sort_table's
+spilled runs, so memory stays bounded) and writes a sidecar to the cache
+directory, keyed by the file's identity:
+
+    keys.npy    every non-null key, ascending
+    rows.npy    the row each key came from
+    fences.npy  every FENCE_STRIDE-th key, small enough to load whole
+    units.npy   first row of each row group / record batch / Avro block
+    blocks.npy  byte offset of each Avro block (Avro only)
+
+A lookup (--equals V, or --min/--max for an inclusive range) binary-searches
+the fences, then only the one stride of keys.npy each bound falls in, and
+reads only the row groups, batches or Avro blocks holding the matches.
+
+Progress is streamed as JSON lines ({"progress": ...}); the last line is the result.
+"""
+
+import sys
+import os
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+
+from file_cache import cache_dir, read_json, write_json, save_array
+from table_source import file_format, open_arrow, avro_schema, take_rows, table_records
+from sort_table import emit, sort_keys, spill_runs, merge_runs
+
+FENCE_STRIDE = 4096
+DEFAULT_LIMIT = 100
+
+
+def index_dir(cache_root, file_path, column):
+    return cache_dir(cache_root, file_path, 'index', column)
+
+
+def scan_units(file_path):
+    """(first row of each row group / record batch / Avro block, Avro block byte offsets or None)"""
+    fmt = file_format(file_path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        metadata = pq.ParquetFile(file_path).metadata
+        sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+        offsets = None
+    elif fmt == 'arrow':
+        _, batch_loaders = open_arrow(file_path)
+        sizes = [load().num_rows for load in batch_loaders]
+        offsets = None
+    else:
+        from avro.datafile import DataFileReader
+        from avro.io import DatumReader
+        from convert_avro import scan_blocks
+        with open(file_path, 'rb') as f:
+            reader = DataFileReader(f, DatumReader())
+            try:
+                blocks = scan_blocks(reader, os.path.getsize(file_path))
+            finally:
+                reader.close()
+        sizes = [count for _, count in blocks]
+        offsets = np.asarray([offset for offset, _ in blocks], dtype=np.int64)
+    return np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)[:-1]]).astype(np.int64), offsets
+
+
+def column_type(file_path, column):
+    """Arrow type of the column, read from the schema (Avro: the writer schema in the header)"""
+    fmt = file_format(file_path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        schema = pq.ParquetFile(file_path).schema_arrow
+    elif fmt == 'arrow':
+        schema, _ = open_arrow(file_path)
+    else:
+        schema = avro_schema(file_path)
+        if schema is None:
+            raise ValueError("The Avro schema has fields without a single Arrow type")
+    if schema.get_field_index(column) < 0:
+        raise ValueError(f"Unknown column: {column}")
+    return schema.field(column).type
+
+
+def build_index(file_path, column, cache_root):
+    """Write the index files for a column; returns its meta"""
+    directory = index_dir(cache_root, file_path, column)
+    emit({"progress": "Scanning row groups..."})
+    units, block_offsets = scan_units(file_path)
+
+    # Private to this process: concurrent builds of the same index must not share runs
+    work_dir = tempfile.mkdtemp(dir=directory, prefix='runs-')
+    try:
+        runs, num_nulls, num_rows = spill_runs(file_path, column, work_dir)
+        num_keys = num_rows - num_nulls
+        dtype = np.result_type(*[np.load(r + '_keys.npy', mmap_mode='r').dtype for r in runs]) if runs else np.int64
+        emit({"progress": f"Merging {len(runs)} sorted runs..."})
+        keys_tmp = os.path.join(work_dir, 'keys.npy')
+        rows_tmp = os.path.join(work_dir, 'rows.npy')
+        keys = np.lib.format.open_memmap(keys_tmp, mode='w+', dtype=dtype, shape=(num_keys,))
+        rows = np.lib.format.open_memmap(rows_tmp, mode='w+', dtype=np.int64, shape=(num_keys,))
+        if runs:
+            merge_runs(runs, rows, out_keys=keys)
+        fences = np.array(keys[::FENCE_STRIDE])
+        keys.flush()
+        rows.flush()
+        del keys, rows
+        os.replace(keys_tmp, os.path.join(directory, 'keys.npy'))
+        os.replace(rows_tmp, os.path.join(directory, 'rows.npy'))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    save_array(os.path.join(directory, 'fences.npy'), fences)
+    save_array(os.path.join(directory, 'units.npy'), units)
+    if block_offsets is not None:
+        save_array(os.path.join(directory, 'blocks.npy'), block_offsets)
+    meta = {
+        "column": column,
+        "num_rows": num_rows,
+        "num_keys": num_keys,
+        "num_nulls": num_nulls,
+        "num_units": len(units),
+        "fence_stride": FENCE_STRIDE
+    }
+    # Written last: an index without meta.json is incomplete
+    write_json(os.path.join(directory, 'meta.json'), meta)
+    return meta
+
+
+def load_index(file_path, column, cache_root):
+    """(meta, keys, rows, fences, units, Avro block offsets or None), or None if there is no index"""
+    directory = index_dir(cache_root, file_path, column)
+    meta = read_json(os.path.join(directory, 'meta.json'))
+    if meta is None:
+        return None
+    blocks_path = os.path.join(directory, 'blocks.npy')
+    return (
+        meta,
+        np.load(os.path.join(directory, 'keys.npy'), mmap_mode='r'),
+        np.load(os.path.join(directory, 'rows.npy'), mmap_mode='r'),
+        np.load(os.path.join(directory, 'fences.npy')),
+        np.load(os.path.join(directory, 'units.npy')),
+        np.load(blocks_path) if os.path.exists(blocks_path) else None
+    )
+
+
+def parse_key(text, arrow_type):
+    """Convert a typed-in value to the key representation sort_keys() gives the column"""
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    values, valid = sort_keys(pa.array([pa.scalar(text).cast(arrow_type)], type=arrow_type))
+    if not valid[0]:
+        raise ValueError(f"Cannot look up {text!r}: nulls and NaN are not indexed")
+    return values[0]
+
+
+def position(keys, fences, value, side):
+    """np.searchsorted(keys, value, side), touching only the stride of keys the fences point to"""
+    block = int(np.searchsorted(fences, value, side=side))
+    if block == 0:
+        return 0
+    # Fence block - 1 is on the near side of value; the answer is within its stride or at the next fence
+    start = (block - 1) * FENCE_STRIDE
+    return start + int(np.searchsorted(keys[start:start + FENCE_STRIDE], value, side=side))
+
+
+def take_avro_rows(file_path, row_ids, units, block_offsets):
+    """Read the given rows (in the given order), decoding only the Avro blocks that hold them"""
+    from avro.datafile import DataFileReader
+    from avro.io import DatumReader
+
+    blocks = np.searchsorted(units, row_ids, side='right') - 1
+    records = [None] * len(row_ids)
+    with open(file_path, 'rb') as f:
+        reader = DataFileReader(f, DatumReader())
+        try:
+            for block in np.unique(blocks):
+                positions = np.flatnonzero(blocks == block)
+                wanted = {}
+                for i in positions:
+                    wanted.setdefault(int(row_ids[i] - units[block]), []).append(int(i))
+                # Records inside a block can only be decoded in order
+                f.seek(int(block_offsets[block]))
+                reader.block_count = 0
+                for offset in range(max(wanted) + 1):
+                    record = next(reader)
+                    for i in wanted.get(offset, ()):
+                        records[i] = record
+        finally:
+            reader.close()
+    return pa.Table.from_pylist(records)
+
+
+def lookup(file_path, index, low, high, limit):
+    """Rows whose key is within [low, high] (either may be None), in key order"""
+    meta, keys, rows, fences, units, block_offsets = index
+    start = position(keys, fences, low, 'left') if low is not None else 0
+    end = position(keys, fences, high, 'right') if high is not None else len(keys)
+    end = max(start, end)
+    row_ids = np.asarray(rows[start:min(end, start + limit)], dtype=np.int64)
+
+    if block_offsets is not None:
+        table = take_avro_rows(file_path, row_ids, units, block_offsets)
+    else:
+        table = take_rows(file_path, row_ids)
+    located = np.searchsorted(units, row_ids, side='right') - 1
+    return {
+        "total_matches": end - start,
+        "row_ids": row_ids.tolist(),
+        # (row group / record batch / Avro block, row within it)
+        "locations": [[int(unit), int(row - units[unit])] for unit, row in zip(located, row_ids)],
+        "units_read": len(np.unique(located)),
+        "num_units": len(units),
+        "columns": table.column_names,
+        "data": table_records(table)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a sorted key index over one column")
+    parser.add_argument('file_path')
+    parser.add_argument('--column', required=True)
+    parser.add_argument('--build', action='store_true', help="Build the index (replacing an existing one)")
+    parser.add_argument('--equals', default=None)
+    parser.add_argument('--min', default=None, help="Inclusive lower bound")
+    parser.add_argument('--max', default=None, help="Inclusive upper bound")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT)
+    parser.add_argument('--cache-dir', default=None)
+    args = parser.parse_args()
+
+    cache_root = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.file_path)), '.index-cache')
+
+    try:
+        if args.build:
+            meta = build_index(args.file_path, args.column, cache_root)
+            emit({"built": True, **meta})
+            return
+
+        index = load_index(args.file_path, args.column, cache_root)
+        if index is None:
+            raise ValueError(f"No index for '{args.column}' (or the file changed since it was built); build one first")
+        low, high = (args.equals, args.equals) if args.equals is not None else (args.min, args.max)
+        if low is None and high is None:
+            raise ValueError("Give --equals, or --min and/or --max")
+        arrow_type = column_type(args.file_path, args.column)
+        low = parse_key(low, arrow_type) if low is not None else None
+        high = parse_key(high, arrow_type) if high is not None else None
+        emit({"column": args.column, "num_rows": index[0]["num_rows"],
+              **lookup(args.file_path, index, low, high, max(args.limit, 0))})
+    except Exception as e:
+        emit({
+            "error": f"Key index on '{args.column}' failed: {str(e)}",
+            "error_type": type(e).__name__
+        })
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Memory budget shared by the converters
+
+The extension passes the budget (bytes) in DATA_FILE_VIEWER_MEMORY_BUDGET.
+Converters estimate an allocation from metadata (shape x itemsize, Parquet
+uncompressed sizes, file sizes) before reading and fall back to a sliced
+preview when the estimate exceeds the budget. Everything that was cut short
+is listed under "_memory_budget" in the result.
+"""
+
+import os
+import math
+
+BUDGET_ENV = 'DATA_FILE_VIEWER_MEMORY_BUDGET'
+DEFAULT_BUDGET = 2 * 1024 ** 3
+# Rough size of a DataFrame relative to the Arrow data (or file) it came from;
+# string columns become Python objects
+PANDAS_EXPANSION = 3
+# Rough size of unpickled/unpacked Python objects relative to the file
+OBJECT_EXPANSION = 2
+
+
+class MemoryBudget:
+    def __init__(self):
+        try:
+            self.limit = int(os.environ.get(BUDGET_ENV, '')) or DEFAULT_BUDGET
+        except ValueError:
+            self.limit = DEFAULT_BUDGET
+        self.skipped = []
+
+    def allows(self, estimated_bytes):
+        return estimated_bytes <= self.limit
+
+    def skip(self, item, estimated_bytes, action):
+        """Record that `item` (estimated at `estimated_bytes`) was not read in full"""
+        entry = {
+            "item": item,
+            "estimated_bytes": int(estimated_bytes),
+            "action": action
+        }
+        # Arrays previewed on demand may be read more than once
+        if entry not in self.skipped:
+            self.skipped.append(entry)
+
+    def report(self, result):
+        if self.skipped:
+            result["_memory_budget"] = {
+                "budget_bytes": self.limit,
+                "skipped": self.skipped,
+                "_note": "Some data exceeded the memory budget and was previewed or skipped instead of loaded. "
+                         "Raise dataFileViewer.memoryBudgetMB to load it in full."
+            }
+        return result
+
+
+def leading_elements(source, n):
+    """Return the first n elements (C order) of an array-like as a flat numpy array.
+
+    Works on anything that supports numpy-style basic slicing (numpy arrays,
+    memory maps, h5py datasets, netCDF4 variables) and only reads the leading
+    block that contains those elements.
+    """
+    import numpy as np
+    shape = tuple(source.shape)
+    if not shape:
+        return np.asanyarray(source[()]).reshape(-1)[:n]
+    index = []
+    for axis in range(len(shape)):
+        inner = math.prod(shape[axis + 1:])
+        if inner >= n and axis < len(shape) - 1:
+            # The first n elements all lie in the first slab along this axis
+            index.append(0)
+        else:
+            index.append(slice(0, math.ceil(n / max(inner, 1))))
+            break
+    # asanyarray keeps netCDF4's masked arrays masked
+    return np.asanyarray(source[tuple(index)]).reshape(-1)[:n]
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Output budget shared by the converters
+
+The extension passes the budget (bytes of JSON) in DATA_FILE_VIEWER_OUTPUT_BUDGET.
+A converter describes its result as a tree whose containers hold unconverted
+objects; OutputBudget.fit() walks it breadth-first and turns it into JSON
+values that serialize to about the budget. Each container shares its part of
+the budget fairly among its children: small ones get what they need, and
+what is left is split evenly among the large ones (nested containers, long
+strings, arrays). Unused budget is passed on to the nodes after it in the walk.
+
+What does not fit is cut short and marked where it was cut, so the viewer can
+ask for the rest later:
+
+    dicts    {..., "_more": {"offset": k, "total": n}}   first k of n keys shown
+    lists    [..., {"_more": {"offset": k, "total": n}}]
+    strings  the first characters, followed by "…"
+
+Arrays, DataFrames and other sequences that are expensive to convert are
+wrapped in Sliced, which is asked for as many leading items as its share
+allows. Everything that was cut short is listed (by path) under
+"_output_budget" in the result.
+"""
+
+import os
+import json
+from collections import deque
+from functools import lru_cache
+
+OUTPUT_BUDGET_ENV = 'DATA_FILE_VIEWER_OUTPUT_BUDGET'
+DEFAULT_OUTPUT_BUDGET = 16 * 1024 ** 2
+# A child that is cut short gets at least this much, so a container with more
+# children than fit shows a prefix of them rather than stubs of all of them
+MIN_SHARE = 1024
+# Items converted to estimate the size of one item of a Sliced sequence
+SAMPLE_ITEMS = 16
+# Rough size of a Sliced value's fields other than its items, and of a "_more" marker
+SLICED_BYTES = 256
+MARKER_BYTES = 48
+# Containers nested deeper than this below the one being laid out are not measured
+MAX_MEASURED_DEPTH = 64
+MAX_REPORTED = 100
+ELLIPSIS = '…'
+# Budget of the partial result a converter may report before its full result (perf.partial),
+# and the rows of a table worth converting for it
+PARTIAL_BYTES = 64 * 1024
+PARTIAL_ROWS = 100
+
+
+class Sliced:
+    """A sequence converted on demand: take(n) returns the JSON value showing its first n items"""
+
+    def __init__(self, length, take, unit='items', item_bytes=None):
+        self.length = int(length)
+        self.take = take
+        self.unit = unit
+        # Bytes one item adds to the output, if known up front (e.g. encoded numeric arrays)
+        self.item_bytes = item_bytes
+
+
+def plain(obj):
+    """Default expand(): JSON containers and scalars as they are, anything else as a string"""
+    if obj is None or isinstance(obj, (bool, int, float, str, dict, list, Sliced)):
+        return obj
+    if isinstance(obj, tuple):
+        return list(obj)
+    return str(obj)
+
+
+def preview(value, expand=plain):
+    """A small fit of value for perf.partial; what it cuts is not reported"""
+    return OutputBudget().fit(value, expand, PARTIAL_BYTES)
+
+
+def json_size(value):
+    return len(json.dumps(value, indent=2, default=str))
+
+
+def container_bytes(depth):
+    """Brackets and closing indent of a container at this depth (json.dumps with indent=2)"""
+    return 2 + 2 * depth
+
+
+def child_bytes(depth, key):
+    """Indent, separators and key of one child of a container at this depth"""
+    return 2 * (depth + 1) + 2 + (key_bytes(key) if key is not None else 0)
+
+
+@lru_cache(maxsize=4096)
+def key_bytes(key):
+    """A dict key as JSON, with the ': ' after it"""
+    return len(json.dumps(str(key))) + 2
+
+
+def is_atomic(value):
+    # Encoded arrays (see array_encoding.py) are shown whole or not at all
+    return isinstance(value, dict) and isinstance(value.get('_buffer'), str)
+
+
+class Node:
+    """A container being filled in: its converted children, where they go, and its ancestors"""
+
+    def __init__(self, raw, source, value, budget, depth, path, parent):
+        self.raw = raw
+        self.source = source
+        self.value = value
+        self.budget = budget
+        self.depth = depth
+        self.path = path
+        self.parent = parent
+
+    def has_ancestor(self, raw):
+        node = self
+        while node is not None:
+            if node.raw is raw:
+                return True
+            node = node.parent
+        return False
+
+
+class OutputBudget:
+    def __init__(self):
+        try:
+            self.limit = int(os.environ.get(OUTPUT_BUDGET_ENV, '')) or DEFAULT_OUTPUT_BUDGET
+        except ValueError:
+            self.limit = DEFAULT_OUTPUT_BUDGET
+        self.truncated = []
+        self.num_truncated = 0
+
+    def cut(self, path, shown, total, unit):
+        """Record that the value at `path` shows `shown` of its `total` items"""
+        self.num_truncated += 1
+        if len(self.truncated) < MAX_REPORTED:
+            self.truncated.append({"path": path, "shown": int(shown), "total": int(total), "unit": unit})
+
+    def fit(self, value, expand=plain, budget=None):
+        """JSON-ready version of `value` that serializes (indent=2) to about `budget` bytes"""
+        self.expand = expand
+        self.spare = 0
+        root = [None]
+        queue = deque()
+        holder = Node(None, None, root, budget or self.limit, -1, '$', None)
+        self.place(holder, 0, value, self.convert(value), holder.budget, '$', queue)
+        while queue:
+            self.fill(queue.popleft(), queue)
+        return root[0]
+
+    def report(self, result):
+        if self.num_truncated:
+            result["_output_budget"] = {
+                "budget_bytes": self.limit,
+                "num_truncated": self.num_truncated,
+                "truncated": self.truncated,
+                "_note": "Some values were larger than the output budget and were cut short. "
+                         "Raise dataFileViewer.outputBudgetMB to see more of them."
+            }
+        return result
+
+    def convert(self, raw):
+        if isinstance(raw, Sliced):
+            return raw
+        try:
+            return self.expand(raw)
+        except Exception:
+            return f"<{type(raw).__name__}>"
+
+    def demand(self, value, cap, depth):
+        """Bytes a converted value takes at this depth, or None if more than cap (or only walking it can tell)"""
+        kind = type(value)
+        if kind is str:
+            size = len(value) + 2 if len(value) > 4096 else len(json.dumps(value))
+        elif kind is int or kind is float:
+            size = len(repr(value))
+        elif value is None or kind is bool:
+            size = 5 if value is False else 4
+        elif kind is Sliced:
+            if value.item_bytes is None:
+                return None
+            size = SLICED_BYTES + value.length * value.item_bytes
+        elif (kind is dict or kind is list) and not is_atomic(value):
+            # Containers are measured so that the small ones get what they need rather than a fair share
+            if depth > MAX_MEASURED_DEPTH:
+                return None
+            size = container_bytes(depth)
+            indent = 2 * (depth + 1) + 2
+            items = value.items() if kind is dict else enumerate(value)
+            for key, raw in items:
+                size += indent + (key_bytes(key) if kind is dict else 0)
+                if size > cap:
+                    return None
+                child = self.demand(self.convert(raw), cap - size, depth + 1)
+                if child is None:
+                    return None
+                size += child
+        else:
+            size = json_size(value)
+        return size if size <= cap else None
+
+    def fill(self, node, queue):
+        """Lay out the children of a container within its budget (plus any spare)"""
+        source = node.source
+        is_dict = isinstance(source, dict)
+        total = len(source)
+        marker_bytes = MARKER_BYTES + child_bytes(node.depth, '_more' if is_dict else None)
+        available = node.budget + self.spare - container_bytes(node.depth) - marker_bytes
+        self.spare = 0
+
+        # Children up to an even split of the budget are measured and shown whole; the larger
+        # ones (and those that cannot be measured) need MIN_SHARE each (less in a small
+        # budget) and share the rest
+        floor = min(MIN_SHARE, max(available, 0) // 2)
+        cap = max(available // max(min(total, available // max(floor, 1)), 1), floor)
+        children = []
+        reserved = 0
+        for key, raw in (source.items() if is_dict else enumerate(source)):
+            value = self.convert(raw)
+            overhead = child_bytes(node.depth, key if is_dict else None)
+            need = self.demand(value, cap, node.depth + 1)
+            least = overhead + (floor if need is None else need)
+            if reserved + least > available:
+                break
+            reserved += least
+            children.append((key, raw, value, overhead, need))
+        if len(children) < total:
+            self.cut(node.path, len(children), total, 'keys' if is_dict else 'items')
+        else:
+            available += marker_bytes
+
+        large = [i for i, child in enumerate(children) if child[4] is None]
+        left = available - reserved + floor * len(large)
+        share = max(int(left / len(large)), floor) if large else 0
+        self.spare += max(available - reserved, 0) if not large else 0
+
+        for key, raw, value, overhead, need in children:
+            child_path = node.path + (member(key) if is_dict else f'[{key}]')
+            if need is None and node.has_ancestor(raw):
+                value, need = f"<circular reference: {type(raw).__name__}>", 0
+            self.place(node, key, raw, value, need if need is not None else share, child_path, queue, whole=need is not None)
+        if len(children) < total:
+            marker = {"offset": len(children), "total": total}
+            if is_dict:
+                node.value["_more"] = marker
+            else:
+                node.value.append({"_more": marker})
+
+    def place(self, parent, key, raw, value, share, path, queue, whole=False):
+        """Put a converted child into its parent, cutting leaves and queueing containers"""
+        if whole:
+            value = self.build(value)
+        elif isinstance(value, Sliced):
+            # Already sized to the share, so it is not cut again
+            value = self.build(self.convert(self.slice(value, share, path)))
+        else:
+            if isinstance(value, str) and len(value) + 2 > share:
+                keep = max(share - 2 - len(ELLIPSIS), 0)
+                self.cut(path, keep, len(value), 'characters')
+                value = value[:keep] + ELLIPSIS
+            elif is_atomic(value):
+                if json_size(value) > share:
+                    self.cut(path, 0, len(value['_buffer']), 'bytes')
+                    value = f"<encoded array: {len(value['_buffer'])} bytes>"
+            elif isinstance(value, (dict, list)):
+                container = {} if isinstance(value, dict) else []
+                queue.append(Node(raw, value, container, share, parent.depth + 1, path, parent))
+                value = container
+        if isinstance(parent.value, list) and key == len(parent.value):
+            parent.value.append(value)
+        else:
+            parent.value[key] = value
+
+    def build(self, value):
+        """Convert a value that was measured to fit whole"""
+        if isinstance(value, Sliced):
+            return self.build(self.convert(value.take(value.length)))
+        if isinstance(value, dict) and not is_atomic(value):
+            return {key: self.build(self.convert(raw)) for key, raw in value.items()}
+        if isinstance(value, list):
+            return [self.build(self.convert(raw)) for raw in value]
+        return value
+
+    def slice(self, sliced, share, path):
+        """Take as many leading items of a Sliced as fit its share"""
+        if sliced.length == 0:
+            return sliced.take(0)
+        if sliced.item_bytes is not None:
+            base, per_item = SLICED_BYTES, sliced.item_bytes
+        else:
+            sample = min(sliced.length, SAMPLE_ITEMS)
+            base = json_size(sliced.take(0))
+            per_item = max((json_size(sliced.take(sample)) - base) / sample, 1)
+        n = sliced.length if base + per_item * sliced.length <= share else max(int((share - base) // per_item), 0)
+        value = sliced.take(n)
+        if n < sliced.length:
+            self.cut(path, n, sliced.length, sliced.unit)
+            if isinstance(value, list):
+                value.append({"_more": {"offset": n, "total": sliced.length}})
+        return value
+
+
+def member(key):
+    key = str(key)
+    return '.' + key if key.isidentifier() else '[' + json.dumps(key) + ']'
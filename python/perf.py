@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Per-phase timing, peak-memory instrumentation and progress reporting for the converters
+
+Import this module before any heavy library so that the first phase
+('imports') covers the time spent importing them.
+
+Progress goes to stderr as {"progress": ...} lines, which PythonRunner shows
+on the loading screen; stdout stays reserved for the JSON result. A converter
+that can describe part of the file early (the HDF5 tree, a table's first rows)
+reports it once as a {"partial": ...} line, shown until the result arrives.
+
+When the extension names a result file (DATA_FILE_VIEWER_RESULT_FILE), emit()
+writes the JSON result there for the webview to fetch directly, and stdout only
+carries a small descriptor: the file, the timings, and the few top-level keys
+the extension host itself shows (DESCRIPTOR_KEYS).
+"""
+
+import os
+import sys
+import json
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Taken when the converter first imports this module, i.e. right after interpreter startup
+_MODULE_LOADED = time.perf_counter()
+_MODULE_LOADED_EPOCH = time.time()
+
+PROGRESS_INTERVAL = 0.25
+RESULT_FILE_ENV = 'DATA_FILE_VIEWER_RESULT_FILE'
+DESCRIPTOR_KEYS = ('file_type', 'schema', '_memory_budget', '_output_budget')
+_last_progress = 0.0
+
+
+def progress(message, force=False):
+    """Report progress, at most every PROGRESS_INTERVAL seconds unless forced"""
+    global _last_progress
+    now = time.perf_counter()
+    if not force and now - _last_progress < PROGRESS_INTERVAL:
+        return
+    _last_progress = now
+    print(json.dumps({"progress": message}), file=sys.stderr, flush=True)
+
+
+def partial(value):
+    """Report a first partial result for the loading screen (keep it small, see output_budget.preview)"""
+    print(json.dumps({"partial": value}, default=str), file=sys.stderr, flush=True)
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PerfRecorder:
+    """Records consecutive phases; each phase runs from the previous mark to the next"""
+
+    def __init__(self):
+        self.phases = []
+        self._last = _MODULE_LOADED
+
+    def mark(self, name):
+        """End the current phase; repeated names (e.g. lazy imports) accumulate into one entry"""
+        now = time.perf_counter()
+        ms = (now - self._last) * 1000
+        self._last = now
+        progress(f"Finished {name} ({now - _MODULE_LOADED:.1f} s elapsed)", force=True)
+        for phase in self.phases:
+            if phase["name"] == name:
+                phase["ms"] = round(phase["ms"] + ms, 2)
+                phase["peak_rss_bytes"] = peak_rss_bytes()
+                return
+        self.phases.append({
+            "name": name,
+            "ms": round(ms, 2),
+            "peak_rss_bytes": peak_rss_bytes()
+        })
+
+    def summary(self):
+        return {
+            "phases": self.phases,
+            "start_epoch_ms": round(_MODULE_LOADED_EPOCH * 1000, 1),
+            "end_epoch_ms": round(time.time() * 1000, 1),
+            "total_ms": round((time.perf_counter() - _MODULE_LOADED) * 1000, 2),
+            "peak_rss_bytes": peak_rss_bytes()
+        }
+
+    def attach(self, json_text):
+        """Close the 'serialize' phase and splice a "_perf" block into a serialized JSON object.
+
+        Splicing avoids serializing the (possibly large) result a second time just
+        to include the time it took to serialize it.
+        """
+        self.mark('serialize')
+        stripped = json_text.rstrip()
+        if not stripped.endswith('}'):
+            return json_text
+        body = stripped[:-1].rstrip()
+        separator = '' if body.endswith('{') else ','
+        return f'{body}{separator}\n  "_perf": {json.dumps(self.summary())}\n}}'
+
+    def emit(self, result, default=None):
+        """Serialize the result and hand it to the extension (see the module docstring)"""
+        json_text = json.dumps(result, indent=2, default=default)
+        result_file = os.environ.get(RESULT_FILE_ENV)
+        if not result_file:
+            print(self.attach(json_text))
+            return
+        with open(result_file, 'w', encoding='utf-8') as f:
+            f.write(json_text)
+        self.mark('serialize')
+        descriptor = {key: result[key] for key in DESCRIPTOR_KEYS if key in result}
+        records = result.get('data')
+        if isinstance(records, list) and records and isinstance(records[0], dict):
+            # Column names for the table views, which would otherwise read them from the data
+            descriptor['_columns'] = list(records[0])
+        descriptor['_result'] = {"path": result_file, "bytes": os.path.getsize(result_file)}
+        descriptor['_perf'] = self.summary()
+        print(json.dumps(descriptor, default=default))
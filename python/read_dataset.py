@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Read a directory of Parquet or Arrow/Feather files as one table
+
+The directory is listed in parallel; hive-style partition directories
+(year=2024/region=eu/...) become columns. Before any data is read, fragments
+whose partition values rule out the filter are dropped by their paths, and
+Parquet row groups whose statistics rule it out are dropped by their footers.
+Row counts come from the footers, which are read in parallel and cached per
+file in --cache-dir, so the total is known without reading data unless the
+filter involves data columns. A page reads only the fragments and row groups
+that hold it.
+
+Usage: read_dataset.py <directory> [--filter EXPR] [--offset N] [--limit N] [--cache-dir DIR]
+EXPR is conditions joined by "and": year >= 2023 and region in ('eu', 'us') and amount > 10
+"""
+
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from perf import progress
+from file_cache import read_json, write_json
+from table_source import table_records
+
+DATASET_FORMATS = {'.parquet': 'parquet', '.arrow': 'ipc', '.feather': 'ipc'}
+# Directory listings and footer reads wait on the disk (or network share), not the CPU
+IO_THREADS = min(32, 4 * (os.cpu_count() or 1))
+
+CONDITION = re.compile(r'^\s*([^\s=!<>]+)\s*(==|=|!=|<=|>=|<|>)\s*(.+?)\s*$')
+IN_CONDITION = re.compile(r'^\s*([^\s=!<>]+)\s+in\s*\((.*)\)\s*$', re.IGNORECASE)
+OPERATORS = {
+    '=': lambda field, value: field == value,
+    '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value,
+    '<': lambda field, value: field < value,
+    '<=': lambda field, value: field <= value,
+    '>': lambda field, value: field > value,
+    '>=': lambda field, value: field >= value,
+}
+
+
+def list_files(root):
+    """Data files under root as (path, size, mtime_ns), listing each directory level in parallel.
+
+    Names starting with '.' or '_' (_SUCCESS, _metadata, .crc files) are skipped.
+    """
+    files = []
+    pending = [root]
+    with ThreadPoolExecutor(IO_THREADS) as pool:
+        while pending:
+            directories = []
+            for entries in pool.map(lambda path: list(os.scandir(path)), pending):
+                for entry in entries:
+                    if entry.name.startswith(('.', '_')):
+                        continue
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in DATASET_FORMATS:
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+            pending = directories
+    files.sort()
+    return files
+
+
+def parse_value(text, field):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '\'"':
+        text = text[1:-1]
+    return pa.scalar(text).cast(field.type)
+
+
+def parse_filter(text, schema):
+    """Parse EXPR into an Arrow expression and the names of the columns it uses"""
+    expression, names = None, set()
+    for condition in re.split(r'\s+and\s+', text.strip(), flags=re.IGNORECASE):
+        match = IN_CONDITION.match(condition)
+        if match:
+            name, values = match.group(1), match.group(2)
+        else:
+            match = CONDITION.match(condition)
+            if not match:
+                raise ValueError(f"Cannot parse condition: {condition}")
+            name, operator, value = match.groups()
+        if schema.get_field_index(name) < 0:
+            raise ValueError(f"Unknown column: {name}")
+        field = schema.field(name)
+        if match.re is IN_CONDITION:
+            term = pc.field(name).isin(pa.array([parse_value(v, field) for v in values.split(',')], type=field.type))
+        else:
+            term = OPERATORS[operator](pc.field(name), parse_value(value, field))
+        expression = term if expression is None else expression & term
+        names.add(name)
+    return expression, names
+
+
+def footer_rows(fragment, fmt):
+    """Row counts of a fragment's row groups (Parquet) or of the whole fragment (Arrow), from its footer"""
+    if fmt == 'parquet':
+        fragment.ensure_complete_metadata()
+        return [row_group.num_rows for row_group in fragment.row_groups]
+    return [fragment.count_rows()]
+
+
+def cached_footer_rows(directory, fragments, files, fmt, cache_root):
+    """footer_rows() of every fragment, read in parallel; unchanged files come from the cache"""
+    cache_path = None
+    cache = {}
+    if cache_root:
+        os.makedirs(cache_root, exist_ok=True)
+        root_key = hashlib.sha1(os.path.abspath(directory).encode('utf-8')).hexdigest()
+        cache_path = os.path.join(cache_root, root_key + '.json')
+        cache = read_json(cache_path, {})
+    identity = {path: [size, mtime_ns] for path, size, mtime_ns in files}
+
+    def rows(fragment):
+        entry = cache.get(fragment.path)
+        if entry is not None and entry[:2] == identity[fragment.path]:
+            return entry[2]
+        return footer_rows(fragment, fmt)
+
+    counts = []
+    with ThreadPoolExecutor(IO_THREADS) as pool:
+        for i, fragment_rows in enumerate(pool.map(rows, fragments)):
+            counts.append(fragment_rows)
+            if (i + 1) % 500 == 0:
+                progress(f"Read {i + 1} of {len(fragments)} footers")
+    if cache_path is not None:
+        updated = {fragment.path: identity[fragment.path] + [fragment_rows]
+                   for fragment, fragment_rows in zip(fragments, counts)}
+        if any(cache.get(path) != entry for path, entry in updated.items()):
+            cache.update(updated)
+            write_json(cache_path, cache)
+    return counts
+
+
+def prune_row_groups(fragments, expression, schema, fmt):
+    """Drop the Parquet row groups whose statistics rule out the expression, reading footers in parallel.
+
+    Returns (fragment, row counts) for the fragments that may still hold matching rows.
+    """
+    def prune(fragment):
+        if fmt != 'parquet':
+            return fragment, footer_rows(fragment, fmt)
+        fragment.ensure_complete_metadata()
+        subset = fragment.subset(filter=expression, schema=schema)
+        return subset, [row_group.num_rows for row_group in subset.row_groups]
+
+    with ThreadPoolExecutor(IO_THREADS) as pool:
+        return [(fragment, rows) for fragment, rows in pool.map(prune, fragments) if sum(rows) > 0]
+
+
+def read_page(parts, schema, offset, limit, expression=None):
+    """Rows [offset, offset + limit) of the fragments in order, after the expression if any.
+
+    parts is [(fragment, row counts)]. Without an expression the counts are
+    exact, so fragments and row groups before the page are skipped unread.
+    With one, earlier fragments are scanned to count their matches. Returns
+    (table, total rows), where the total is None if a filtered scan stopped
+    before the end.
+    """
+    batches = []
+    collected = 0
+    position = 0
+    for fragment, rows in parts:
+        if expression is None:
+            if position + sum(rows) <= offset:
+                position += sum(rows)
+                continue
+            # Start at the row group holding the first row of the page
+            first = 0
+            while position + rows[first] <= offset:
+                position += rows[first]
+                first += 1
+            if first > 0:
+                fragment = fragment.subset(row_group_ids=[row_group.id for row_group in fragment.row_groups[first:]])
+        for batch in fragment.to_batches(schema=schema, filter=expression):
+            start = max(offset - position, 0)
+            position += batch.num_rows
+            if start < batch.num_rows:
+                batches.append(batch.slice(start, limit - collected))
+                collected += batches[-1].num_rows
+            if collected >= limit:
+                total = sum(sum(rows) for _, rows in parts) if expression is None else None
+                return pa.Table.from_batches(batches, schema=schema), total
+    return pa.Table.from_batches(batches, schema=schema), position
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a page of rows from a directory of Parquet or Arrow files")
+    parser.add_argument('directory')
+    parser.add_argument('--filter', default='', help="Conditions joined by 'and'")
+    parser.add_argument('--offset', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--cache-dir', help="Directory for cached footer row counts")
+    args = parser.parse_args()
+
+    try:
+        progress("Listing files")
+        files = list_files(args.directory)
+        if not files:
+            raise ValueError("No Parquet, Arrow or Feather files found")
+        formats = Counter(DATASET_FORMATS[os.path.splitext(path)[1].lower()] for path, _, _ in files)
+        if len(formats) > 1:
+            raise ValueError("The directory mixes Parquet and Arrow/Feather files")
+        fmt = next(iter(formats))
+        dataset = ds.dataset([path for path, _, _ in files], format=fmt,
+                             partitioning='hive', partition_base_dir=args.directory)
+        schema = dataset.schema
+        partitioning = dataset.partitioning.schema if dataset.partitioning is not None else pa.schema([])
+
+        expression, names = parse_filter(args.filter, schema) if args.filter.strip() else (None, set())
+        # Hive partition values are fixed per fragment, so this keeps exactly the matching fragments
+        fragments = list(dataset.get_fragments(filter=expression)) if expression is not None else list(dataset.get_fragments())
+        progress(f"Reading {len(fragments)} footers")
+        if names - set(partitioning.names):
+            parts = prune_row_groups(fragments, expression, schema, fmt)
+            row_filter = expression
+        else:
+            parts = list(zip(fragments, cached_footer_rows(args.directory, fragments, files, fmt, args.cache_dir)))
+            row_filter = None
+        upper_bound = sum(sum(rows) for _, rows in parts)
+
+        progress("Reading rows")
+        offset = max(args.offset, 0)
+        table, num_rows = read_page(parts, schema, offset, args.limit, row_filter)
+        result = {
+            "file_type": "dataset",
+            "format": "parquet" if fmt == 'parquet' else "arrow",
+            "partitioning": {field.name: str(field.type) for field in partitioning},
+            "filter": str(expression) if expression is not None else None,
+            "num_files": len(files),
+            "num_fragments": len(parts),
+            "num_rows": num_rows,
+            "schema": {
+                "columns": schema.names,
+                "dtypes": {field.name: str(field.type) for field in schema}
+            },
+            "offset": offset,
+            "columns": table.column_names,
+            "data": table_records(table)
+        }
+        if fmt == 'parquet':
+            result["num_row_groups"] = sum(len(rows) for _, rows in parts)
+        if num_rows is None:
+            # Only the row groups left after pruning are known; they may hold fewer matches
+            result["num_rows_upper_bound"] = upper_bound
+        print(json.dumps(result, default=str))
+    except Exception as e:
+        print(json.dumps({
+            "error": f"Failed to read dataset: {str(e)}",
+            "error_type": type(e).__name__
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
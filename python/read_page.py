@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Read one page of rows from a tabular file (Parquet, Feather, Arrow, Avro) to JSON"""
+
+import sys
+import json
+import argparse
+
+from table_source import read_page, table_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a page of rows from a tabular file")
+    parser.add_argument('file_path')
+    parser.add_argument('--offset', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--columns', default='', help="Comma-separated columns to read (default: all)")
+    args = parser.parse_args()
+
+    columns = [c for c in args.columns.split(',') if c] or None
+
+    try:
+        table, total_rows = read_page(args.file_path, max(args.offset, 0), args.limit, columns=columns)
+        result = {
+            "offset": max(args.offset, 0),
+            "num_rows": total_rows,
+            "columns": table.column_names,
+            "data": table_records(table)
+        }
+        print(json.dumps(result, default=str))
+    except Exception as e:
+        print(json.dumps({
+            "error": f"Failed to read rows: {str(e)}",
+            "error_type": type(e).__name__
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Random-sample previews
+
+By default previews show the first N rows or elements. When the extension
+passes a seed in DATA_FILE_VIEWER_SAMPLE_SEED, converters show a uniform
+random sample drawn from the whole file instead, reading only the units the
+sample falls in (rows of an array, Parquet row groups, Arrow record batches,
+Avro blocks) or streaming through the data once (reservoir sampling). The
+same seed always gives the same sample.
+"""
+
+import os
+import math
+import random
+
+SAMPLE_ENV = 'DATA_FILE_VIEWER_SAMPLE_SEED'
+
+
+def _read_seed():
+    try:
+        return int(os.environ[SAMPLE_ENV])
+    except (KeyError, ValueError):
+        return None
+
+
+# None means head-only previews
+SAMPLE_SEED = _read_seed()
+
+
+def shown(n):
+    """How many items a truncated preview shows, for "... truncated. Showing X of Y" notes"""
+    if SAMPLE_SEED is None:
+        return f"first {n}"
+    return f"{n} sampled at random (seed {SAMPLE_SEED})"
+
+
+def sample_rows(source, n):
+    """Return n elements (C order) from randomly chosen whole rows of an array-like, as a flat array.
+
+    Like memory_budget.leading_elements, but the slab along each leading axis
+    is picked at random and the rows along the last axis read are a sorted
+    random subset, so h5py, netCDF4 and memory-mapped arrays only read those
+    rows.
+    """
+    import numpy as np
+    rng = np.random.default_rng(SAMPLE_SEED)
+    shape = tuple(source.shape)
+    if not shape:
+        return np.asanyarray(source[()]).reshape(-1)[:n]
+    index = []
+    for axis in range(len(shape)):
+        inner = math.prod(shape[axis + 1:])
+        if inner >= n and axis < len(shape) - 1:
+            index.append(int(rng.integers(shape[axis])))
+        else:
+            count = min(shape[axis], math.ceil(n / max(inner, 1)))
+            index.append(np.sort(rng.choice(shape[axis], count, replace=False)))
+            break
+    return np.asanyarray(source[tuple(index)]).reshape(-1)[:n]
+
+
+def preview_elements(source, n):
+    """The elements a truncated array preview shows: leading ones, or a random sample"""
+    if SAMPLE_SEED is None:
+        from memory_budget import leading_elements
+        return leading_elements(source, n)
+    return sample_rows(source, n)
+
+
+def sample_units(unit_rows, n):
+    """Pick n rows uniformly at random from a sequence of units (row groups, batches, blocks).
+
+    The number of rows taken from each unit follows the multivariate
+    hypergeometric distribution, i.e. units are weighted by their row count,
+    which makes the combined sample uniform over all rows. Returns
+    [(unit, sorted row offsets within the unit)] for the units that were hit.
+    """
+    import numpy as np
+    rng = np.random.default_rng(SAMPLE_SEED)
+    unit_rows = [int(rows) for rows in unit_rows]
+    total = sum(unit_rows)
+    if total == 0:
+        return []
+    counts = rng.multivariate_hypergeometric(unit_rows, min(n, total))
+    return [
+        (unit, np.sort(rng.choice(unit_rows[unit], int(count), replace=False)))
+        for unit, count in enumerate(counts) if count > 0
+    ]
+
+
+def reservoir_sample(items, n):
+    """Uniform random sample of n items from a stream of unknown length, in stream order.
+
+    Returns (sample, positions, total). Only n items are held at a time.
+    """
+    rng = random.Random(SAMPLE_SEED)
+    reservoir = []
+    total = 0
+    for position, item in enumerate(items):
+        total += 1
+        if len(reservoir) < n:
+            reservoir.append((position, item))
+        else:
+            slot = rng.randrange(position + 1)
+            if slot < n:
+                reservoir[slot] = (position, item)
+    reservoir.sort(key=lambda entry: entry[0])
+    return [item for _, item in reservoir], [position for position, _ in reservoir], total
+
+
+def sample_positions(total, n):
+    """Sorted positions of n rows picked uniformly at random from total rows"""
+    return sorted(random.Random(SAMPLE_SEED).sample(range(total), min(n, total)))
+
+
+def preview_rows(df, n):
+    """The rows a truncated DataFrame preview shows: the first n, or n random rows in file order"""
+    if SAMPLE_SEED is None:
+        return df.head(n)
+    return df.iloc[sample_positions(len(df), n)]
+
+
+def sample_record_batches(reader, n):
+    """Sample n rows of an Arrow IPC file, weighting record batches by their row counts.
+
+    Returns (table, row numbers, total rows). Only one record batch is held at a time.
+    """
+    import pyarrow as pa
+    batch_rows = [reader.get_batch(i).num_rows for i in range(reader.num_record_batches)]
+    starts = [sum(batch_rows[:i]) for i in range(len(batch_rows))]
+    batches = []
+    rows = []
+    for batch, offsets in sample_units(batch_rows, n):
+        batches.append(reader.get_batch(batch).take(offsets))
+        rows.extend(int(starts[batch] + offset) for offset in offsets)
+    return pa.Table.from_batches(batches, schema=reader.schema), rows, sum(batch_rows)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Search every row of a tabular file (Parquet, Feather, Arrow, Avro) with pyarrow.compute
+
+Matches are streamed to stdout as JSON lines while scanning:
+    {"matches": [row, ...], "rows_scanned": n}
+followed by a final summary line with "done": true.
+"""
+
+import sys
+import json
+import argparse
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from table_source import iter_batches, file_format
+
+DEFAULT_MAX_MATCHES = 10000
+
+
+def emit(message):
+    print(json.dumps(message), flush=True)
+
+
+def column_mask(column, query, mode, ignore_case):
+    """Return a boolean mask of matching rows for one column, or None if the column can't match"""
+    if mode == 'equals':
+        try:
+            scalar = pa.scalar(query).cast(column.type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+            return None
+        if ignore_case and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+            return pc.equal(pc.utf8_lower(column), query.lower())
+        return pc.equal(column, scalar)
+
+    if not (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+        try:
+            column = pc.cast(column, pa.string())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            return None
+
+    if mode == 'regex':
+        return pc.match_substring_regex(column, query, ignore_case=ignore_case)
+    return pc.match_substring(column, query, ignore_case=ignore_case)
+
+
+def batch_matches(batch, query, mode, ignore_case):
+    """Return row indices within the batch where any column matches"""
+    mask = None
+    for column in batch.columns:
+        column_result = column_mask(column, query, mode, ignore_case)
+        if column_result is None:
+            continue
+        column_result = pc.fill_null(column_result, False)
+        mask = column_result if mask is None else pc.or_(mask, column_result)
+    if mask is None:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(mask.to_numpy(zero_copy_only=False))
+
+
+def make_row_group_filter(query, columns):
+    """Skip Parquet row groups whose min/max statistics exclude an equality match in every column"""
+
+    def may_match(row_group):
+        for i in range(row_group.num_columns):
+            chunk = row_group.column(i)
+            if columns and chunk.path_in_schema.split('.')[0] not in columns:
+                continue
+            stats = chunk.statistics
+            if stats is None or not stats.has_min_max:
+                return True
+            if isinstance(stats.min, str):
+                value = query
+            elif isinstance(stats.min, bytes):
+                value = query.encode('utf-8')
+            elif isinstance(stats.min, (int, float)) and not isinstance(stats.min, bool):
+                try:
+                    value = type(stats.min)(query)
+                except ValueError:
+                    # Query isn't a number, so this column can't match
+                    continue
+            else:
+                # Dates, decimals etc. would need the same casting rules as Arrow; don't prune
+                return True
+            if stats.min <= value <= stats.max:
+                return True
+        return False
+
+    return may_match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search a tabular file")
+    parser.add_argument('file_path')
+    parser.add_argument('--query', required=True)
+    parser.add_argument('--mode', choices=['substring', 'regex', 'equals'], default='substring')
+    parser.add_argument('--columns', default='', help="Comma-separated columns to search (default: all)")
+    parser.add_argument('--case-sensitive', action='store_true')
+    parser.add_argument('--max-matches', type=int, default=DEFAULT_MAX_MATCHES)
+    args = parser.parse_args()
+
+    columns = [c for c in args.columns.split(',') if c] or None
+    ignore_case = not args.case_sensitive
+
+    try:
+        row_group_filter = None
+        if args.mode == 'equals' and not ignore_case and file_format(args.file_path) == 'parquet':
+            row_group_filter = make_row_group_filter(args.query, columns)
+
+        total_matches, rows_scanned, row_groups_skipped = 0, 0, 0
+        truncated = False
+        for offset, batch in iter_batches(args.file_path, columns=columns, row_group_filter=row_group_filter):
+            if batch is None:
+                row_groups_skipped += 1
+                continue
+            rows_scanned += batch.num_rows
+            matches = batch_matches(batch, args.query, args.mode, ignore_case)
+            if len(matches) > 0:
+                remaining = args.max_matches - total_matches
+                if len(matches) > remaining:
+                    matches, truncated = matches[:remaining], True
+                total_matches += len(matches)
+                emit({"matches": (matches + offset).tolist(), "rows_scanned": rows_scanned})
+            if truncated:
+                break
+
+        emit({
+            "done": True,
+            "total_matches": total_matches,
+            "rows_scanned": rows_scanned,
+            "row_groups_skipped": row_groups_skipped,
+            "truncated": truncated
+        })
+    except Exception as e:
+        emit({
+            "error": f"Search failed: {str(e)}",
+            "error_type": type(e).__name__
+        })
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
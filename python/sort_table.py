@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Sort a tabular file (Parquet, Feather, Arrow, Avro) by one column without loading it into memory
+
+Only the sort column is read. Pages near the top are answered with a bounded
+top-k selection that keeps at most k candidates per record batch; its first
+TOPK_LIMIT rows are cached, so paging through them scans the column once. Deeper pages
+use an external merge sort: sorted runs (and the ids of null rows) are spilled to
+the cache directory and merged into a permutation (.npy of row ids) that is cached per file and column,
+so paging through the sorted table afterwards only reads the requested rows.
+
+Progress is streamed as JSON lines ({"progress": ...}); the last line is the page.
+Nulls always sort last. Strings sort by their first STRING_KEY_CHARS characters.
+"""
+
+import sys
+import os
+import json
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from file_cache import cache_dir, read_json, write_json, save_array
+from table_source import iter_batches, take_rows, table_records
+
+TOPK_LIMIT = 10000
+# Keys and row ids held in memory before a run is sorted and spilled
+RUN_BYTES = 256 * 1024 * 1024
+MERGE_BLOCK = 65536
+# Keys are fixed-width numpy strings, as wide as the longest in a batch; capped so
+# one long value does not size every key of the batch and its run
+STRING_KEY_CHARS = 256
+
+
+def emit(message):
+    print(json.dumps(message, default=str), flush=True)
+
+
+def sort_keys(column):
+    """Convert an Arrow column to (numpy sort keys, validity mask)"""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    valid = np.asarray(column.is_valid().to_numpy(zero_copy_only=False), dtype=bool)
+    t = column.type
+    if pa.types.is_dictionary(t):
+        column = column.cast(t.value_type)
+        t = column.type
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        column = pc.utf8_slice_codeunits(column.fill_null(''), 0, STRING_KEY_CHARS)
+        values = np.asarray(column.to_numpy(zero_copy_only=False), dtype=str)
+    elif pa.types.is_boolean(t):
+        values = column.fill_null(False).to_numpy(zero_copy_only=False).astype(np.uint8)
+    elif pa.types.is_timestamp(t) or pa.types.is_date(t) or pa.types.is_time(t) or pa.types.is_duration(t):
+        values = pc.cast(column, pa.int64()).fill_null(0).to_numpy(zero_copy_only=False)
+    elif pa.types.is_integer(t) or pa.types.is_floating(t):
+        values = column.to_numpy(zero_copy_only=False)
+        if pa.types.is_integer(t) and not valid.all():
+            values = column.fill_null(0).to_numpy(zero_copy_only=False)
+        if pa.types.is_floating(t):
+            # NaN sorts with nulls
+            valid &= ~np.isnan(values)
+    else:
+        raise ValueError(f"Column type {t} can't be sorted")
+    return values, valid
+
+
+def iter_keys(file_path, column):
+    """Yield (sort keys, global row ids, null row ids) for each batch of the column"""
+    for offset, batch in iter_batches(file_path, columns=[column]):
+        if batch.num_rows == 0:
+            continue
+        values, valid = sort_keys(batch.column(0))
+        ids = np.arange(offset, offset + batch.num_rows, dtype=np.int64)
+        yield values[valid], ids[valid], ids[~valid], offset + batch.num_rows
+
+
+def top_k(file_path, column, k, descending):
+    """Return the row ids of the first k rows in sort order, keeping at most k candidates per batch"""
+    best_values, best_ids = None, np.empty(0, dtype=np.int64)
+    null_ids, num_rows = [], 0
+    for values, ids, nulls, num_rows in iter_keys(file_path, column):
+        if len(null_ids) < k:
+            null_ids.extend(nulls[:k - len(null_ids)].tolist())
+        if best_values is not None:
+            values = np.concatenate([best_values, values])
+            ids = np.concatenate([best_ids, ids])
+        if len(values) > k:
+            keep = np.argsort(values, kind='stable')
+            keep = keep[-k:] if descending else keep[:k]
+            values, ids = values[keep], ids[keep]
+        best_values, best_ids = values, ids
+    if best_values is None:
+        return np.asarray(null_ids[:k], dtype=np.int64), num_rows
+    order = np.argsort(best_values, kind='stable')
+    if descending:
+        order = order[::-1]
+    ranked = np.concatenate([best_ids[order], np.asarray(null_ids, dtype=np.int64)])
+    return ranked[:k], num_rows
+
+
+def cached_top_k(file_path, column, descending, cache_root):
+    """The first TOPK_LIMIT row ids in sort order, cached so paging through them is one scan"""
+    directory = cache_dir(cache_root, file_path, 'sort', column)
+    name = 'top_desc' if descending else 'top_asc'
+    meta = read_json(os.path.join(directory, name + '.json'))
+    if meta is not None:
+        return np.load(os.path.join(directory, name + '.npy')), meta["num_rows"], True
+    ranked, num_rows = top_k(file_path, column, TOPK_LIMIT, descending)
+    save_array(os.path.join(directory, name + '.npy'), ranked)
+    # Written last, as for the permutation
+    write_json(os.path.join(directory, name + '.json'), {"num_rows": num_rows})
+    return ranked, num_rows, False
+
+
+class IdSpill:
+    """Row ids appended to an .npy file as they are found, rather than kept in memory"""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._f = open(path, 'wb')
+        self._header_bytes = self._write_header()
+
+    def _write_header(self):
+        self._f.seek(0)
+        np.lib.format.write_array_header_1_0(self._f, {'descr': '<i8', 'fortran_order': False, 'shape': (self.count,)})
+        return self._f.tell()
+
+    def append(self, ids):
+        self._f.write(np.ascontiguousarray(ids, dtype='<i8').tobytes())
+        self.count += len(ids)
+
+    def close(self):
+        # numpy pads the header for the shape to grow, so the final count fits in place
+        if self._write_header() != self._header_bytes:
+            raise RuntimeError("Row id header changed size")
+        self._f.close()
+
+
+def spill_runs(file_path, column, work_dir):
+    """Write sorted runs of (keys, row ids) and the null row ids (nulls.npy) to work_dir.
+
+    Returns (run paths, number of nulls, total rows).
+    """
+    runs, pending_values, pending_ids = [], [], []
+    pending_rows, key_bytes, num_rows = 0, 0, 0
+    nulls = IdSpill(os.path.join(work_dir, 'nulls.npy'))
+
+    def flush():
+        values = np.concatenate(pending_values)
+        ids = np.concatenate(pending_ids)
+        order = np.argsort(values, kind='stable')
+        prefix = os.path.join(work_dir, f'run_{len(runs)}')
+        np.save(prefix + '_keys.npy', values[order])
+        np.save(prefix + '_ids.npy', ids[order])
+        runs.append(prefix)
+        emit({"progress": f"Sorted run {len(runs)} ({num_rows:,} rows read)"})
+
+    try:
+        for values, ids, batch_nulls, num_rows in iter_keys(file_path, column):
+            nulls.append(batch_nulls)
+            pending_values.append(values)
+            pending_ids.append(ids)
+            pending_rows += len(values)
+            # Joined into one run, every key takes the width of the widest string in it
+            key_bytes = max(key_bytes, values.dtype.itemsize)
+            if pending_rows * (key_bytes + ids.dtype.itemsize) >= RUN_BYTES:
+                flush()
+                pending_values, pending_ids = [], []
+                pending_rows, key_bytes = 0, 0
+        if pending_values:
+            flush()
+    finally:
+        nulls.close()
+
+    return runs, nulls.count, num_rows
+
+
+def merge_runs(runs, out, out_keys=None):
+    """Vectorised k-way merge of sorted runs into the output id array (and the merged keys into out_keys).
+
+    Each round takes a block from every run and emits everything up to the
+    smallest block-end key, which is guaranteed to precede all unread keys.
+    """
+    keys = [np.load(r + '_keys.npy', mmap_mode='r') for r in runs]
+    ids = [np.load(r + '_ids.npy', mmap_mode='r') for r in runs]
+    positions = [0] * len(runs)
+    written = 0
+
+    while True:
+        active = [i for i in range(len(runs)) if positions[i] < len(keys[i])]
+        if not active:
+            break
+        blocks = {i: keys[i][positions[i]:positions[i] + MERGE_BLOCK] for i in active}
+        partial = [i for i in active if positions[i] + MERGE_BLOCK < len(keys[i])]
+        bound = min(blocks[i][-1] for i in partial) if partial else None
+
+        round_keys, round_ids = [], []
+        for i in active:
+            n = len(blocks[i]) if bound is None else int(np.searchsorted(blocks[i], bound, side='right'))
+            if n == 0:
+                continue
+            round_keys.append(blocks[i][:n])
+            round_ids.append(ids[i][positions[i]:positions[i] + n])
+            positions[i] += n
+        round_keys = np.concatenate(round_keys)
+        round_ids = np.concatenate(round_ids)
+        order = np.argsort(round_keys, kind='stable')
+        out[written:written + len(order)] = round_ids[order]
+        if out_keys is not None:
+            out_keys[written:written + len(order)] = round_keys[order]
+        written += len(order)
+
+    return written
+
+
+def build_permutation(file_path, column, cache_root):
+    """Build (or load) the cached ascending permutation for a column"""
+    directory = cache_dir(cache_root, file_path, 'sort', column)
+    meta_path = os.path.join(directory, 'meta.json')
+    perm_path = os.path.join(directory, 'permutation.npy')
+    nulls_path = os.path.join(directory, 'nulls.npy')
+
+    meta = read_json(meta_path)
+    if meta and os.path.exists(perm_path):
+        return np.load(perm_path, mmap_mode='r'), np.load(nulls_path, mmap_mode='r'), meta["num_rows"], True
+
+    # Private to this process: concurrent sorts of the same column must not share runs
+    work_dir = tempfile.mkdtemp(dir=directory, prefix='runs-')
+    try:
+        runs, num_nulls, num_rows = spill_runs(file_path, column, work_dir)
+        num_valid = num_rows - num_nulls
+        emit({"progress": f"Merging {len(runs)} sorted runs..."})
+        tmp_path = os.path.join(work_dir, 'permutation.npy')
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.int64, shape=(num_valid,))
+        if runs:
+            merge_runs(runs, out)
+        out.flush()
+        del out
+        os.replace(tmp_path, perm_path)
+        os.replace(os.path.join(work_dir, 'nulls.npy'), nulls_path)
+        write_json(meta_path, {"num_rows": num_rows, "num_valid": num_valid, "runs": len(runs)})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return np.load(perm_path, mmap_mode='r'), np.load(nulls_path, mmap_mode='r'), num_rows, False
+
+
+def permutation_page(permutation, nulls, offset, limit, descending):
+    """Slice the sorted order, reading the ascending permutation backwards for descending sorts"""
+    num_valid = len(permutation)
+    positions = np.arange(offset, offset + limit)
+    ids = []
+    for position in positions:
+        if position < num_valid:
+            ids.append(permutation[num_valid - 1 - position] if descending else permutation[position])
+        elif position - num_valid < len(nulls):
+            ids.append(nulls[position - num_valid])
+    return np.asarray(ids, dtype=np.int64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort a tabular file by one column")
+    parser.add_argument('file_path')
+    parser.add_argument('--column', required=True)
+    parser.add_argument('--descending', action='store_true')
+    parser.add_argument('--offset', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--cache-dir', default=None)
+    args = parser.parse_args()
+
+    cache_root = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.file_path)), '.sort-cache')
+    offset, limit = max(args.offset, 0), max(args.limit, 0)
+
+    try:
+        cached_meta = read_json(os.path.join(cache_dir(cache_root, args.file_path, 'sort', args.column), 'meta.json'))
+        if cached_meta is None and offset + limit <= TOPK_LIMIT:
+            ranked, num_rows, cached = cached_top_k(args.file_path, args.column, args.descending, cache_root)
+            row_ids, method = ranked[offset:offset + limit], 'top-k'
+        else:
+            permutation, nulls, num_rows, cached = build_permutation(args.file_path, args.column, cache_root)
+            row_ids = permutation_page(permutation, nulls, offset, limit, args.descending)
+            method = 'external-sort'
+
+        table = take_rows(args.file_path, row_ids)
+        emit({
+            "column": args.column,
+            "descending": args.descending,
+            "offset": offset,
+            "num_rows": num_rows,
+            "method": method,
+            "cached": cached,
+            "row_ids": row_ids.tolist(),
+            "columns": table.column_names,
+            "data": table_records(table)
+        })
+    except Exception as e:
+        emit({
+            "error": f"Failed to sort by '{args.column}': {str(e)}",
+            "error_type": type(e).__name__
+        })
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""Streaming access to tabular files (Parquet, Feather, Arrow, Avro) as Arrow record batches"""
+
+import os
+import json
+import math
+import datetime
+import decimal
+
+import pyarrow as pa
+
+BATCH_SIZE = 65536
+
+PARQUET_EXTENSIONS = ('.parquet',)
+ARROW_EXTENSIONS = ('.arrow', '.feather')
+AVRO_EXTENSIONS = ('.avro',)
+
+AVRO_PRIMITIVES = {
+    'null': pa.null(), 'boolean': pa.bool_(), 'int': pa.int32(), 'long': pa.int64(),
+    'float': pa.float32(), 'double': pa.float64(), 'bytes': pa.binary(), 'string': pa.string()
+}
+AVRO_LOGICAL = {
+    'date': pa.date32(), 'time-millis': pa.time32('ms'), 'time-micros': pa.time64('us'),
+    'timestamp-millis': pa.timestamp('ms', tz='UTC'), 'timestamp-micros': pa.timestamp('us', tz='UTC'),
+    'local-timestamp-millis': pa.timestamp('ms'), 'local-timestamp-micros': pa.timestamp('us'),
+    'uuid': pa.string()
+}
+
+
+def file_format(file_path):
+    """Return 'parquet', 'arrow' or 'avro' for a supported tabular file"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in PARQUET_EXTENSIONS:
+        return 'parquet'
+    if ext in ARROW_EXTENSIONS:
+        return 'arrow'
+    if ext in AVRO_EXTENSIONS:
+        return 'avro'
+    raise ValueError(f"Unsupported tabular file type: {ext}")
+
+
+def open_arrow(file_path):
+    """Open an Arrow IPC file (Feather v2 is the same format), falling back to Feather v1/streams.
+
+    Returns (schema, list of zero-argument callables producing each record batch).
+    """
+    source = pa.memory_map(file_path, 'r')
+    try:
+        reader = pa.ipc.open_file(source)
+        return reader.schema, [lambda i=i: reader.get_batch(i) for i in range(reader.num_record_batches)]
+    except pa.ArrowInvalid:
+        pass
+
+    try:
+        source.seek(0)
+        batches = list(pa.ipc.open_stream(source))
+        schema = batches[0].schema if batches else pa.schema([])
+    except pa.ArrowInvalid:
+        import pyarrow.feather as feather
+        table = feather.read_table(file_path)
+        schema, batches = table.schema, table.to_batches()
+    return schema, [lambda b=b: b for b in batches]
+
+
+def iter_avro_records(file_path):
+    from avro.datafile import DataFileReader
+    from avro.io import DatumReader
+
+    with open(file_path, 'rb') as f:
+        reader = DataFileReader(f, DatumReader())
+        try:
+            for record in reader:
+                yield record
+        finally:
+            reader.close()
+
+
+def read_avro_schema(file_path):
+    """The writer schema from an Avro file's header, as parsed JSON"""
+    from avro.datafile import DataFileReader
+    from avro.io import DatumReader
+
+    with open(file_path, 'rb') as f:
+        reader = DataFileReader(f, DatumReader())
+        try:
+            return json.loads(reader.meta['avro.schema'].decode('utf-8'))
+        finally:
+            reader.close()
+
+
+def avro_arrow_type(schema, named):
+    """Arrow type of an Avro type (parsed JSON), or None if it has no single Arrow equivalent"""
+    if isinstance(schema, str):
+        return named.get(schema, AVRO_PRIMITIVES.get(schema))
+    if isinstance(schema, list):
+        # A union of null and one other type is a nullable column of that type
+        others = [member for member in schema if member != 'null']
+        if not others:
+            return pa.null()
+        return avro_arrow_type(others[0], named) if len(others) == 1 else None
+
+    kind, logical = schema.get('type'), schema.get('logicalType')
+    if logical == 'decimal' and kind in ('bytes', 'fixed'):
+        precision, scale = schema['precision'], schema.get('scale', 0)
+        arrow_type = pa.decimal128(precision, scale) if precision <= 38 else pa.decimal256(precision, scale)
+    elif logical in AVRO_LOGICAL:
+        arrow_type = AVRO_LOGICAL[logical]
+    elif kind == 'record':
+        fields = [(field['name'], avro_arrow_type(field['type'], named)) for field in schema.get('fields', [])]
+        arrow_type = pa.struct(fields) if all(t is not None for _, t in fields) else None
+    elif kind == 'enum':
+        arrow_type = pa.string()
+    elif kind == 'fixed':
+        arrow_type = pa.binary(schema['size'])
+    elif kind == 'array':
+        items = avro_arrow_type(schema['items'], named)
+        arrow_type = pa.list_(items) if items is not None else None
+    elif kind == 'map':
+        values = avro_arrow_type(schema['values'], named)
+        arrow_type = pa.map_(pa.string(), values) if values is not None else None
+    else:
+        arrow_type = avro_arrow_type(kind, named)
+    if kind in ('record', 'enum', 'fixed') and 'name' in schema:
+        # Later fields may refer to a named type by its name or full name
+        named[schema['name']] = arrow_type
+        if schema.get('namespace'):
+            named[f"{schema['namespace']}.{schema['name']}"] = arrow_type
+    return arrow_type
+
+
+def avro_schema(file_path):
+    """Arrow schema of an Avro file's records, from the writer schema in its header.
+
+    Decoded batches use it rather than types inferred from their records, which
+    make a field that is null throughout one batch a null column. None if a
+    field has no single Arrow type (e.g. a union of several non-null types).
+    """
+    arrow_type = avro_arrow_type(read_avro_schema(file_path), {})
+    if arrow_type is None or not pa.types.is_struct(arrow_type):
+        return None
+    return pa.schema([arrow_type.field(i) for i in range(arrow_type.num_fields)])
+
+
+def records_to_batch(records, schema=None):
+    if schema is not None:
+        try:
+            return pa.RecordBatch.from_pylist(records, schema=schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            pass  # e.g. logical types left undecoded by older avro packages
+    return pa.RecordBatch.from_pylist(records)
+
+
+def iter_batches(file_path, columns=None, row_group_filter=None, batch_size=BATCH_SIZE):
+    """Yield (row_offset, record_batch) for every batch in the file.
+
+    row_group_filter(row_group_metadata) may return False to skip a Parquet row
+    group without reading it; skipped groups are yielded as (row_offset, None).
+    """
+    fmt = file_format(file_path)
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(file_path)
+        offset = 0
+        for i in range(pf.metadata.num_row_groups):
+            rg = pf.metadata.row_group(i)
+            if row_group_filter is not None and not row_group_filter(rg):
+                yield offset, None
+                offset += rg.num_rows
+                continue
+            for batch in pf.iter_batches(batch_size=batch_size, row_groups=[i], columns=columns):
+                yield offset, batch
+                offset += batch.num_rows
+        return
+
+    if fmt == 'arrow':
+        _, batch_loaders = open_arrow(file_path)
+        offset = 0
+        for load in batch_loaders:
+            batch = load()
+            if columns:
+                batch = batch.select(columns)
+            yield offset, batch
+            offset += batch.num_rows
+        return
+
+    schema = avro_schema(file_path)
+    if schema is not None and columns:
+        schema = pa.schema([schema.field(name) for name in columns])
+    records, offset = [], 0
+    for record in iter_avro_records(file_path):
+        records.append({k: record.get(k) for k in columns} if columns else record)
+        if len(records) >= batch_size:
+            batch = records_to_batch(records, schema)
+            yield offset, batch
+            offset += batch.num_rows
+            records = []
+    if records:
+        yield offset, records_to_batch(records, schema)
+
+
+def read_page(file_path, offset, limit, columns=None):
+    """Read rows [offset, offset + limit) touching only the row groups/batches that hold them"""
+    fmt = file_format(file_path)
+    end = offset + limit
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(file_path)
+        groups, first_row, start = [], None, 0
+        for i in range(pf.metadata.num_row_groups):
+            num_rows = pf.metadata.row_group(i).num_rows
+            if start + num_rows > offset and start < end:
+                groups.append(i)
+                if first_row is None:
+                    first_row = start
+            start += num_rows
+        if not groups:
+            return pf.schema_arrow.empty_table(), pf.metadata.num_rows
+        table = pf.read_row_groups(groups, columns=columns)
+        return table.slice(offset - first_row, limit), pf.metadata.num_rows
+
+    if fmt == 'arrow':
+        schema, batch_loaders = open_arrow(file_path)
+        selected, start, total = [], 0, 0
+        for load in batch_loaders:
+            batch = load()
+            n = batch.num_rows
+            if start + n > offset and start < end:
+                lo = max(offset - start, 0)
+                selected.append(batch.slice(lo, min(end, start + n) - start - lo))
+            start += n
+            total += n
+        table = pa.Table.from_batches(selected, schema=schema) if selected else schema.empty_table()
+        return (table.select(columns) if columns else table), total
+
+    # Avro has no row index, but the block headers hold record counts: find the block
+    # the page starts in and decode from there until the page is full
+    from avro.datafile import DataFileReader
+    from avro.io import DatumReader
+    from convert_avro import scan_blocks
+
+    records = []
+    with open(file_path, 'rb') as f:
+        reader = DataFileReader(f, DatumReader())
+        try:
+            blocks = scan_blocks(reader, os.path.getsize(file_path))
+            total = sum(count for _, count in blocks)
+            start = 0
+            for block_offset, count in blocks:
+                if start + count > offset:
+                    f.seek(block_offset)
+                    reader.block_count = 0
+                    for i in range(start, min(end, total)):
+                        record = next(reader)
+                        if i >= offset:
+                            records.append({k: record.get(k) for k in columns} if columns else record)
+                    break
+                start += count
+        finally:
+            reader.close()
+    return pa.Table.from_pylist(records), total
+
+
+def take_rows(file_path, row_ids, columns=None):
+    """Read the given global row indices (in the given order), touching only the row groups/batches that hold them"""
+    import numpy as np
+
+    row_ids = np.asarray(row_ids, dtype=np.int64)
+    fmt = file_format(file_path)
+
+    if fmt == 'avro':
+        wanted = {}
+        for i, r in enumerate(row_ids):
+            wanted.setdefault(int(r), []).append(i)
+        records = [None] * len(row_ids)
+        last = max(wanted, default=-1)
+        for i, record in enumerate(iter_avro_records(file_path)):
+            if i > last:
+                break  # Every wanted row has been read
+            for position in wanted.get(i, ()):
+                records[position] = {k: record.get(k) for k in columns} if columns else record
+        return pa.Table.from_pylist(records)
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pf = pq.ParquetFile(file_path)
+        sizes = [pf.metadata.row_group(i).num_rows for i in range(pf.metadata.num_row_groups)]
+        load_unit = lambda i: pf.read_row_group(i, columns=columns)
+        schema = pf.schema_arrow
+    else:
+        schema, batch_loaders = open_arrow(file_path)
+        batches = [load() for load in batch_loaders]
+        sizes = [b.num_rows for b in batches]
+        load_unit = lambda i: pa.Table.from_batches([batches[i]]).select(columns) if columns else pa.Table.from_batches([batches[i]])
+
+    if len(row_ids) == 0:
+        empty = schema.empty_table()
+        return empty.select(columns) if columns else empty
+
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    units = np.searchsorted(starts, row_ids, side='right') - 1
+    pieces, order = [], []
+    for unit in np.unique(units):
+        positions = np.flatnonzero(units == unit)
+        pieces.append(load_unit(int(unit)).take(pa.array(row_ids[positions] - starts[unit])))
+        order.append(positions)
+    table = pa.concat_tables(pieces)
+    # Restore the requested order
+    return table.take(pa.array(np.argsort(np.concatenate(order), kind='stable')))
+
+
+def sanitize(value):
+    """Make a Python value (from Arrow to_pylist) JSON-serializable"""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+        return value
+    if isinstance(value, dict):
+        return {str(k): sanitize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(v) for v in value]
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return f"<bytes: {len(value)} bytes>"
+    if isinstance(value, (datetime.date, datetime.time, datetime.timedelta, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+def table_records(table):
+    """Convert an Arrow table to a list of JSON-serializable row dicts"""
+    return [sanitize(row) for row in table.to_pylist()]
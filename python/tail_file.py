@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Read only what was appended to a growing file since the last read
+
+Without --state-file, records where the file currently ends. With the state from
+the previous call, returns the items appended since then and the new state:
+    HDF5     - rows added along the first axis of resizable datasets, and new datasets
+    Avro     - records in the blocks written after the last complete block
+    msgpack  - objects appended to a stream of objects written one after another,
+               followed (and numbered) from where the file ended when first called
+    Parquet  - row groups added to a rewritten file whose earlier row groups are unchanged
+A block or object that is still being written is left for the next call. If
+the file changed in a way the state cannot follow (truncated, earlier bytes
+rewritten, a dataset shrank), the result is {"reset": true} and the file has
+to be converted again.
+
+Usage: tail_file.py <file_path> [--state-file PATH]
+"""
+
+import os
+import sys
+import json
+import math
+import hashlib
+import argparse
+from collections import deque
+
+# At most this many appended records/objects (or array elements) are returned per call; the newest win
+TAIL_ITEMS = 1000
+# Bytes in front of the last read position that must be unchanged for the state to stay valid
+CHECK_BYTES = 4096
+READ_BYTES = 4 * 1024 * 1024
+
+RESET = {"reset": True}
+
+
+def byte_check(f, offset):
+    """Digest of the bytes just before offset, to detect a rewritten file"""
+    start = max(0, offset - CHECK_BYTES)
+    f.seek(start)
+    return hashlib.blake2b(f.read(offset - start), digest_size=16).hexdigest()
+
+
+def unchanged(f, state, file_size):
+    return file_size >= state["offset"] and byte_check(f, state["offset"]) == state["check"]
+
+
+def tail_avro(file_path, state):
+    from avro.datafile import DataFileReader
+    from avro.io import DatumReader
+    from convert_avro import scan_blocks
+
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        reader = DataFileReader(f, DatumReader())
+        try:
+            if state is not None:
+                if not unchanged(f, state, file_size):
+                    return RESET
+                f.seek(state["offset"])
+            blocks = scan_blocks(reader, file_size)
+            offset = f.tell()
+            previous = state["records"] if state is not None else 0
+            count = sum(records for _, records in blocks)
+
+            appended = []
+            if state is not None and blocks:
+                # Decode only the last blocks, which hold the newest records
+                first_block = len(blocks)
+                kept = 0
+                while first_block > 0 and kept < TAIL_ITEMS:
+                    first_block -= 1
+                    kept += blocks[first_block][1]
+                records = []
+                for block_offset, block_records in blocks[first_block:]:
+                    f.seek(block_offset)
+                    reader.block_count = 0
+                    records.extend(next(reader) for _ in range(block_records))
+                records = records[-TAIL_ITEMS:]
+                appended.append({
+                    "label": f"records {previous}-{previous + count - 1}",
+                    "count": count,
+                    "first": previous + count - len(records),
+                    "shown": len(records),
+                    "data": records
+                })
+            return {
+                "state": {"offset": offset, "check": byte_check(f, offset), "records": previous + count},
+                "appended": appended
+            }
+        finally:
+            reader.close()
+
+
+def tail_msgpack(file_path, state):
+    import msgpack
+    from convert_msgpack import expand
+    from output_budget import OutputBudget
+
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        if state is None:
+            # Objects are counted from here: counting those already written would decode the whole file
+            return {
+                "state": {"offset": file_size, "check": byte_check(f, file_size), "objects": 0},
+                "appended": []
+            }
+        if not unchanged(f, state, file_size):
+            return RESET
+        start = state["offset"]
+        previous = state["objects"]
+        f.seek(start)
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        newest = deque(maxlen=TAIL_ITEMS)
+        count = 0
+        offset = start
+        while True:
+            chunk = f.read(READ_BYTES)
+            if not chunk:
+                break
+            unpacker.feed(chunk)
+            # Only complete objects come out; a partly written one stays buffered
+            while True:
+                try:
+                    newest.append(unpacker.unpack())
+                except msgpack.OutOfData:
+                    break
+                count += 1
+                offset = start + unpacker.tell()
+
+        appended = []
+        if count:
+            appended.append({
+                "label": f"appended objects {previous}-{previous + count - 1}",
+                "count": count,
+                "first": previous + count - len(newest),
+                "shown": len(newest),
+                "data": OutputBudget().fit(list(newest), expand)
+            })
+        return {
+            "state": {"offset": offset, "check": byte_check(f, offset), "objects": previous + count},
+            "appended": appended
+        }
+
+
+def open_hdf5(file_path):
+    import h5py
+    try:
+        # Follows datasets that a SWMR writer is still extending
+        return h5py.File(file_path, 'r', swmr=True)
+    except (OSError, ValueError):
+        return h5py.File(file_path, 'r')
+
+
+def tail_hdf5(file_path, state):
+    import h5py
+    from convert_h5 import convert_dataset
+    from output_budget import OutputBudget
+    from array_encoding import array_values
+    from h5_chunks import chunked
+
+    with open_hdf5(file_path) as f:
+        shapes = {}
+        f.visititems(lambda name, obj: shapes.__setitem__('/' + name, obj.shape) if isinstance(obj, h5py.Dataset) else None)
+        appended = []
+        if state is not None:
+            known = state["datasets"]
+            if any(path not in shapes for path in known):
+                return RESET
+            for path, shape in shapes.items():
+                if path not in known:
+                    appended.append({"label": f"new dataset {path}", "count": 1, "data": OutputBudget().fit(convert_dataset(f[path]))})
+                    continue
+                old = tuple(known[path])
+                if old == shape:
+                    continue
+                if len(old) != len(shape) or not shape or shape[0] < old[0] or shape[1:] != old[1:]:
+                    return RESET  # Only growth along the first axis can be followed
+                # The newest rows, up to TAIL_ITEMS elements
+                row_elements = max(1, math.prod(shape[1:]))
+                first = max(old[0], shape[0] - max(1, TAIL_ITEMS // row_elements))
+                rows = chunked(f[path])[first:shape[0]]
+                appended.append({
+                    "label": f"{path} rows {old[0]}-{shape[0] - 1}",
+                    "count": shape[0] - old[0],
+                    "first": first,
+                    "shown": shape[0] - first,
+                    "data": {
+                        "_type": "hdf5.dataset",
+                        "dtype": str(rows.dtype),
+                        "shape": list(rows.shape),
+                        "data": array_values(rows)
+                    }
+                })
+        return {
+            "state": {"datasets": {path: list(shape) for path, shape in shapes.items()}},
+            "appended": appended
+        }
+
+
+def row_group_fingerprint(row_group):
+    """[rows, digest of sizes and column statistics]: tells whether a rewrite kept a row group as it was"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(row_group.total_byte_size).encode())
+    for i in range(row_group.num_columns):
+        column = row_group.column(i)
+        statistics = column.statistics
+        digest.update(str((column.total_compressed_size,
+                           statistics.min, statistics.max, statistics.null_count)
+                          if statistics is not None and statistics.has_min_max else
+                          column.total_compressed_size).encode())
+    return [row_group.num_rows, digest.hexdigest()]
+
+
+def tail_parquet(file_path, state):
+    import pyarrow.parquet as pq
+    from table_source import table_records
+
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    groups = [row_group_fingerprint(metadata.row_group(i)) for i in range(metadata.num_row_groups)]
+    appended = []
+    if state is not None:
+        known = state["row_groups"]
+        if groups[:len(known)] != known:
+            return RESET
+        new_groups = list(range(len(known), len(groups)))
+        if new_groups:
+            previous = sum(rows for rows, _ in known)
+            count = sum(groups[i][0] for i in new_groups)
+            # Read only the last row groups, which hold the newest rows
+            first_group = len(groups)
+            kept = 0
+            while first_group > len(known) and kept < TAIL_ITEMS:
+                first_group -= 1
+                kept += groups[first_group][0]
+            table = parquet_file.read_row_groups(list(range(first_group, len(groups))))
+            table = table.slice(max(0, table.num_rows - TAIL_ITEMS))
+            appended.append({
+                "label": f"rows {previous}-{previous + count - 1}",
+                "count": count,
+                "first": previous + count - table.num_rows,
+                "shown": table.num_rows,
+                "data": table_records(table)
+            })
+    return {"state": {"row_groups": groups}, "appended": appended}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read what was appended to a file since the last read")
+    parser.add_argument('file_path')
+    parser.add_argument('--state-file', help="File holding the state returned by the previous call")
+    args = parser.parse_args()
+
+    ext = os.path.splitext(args.file_path)[1].lower()
+    try:
+        state = None
+        if args.state_file:
+            with open(args.state_file, 'r') as f:
+                state = json.load(f)
+        if ext in ('.h5', '.hdf5'):
+            result = tail_hdf5(args.file_path, state)
+        elif ext == '.avro':
+            result = tail_avro(args.file_path, state)
+        elif ext == '.msgpack':
+            result = tail_msgpack(args.file_path, state)
+        elif ext == '.parquet':
+            result = tail_parquet(args.file_path, state)
+        else:
+            raise ValueError(f"Appended data cannot be followed in {ext} files")
+        print(json.dumps(result, default=str))
+    except Exception as e:
+        print(json.dumps({
+            "error": f"Failed to read appended data: {str(e)}",
+            "error_type": type(e).__name__
+        }))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
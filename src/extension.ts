@@ -1,5 +1,8 @@
 import * as vscode from 'vscode';
 import { PythonRunner } from './utils/PythonRunner';
+import { CompareView } from './utils/CompareView';
+import { DatasetView } from './utils/DatasetView';
+import { QuickLook } from './utils/QuickLook';
 import { PklEditorProvider } from './providers/PklEditorProvider';
 import { H5EditorProvider } from './providers/H5EditorProvider';
 import { ParquetEditorProvider } from './providers/ParquetEditorProvider';
@@ -32,6 +35,8 @@ export function activate(context: vscode.ExtensionContext) {
         NetCDFEditorProvider.register(context),
         MatEditorProvider.register(context)
     );
+
+    context.subscriptions.push(CompareView.register(context), DatasetView.register(context), QuickLook.register(context));
 }
 
 export function deactivate() {}
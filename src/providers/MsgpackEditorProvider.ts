@@ -1,7 +1,6 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
-import { BaseEditorProvider } from '../utils/BaseEditorProvider';
-import { PythonRunner } from '../utils/PythonRunner';
+import { BaseEditorProvider, ConversionOptions } from '../utils/BaseEditorProvider';
 
 export class MsgpackEditorProvider extends BaseEditorProvider {
     public static readonly viewType = 'dataFileViewer.msgpack';
@@ -15,10 +14,18 @@ export class MsgpackEditorProvider extends BaseEditorProvider {
         super();
     }
 
-    protected async convertToJson(uri: vscode.Uri): Promise<any> {
+    protected async convertToJson(uri: vscode.Uri, options?: ConversionOptions): Promise<any> {
         const scriptPath = path.join(this.context.extensionPath, 'python', 'convert_msgpack.py');
-        const output = await PythonRunner.runScript(scriptPath, [uri.fsPath]);
-        return JSON.parse(output);
+        return this.runConverter(scriptPath, uri, options);
+    }
+
+    protected supportsTail(): boolean {
+        return true;
+    }
+
+    protected getRequiredModules(): string[] {
+        // zstandard/lz4 are only needed for .zst/.lz4 files and are installed on demand
+        return ['msgpack'];
     }
 
     protected getFileTypeDisplay(): string {
@@ -1,7 +1,6 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
-import { BaseEditorProvider } from '../utils/BaseEditorProvider';
-import { PythonRunner } from '../utils/PythonRunner';
+import { BaseEditorProvider, ConversionOptions } from '../utils/BaseEditorProvider';
 
 export class NetCDFEditorProvider extends BaseEditorProvider {
     public static readonly viewType = 'dataFileViewer.netcdf';
@@ -15,10 +14,17 @@ export class NetCDFEditorProvider extends BaseEditorProvider {
         super();
     }
 
-    protected async convertToJson(uri: vscode.Uri): Promise<any> {
+    protected async convertToJson(uri: vscode.Uri, options?: ConversionOptions): Promise<any> {
         const scriptPath = path.join(this.context.extensionPath, 'python', 'convert_netcdf.py');
-        const output = await PythonRunner.runScript(scriptPath, [uri.fsPath]);
-        return JSON.parse(output);
+        return this.runConverter(scriptPath, uri, options);
+    }
+
+    protected supportsHeatmap(): boolean {
+        return true;
+    }
+
+    protected getRequiredModules(): string[] {
+        return ['netCDF4', 'numpy'];
     }
 
     protected getFileTypeDisplay(): string {
@@ -1,7 +1,6 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
-import { BaseEditorProvider } from '../utils/BaseEditorProvider';
-import { PythonRunner } from '../utils/PythonRunner';
+import { BaseEditorProvider, ConversionOptions } from '../utils/BaseEditorProvider';
 
 export class ParquetEditorProvider extends BaseEditorProvider {
     public static readonly viewType = 'dataFileViewer.parquet';
@@ -15,10 +14,21 @@ export class ParquetEditorProvider extends BaseEditorProvider {
         super();
     }
 
-    protected async convertToJson(uri: vscode.Uri): Promise<any> {
+    protected async convertToJson(uri: vscode.Uri, options?: ConversionOptions): Promise<any> {
         const scriptPath = path.join(this.context.extensionPath, 'python', 'convert_parquet.py');
-        const output = await PythonRunner.runScript(scriptPath, [uri.fsPath]);
-        return JSON.parse(output);
+        return this.runConverter(scriptPath, uri, options);
+    }
+
+    protected supportsTableQueries(): boolean {
+        return true;
+    }
+
+    protected supportsTail(): boolean {
+        return true;
+    }
+
+    protected getRequiredModules(): string[] {
+        return ['pyarrow', 'pandas', 'numpy'];
     }
 
     protected getFileTypeDisplay(): string {
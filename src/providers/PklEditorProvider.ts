@@ -1,7 +1,6 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
-import { BaseEditorProvider } from '../utils/BaseEditorProvider';
-import { PythonRunner } from '../utils/PythonRunner';
+import { BaseEditorProvider, ConversionOptions } from '../utils/BaseEditorProvider';
 
 export class PklEditorProvider extends BaseEditorProvider {
     public static readonly viewType = 'dataFileViewer.pkl';
@@ -15,10 +14,15 @@ export class PklEditorProvider extends BaseEditorProvider {
         super();
     }
 
-    protected async convertToJson(uri: vscode.Uri): Promise<any> {
+    protected async convertToJson(uri: vscode.Uri, options?: ConversionOptions): Promise<any> {
         const scriptPath = path.join(this.context.extensionPath, 'python', 'convert_pkl.py');
-        const output = await PythonRunner.runScript(scriptPath, [uri.fsPath]);
-        return JSON.parse(output);
+        return this.runConverter(scriptPath, uri, options);
+    }
+
+    protected getRequiredModules(): string[] {
+        // numpy/pandas are only needed for pickles that contain their objects, and zstandard/lz4
+        // for .zst/.lz4 files; all are installed on demand
+        return [];
     }
 
     protected getFileTypeDisplay(): string {
@@ -1,7 +1,25 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
-import { PythonRunner } from './PythonRunner';
+import { PythonRunner, ScriptTimings, MissingModuleError } from './PythonRunner';
+import { HeatmapView } from './HeatmapView';
+import { TableSearchView } from './TableSearchView';
+import { TableSortView } from './TableSortView';
+import { TableIndexView } from './TableIndexView';
+import { TypedBuffers } from './TypedBuffers';
+import { JsonView } from './JsonView';
+import { TailWatcher } from './TailWatcher';
+import { QuickLook } from './QuickLook';
+
+export interface ConversionOptions {
+    // Cancelled when the editor is closed or the user clicks Cancel; kills the converter
+    token?: vscode.CancellationToken;
+    onProgress?: (message: string) => void;
+    // A first partial result, shown on the loading screen while the conversion continues
+    onPartial?: (result: any) => void;
+    // Scheduling priority; see PythonRunner.runConversion
+    priority?: () => number;
+}
 
 export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorProvider {
     protected static viewType: string;
@@ -34,29 +52,205 @@ export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorP
     ): Promise<void> {
         webviewPanel.webview.options = {
             enableScripts: true,
+            // The page fetches the converter output itself rather than having it templated in
+            localResourceRoots: [vscode.Uri.file(PythonRunner.getResultsPath())],
         };
 
         webviewPanel.webview.html = this.getLoadingHtml();
+        // Shape and schema from the file header, shown while packages are checked and the file converts
+        QuickLook.get(document.uri).then(info => {
+            if (info) {
+                webviewPanel.webview.postMessage({ command: 'quickLook', info });
+            }
+        });
+
+        // The conversion lives as long as the webview: closing the editor kills the converter
+        const conversion = new vscode.CancellationTokenSource();
+        const tokenListener = token.onCancellationRequested(() => conversion.cancel());
+        let tail: TailWatcher | undefined;
+        let resultFile: string | undefined;
+        const releaseResult = () => {
+            if (resultFile) {
+                BaseEditorProvider.releaseResult(resultFile);
+                resultFile = undefined;
+            }
+        };
+
+        webviewPanel.webview.onDidReceiveMessage((message: any) => {
+            if (message.command === 'cancelConversion') {
+                conversion.cancel();
+            } else {
+                this.handleMessage(message, document.uri, webviewPanel.webview);
+            }
+        });
+        webviewPanel.onDidDispose(() => {
+            conversion.cancel();
+            tail?.dispose();
+            releaseResult();
+            TableSearchView.cancel(webviewPanel.webview);
+            TableSortView.cancel(webviewPanel.webview);
+            TableIndexView.cancel(webviewPanel.webview);
+            HeatmapView.cancel(webviewPanel.webview);
+        });
+        const options: ConversionOptions = {
+            token: conversion.token,
+            onProgress: (message) => webviewPanel.webview.postMessage({ command: 'conversionProgress', message }),
+            onPartial: (result) => webviewPanel.webview.postMessage({ command: 'conversionPartial', result }),
+            // The focused editor converts first, then visible ones, then background tabs
+            priority: () => webviewPanel.active ? 2 : webviewPanel.visible ? 1 : 0
+        };
 
         // Don't wrap in try-catch yet - let package check happen first
-        const packagesInstalled = await PythonRunner.checkAndInstallPackages();
+        const requiredModules = this.getRequiredModules();
+        const packagesInstalled = await PythonRunner.checkAndInstallPackages(requiredModules);
         if (!packagesInstalled) {
             webviewPanel.webview.html = this.getErrorHtml(
                 'Python packages are required. Please install them:\n\n' +
-                'pip install numpy pandas h5py pyarrow msgpack joblib avro-python3 netCDF4 scipy'
+                `pip install ${requiredModules.map(name => PythonRunner.getInstallPackageName(name)).join(' ')}`
             );
             return;
         }
 
+        const load = async () => {
+            try {
+                let data: any;
+                try {
+                    data = await this.convertToJson(document.uri, options);
+                } catch (error) {
+                    // Optional modules (numpy or pandas objects inside a pickle, say) are offered on demand
+                    if (!(error instanceof MissingModuleError) ||
+                        !await PythonRunner.checkAndInstallPackages([error.moduleName])) {
+                        throw error;
+                    }
+                    data = await this.convertToJson(document.uri, options);
+                }
+                // The timing breakdown goes in the footer; the result itself is fetched by the page
+                const { _perf: perf, _result: result, ...info } = data;
+                releaseResult();
+                resultFile = BaseEditorProvider.retainResult(result.path);
+                const resultUri = webviewPanel.webview.asWebviewUri(vscode.Uri.file(result.path));
+                webviewPanel.webview.html = this.getWebviewContent(info, document.uri, resultUri.toString(), result.bytes, perf);
+            } catch (error) {
+                if (error instanceof vscode.CancellationError) {
+                    // Nothing to show if the editor was closed; otherwise the user pressed Cancel
+                    if (!token.isCancellationRequested) {
+                        webviewPanel.webview.html = this.getErrorHtml('Conversion cancelled.');
+                    }
+                } else {
+                    webviewPanel.webview.html = this.getErrorHtml(error instanceof Error ? error.message : String(error));
+                }
+            }
+        };
+
+        // Appends to a growing file are read and pushed on their own; the file is only
+        // converted again if it was rewritten
+        if (this.supportsTail() && vscode.workspace.getConfiguration('dataFileViewer').get<boolean>('followAppends', true)) {
+            tail = new TailWatcher(document.uri, webviewPanel.webview, async () => {
+                webviewPanel.webview.html = this.getLoadingHtml();
+                await load();
+            });
+        }
+
         try {
-            const jsonData = await this.convertToJson(document.uri);
-            webviewPanel.webview.html = this.getWebviewContent(jsonData, document.uri);
-        } catch (error) {
-            webviewPanel.webview.html = this.getErrorHtml(error instanceof Error ? error.message : String(error));
+            await load();
+        } finally {
+            tokenListener.dispose();
+        }
+    }
+
+    // Editors showing each result file; it is deleted when the last of them closes or reloads
+    private static resultUsers = new Map<string, number>();
+
+    private static retainResult(file: string): string {
+        this.resultUsers.set(file, (this.resultUsers.get(file) ?? 0) + 1);
+        return file;
+    }
+
+    private static releaseResult(file: string): void {
+        const users = (this.resultUsers.get(file) ?? 1) - 1;
+        if (users > 0) {
+            this.resultUsers.set(file, users);
+        } else {
+            this.resultUsers.delete(file);
+            fs.rm(file, { force: true }, () => {});
+        }
+    }
+
+    // Resolves to the converter's descriptor: the keys the host shows itself, _perf, and
+    // _result (path and size of the JSON result file, see python/perf.py)
+    protected abstract convertToJson(uri: vscode.Uri, options?: ConversionOptions): Promise<any>;
+
+    // Top-level Python modules the converter needs; only these are installed before opening
+    protected abstract getRequiredModules(): string[];
+
+    // Run a converter script and parse its descriptor, adding host-side timings to its _perf block
+    protected async runConverter(scriptPath: string, uri: vscode.Uri, options: ConversionOptions = {}): Promise<any> {
+        const timings: ScriptTimings = {};
+        const config = vscode.workspace.getConfiguration('dataFileViewer');
+        const profile = config.get<boolean>('profileConversions', false)
+            ? path.join(PythonRunner.getStoragePath('profiles'), 'last-conversion.pstats')
+            : undefined;
+        const output = await PythonRunner.runConversion(scriptPath, [uri.fsPath], {
+            fileSize: fs.statSync(uri.fsPath).size,
+            memoryBudget: config.get<number>('memoryBudgetMB', 2048) * 1024 * 1024,
+            sampleSeed: config.get<string>('previewMode', 'head') === 'sample'
+                ? Math.trunc(config.get<number>('sampleSeed', 0))
+                : undefined,
+            outputBudget: config.get<number>('outputBudgetMB', 16) * 1024 * 1024,
+            resultDir: PythonRunner.getResultsPath(),
+            priority: options.priority,
+            timings,
+            profileOutput: profile,
+            token: options.token,
+            onProgress: options.onProgress,
+            onPartial: options.onPartial
+        });
+
+        const parseStart = Date.now();
+        const data = JSON.parse(output);
+        const parseMs = Date.now() - parseStart;
+
+        const perf = data?._perf;
+        if (perf && timings.spawnedAt !== undefined && timings.exitedAt !== undefined) {
+            perf.host = {
+                // Process spawn and interpreter startup, up to the converter importing perf.py
+                interpreter_ms: Math.max(0, perf.start_epoch_ms - timings.spawnedAt),
+                // Writing, piping and collecting stdout after the converter finished serializing
+                transfer_ms: Math.max(0, timings.exitedAt - perf.end_epoch_ms),
+                json_parse_ms: parseMs,
+                profile
+            };
+        }
+        return data;
+    }
+
+    protected async handleMessage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        if (message.command?.startsWith('heatmap') && this.supportsHeatmap()) {
+            await HeatmapView.handleMessage(message, uri, webview);
+        } else if (message.command?.startsWith('search') && this.supportsTableQueries()) {
+            await TableSearchView.handleMessage(message, uri, webview);
+        } else if (message.command?.startsWith('sort') && this.supportsTableQueries()) {
+            await TableSortView.handleMessage(message, uri, webview);
+        } else if (message.command?.startsWith('index') && this.supportsTableQueries()) {
+            await TableIndexView.handleMessage(message, uri, webview);
         }
     }
 
-    protected abstract convertToJson(uri: vscode.Uri): Promise<any>;
+    // Override in providers whose files can contain 2-D arrays
+    protected supportsHeatmap(): boolean {
+        return false;
+    }
+
+    // Override in providers for formats python/tail_file.py can follow as they grow
+    protected supportsTail(): boolean {
+        return false;
+    }
+
+    // Override in providers for tabular formats that python/table_source.py can stream
+    // (enables whole-file search, sorting and key index lookups)
+    protected supportsTableQueries(): boolean {
+        return false;
+    }
 
     protected abstract getFileTypeDisplay(): string;
 
@@ -90,17 +284,78 @@ export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorP
             animation: spin 1s linear infinite;
             margin: 0 auto 20px;
         }
+        .progress {
+            color: var(--vscode-descriptionForeground);
+            font-size: 12px;
+            min-height: 1em;
+        }
+        button {
+            background-color: var(--vscode-button-secondaryBackground, var(--vscode-button-background));
+            color: var(--vscode-button-secondaryForeground, var(--vscode-button-foreground));
+            border: none;
+            padding: 4px 12px;
+            border-radius: 2px;
+            cursor: pointer;
+            font-family: var(--vscode-font-family);
+        }
+        .partial {
+            display: none;
+            margin-top: 24px;
+            max-width: 90vw;
+            text-align: left;
+        }
+        .partial pre {
+            max-height: 50vh;
+            overflow: auto;
+            margin: 8px 0 0;
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+        }
         @keyframes spin {
             0% { transform: rotate(0deg); }
             100% { transform: rotate(360deg); }
-        }
+        }${QuickLook.getStyles()}
     </style>
 </head>
 <body>
     <div class="loader">
         <div class="spinner"></div>
         <p>Loading ${this.getFileTypeDisplay()} file...</p>
+        <p class="progress" id="progress"></p>
+        <button onclick="cancelConversion()">Cancel</button>${QuickLook.getMarkup()}
+        <div class="partial" id="partial">
+            <div class="progress">Partial result, shown until the conversion finishes</div>
+            <pre id="partial-content"></pre>
+        </div>
     </div>
+    <script>
+        const vscode = acquireVsCodeApi();${TypedBuffers.getScript()}
+        const started = Date.now();
+        let lastMessage = '';
+
+        function showProgress() {
+            const elapsed = Math.round((Date.now() - started) / 1000);
+            document.getElementById('progress').textContent = lastMessage + (elapsed > 0 ? ' · ' + elapsed + ' s' : '');
+        }
+
+        function cancelConversion() {
+            vscode.postMessage({ command: 'cancelConversion' });
+        }
+
+        window.addEventListener('message', event => {
+            if (event.data.command === 'conversionProgress') {
+                lastMessage = event.data.message;
+                showProgress();
+            } else if (event.data.command === 'conversionPartial') {
+                // Supersedes the header-only quick look
+                document.getElementById('quick-look').style.display = 'none';
+                document.getElementById('partial-content').textContent = displayJson(decodeTypedBuffers(event.data.result), 2);
+                document.getElementById('partial').style.display = 'block';
+            }
+        });
+        // Long conversions have no timeout, so keep showing that they are still running
+        setInterval(showProgress, 1000);${QuickLook.getScript()}
+    </script>
 </body>
 </html>`;
     }
@@ -167,9 +422,13 @@ export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorP
 </html>`;
     }
 
-    protected getWebviewContent(jsonData: any, uri: vscode.Uri): string {
-        const jsonString = JSON.stringify(jsonData, null, 2);
+    // info holds the descriptor keys the host shows itself; the result at resultUrl is
+    // fetched, parsed and rendered by the webview's worker (see JsonView)
+    protected getWebviewContent(info: any, uri: vscode.Uri, resultUrl: string, resultBytes: number, perf?: any): string {
         const fileName = path.basename(uri.fsPath);
+        const heatmap = this.supportsHeatmap();
+        const tableQueries = this.supportsTableQueries();
+        const tail = this.supportsTail();
         
         return `<!DOCTYPE html>
 <html lang="en">
@@ -263,6 +522,9 @@ export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorP
             font-size: 12px;
             color: var(--vscode-descriptionForeground);
         }
+        .perf {
+            margin-top: 6px;
+        }${JsonView.getStyles()}${heatmap ? HeatmapView.getStyles() : ''}${tableQueries ? TableSearchView.getStyles() + TableSortView.getStyles() + TableIndexView.getStyles() : ''}${tail ? TailWatcher.getStyles() : ''}
     </style>
 </head>
 <body>
@@ -271,117 +533,45 @@ export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorP
             <span class="file-name">${this.escapeHtml(fileName)}</span>
             <span class="file-type">${this.getFileTypeDisplay()} → JSON</span>
         </div>
-        <div class="controls">
-            <button onclick="copyToClipboard()">Copy JSON</button>
+        <div class="controls">${JsonView.getControls()}${tableQueries ? `
+            <button onclick="toggleFileSearch()">Find in File</button>
+            <button onclick="toggleSort()">Sort</button>
+            <button onclick="toggleKeyIndex()">Key Lookup</button>` : ''}
+            <button onclick="copyToClipboard(this)">Copy JSON</button>
             <button onclick="toggleSimplify()" id="simplifyBtn">Simplify JSON</button>
             <button onclick="toggleCollapse()">Collapse All</button>
-            <button onclick="toggleExpand()">Expand All</button>
+            <button onclick="toggleExpand()">Expand All</button>${heatmap ? `
+            <button onclick="openHeatmap()">Heatmap</button>` : ''}
         </div>
     </div>
-    <div class="content">
-        <pre id="json-content">${this.syntaxHighlight(jsonString)}</pre>
+    <div class="content">${JsonView.getMarkup()}${tableQueries ? TableSearchView.getMarkup() + TableSortView.getMarkup() + TableIndexView.getMarkup() : ''}${tail ? TailWatcher.getMarkup() : ''}
+        <pre id="json-content"></pre>
         <div class="stats">
             File size: ${this.formatBytes(fs.statSync(uri.fsPath).size)} | 
-            JSON size: ${this.formatBytes(jsonString.length)} | 
-            Type: ${this.getFileTypeDisplay()}
+            JSON size: ${this.formatBytes(resultBytes)} | 
+            Type: ${this.getFileTypeDisplay()}${info?._memory_budget ? `
+            <div class="perf">${this.formatMemoryBudget(info._memory_budget)}</div>` : ''}${info?._output_budget ? `
+            <div class="perf">${this.formatOutputBudget(info._output_budget)}</div>` : ''}${perf ? `
+            <div class="perf">${this.formatPerf(perf)}</div>` : ''}
         </div>
-    </div>
+    </div>${heatmap ? HeatmapView.getMarkup() : ''}
     <script>
-        const jsonData = ${jsonString};
-        let isSimplified = false;
-        
-        function simplifyData(obj) {
-            if (obj === null || obj === undefined) return obj;
-            
-            if (Array.isArray(obj)) {
-                return obj.map(item => simplifyData(item));
-            }
-            
-            if (typeof obj === 'object') {
-                // Handle special type wrappers
-                if (obj._type === 'numpy.ndarray' && obj.data) {
-                    return simplifyData(obj.data);
-                }
-                if (obj._type === 'pandas.DataFrame' && obj.data) {
-                    return simplifyData(obj.data);
-                }
-                if (obj._type === 'pandas.Series' && obj.data) {
-                    return simplifyData(obj.data);
-                }
-                if (obj._type === 'tuple' && obj.data) {
-                    return simplifyData(obj.data);
-                }
-                if (obj._type === 'set' && obj.data) {
-                    return simplifyData(obj.data);
-                }
-                
-                // Remove metadata fields
-                const simplified = {};
-                for (let key in obj) {
-                    if (!key.startsWith('_') && key !== 'file_type' && key !== 'metadata' && key !== 'schema') {
-                        simplified[key] = simplifyData(obj[key]);
-                    }
-                }
-                return simplified;
-            }
-            
-            return obj;
-        }
-        
-        function toggleSimplify() {
-            isSimplified = !isSimplified;
-            const btn = document.getElementById('simplifyBtn');
-            const data = isSimplified ? simplifyData(jsonData) : jsonData;
-            
-            btn.textContent = isSimplified ? 'Show Details' : 'Simplify';
-            document.getElementById('json-content').innerHTML = syntaxHighlight(JSON.stringify(data, null, 2));
-        }
-        
-        function copyToClipboard() {
-            const data = isSimplified ? simplifyData(jsonData) : jsonData;
-            navigator.clipboard.writeText(JSON.stringify(data, null, 2)).then(() => {
-                const btn = event.target;
-                const originalText = btn.textContent;
-                btn.textContent = '✓ Copied!';
-                setTimeout(() => {
-                    btn.textContent = originalText;
-                }, 2000);
-            });
-        }
-        
-        function toggleCollapse() {
-            const data = isSimplified ? simplifyData(jsonData) : jsonData;
-            document.getElementById('json-content').innerHTML = syntaxHighlight(JSON.stringify(data));
-        }
-        
-        function toggleExpand() {
-            const data = isSimplified ? simplifyData(jsonData) : jsonData;
-            document.getElementById('json-content').innerHTML = syntaxHighlight(JSON.stringify(data, null, 2));
-        }
-        
-        function syntaxHighlight(json) {
-            json = json.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
-            return json.replace(/(\"(\\u[a-zA-Z0-9]{4}|\\[^u]|[^\\\"])*\"(\\s*:)?|\\b(true|false|null)\\b|-?\\d+(?:\\.\\d*)?(?:[eE][+\\-]?\\d+)?)/g, function (match) {
-                let cls = 'json-number';
-                if (/^\"/.test(match)) {
-                    if (/:$/.test(match)) {
-                        cls = 'json-key';
-                    } else {
-                        cls = 'json-string';
-                    }
-                } else if (/true|false/.test(match)) {
-                    cls = 'json-boolean';
-                } else if (/null/.test(match)) {
-                    cls = 'json-null';
-                }
-                return '<span class="' + cls + '">' + match + '</span>';
-            });
-        }
+        const vscode = acquireVsCodeApi();${TypedBuffers.getScript()}${JsonView.getHighlightScript()}${JsonView.getScript(resultUrl)}${tableQueries ? `
+        const TABLE_COLUMNS = ${JSON.stringify(this.getTableColumns(info)).replace(/</g, '\\u003c')};` : ''}${heatmap ? HeatmapView.getScript() : ''}${tableQueries ? TableSearchView.getScript() + TableSortView.getScript() + TableIndexView.getScript() : ''}${tail ? TailWatcher.getScript() : ''}
     </script>
 </body>
 </html>`;
     }
 
+    // Column names for the Sort and Key Lookup pickers, so the page need not parse the data for them
+    protected getTableColumns(info: any): string[] {
+        const schema = info?.schema || {};
+        if (Array.isArray(info?._columns)) {
+            return info._columns;
+        }
+        return schema.columns || (schema.fields || []).map((field: any) => field.name);
+    }
+
     protected escapeHtml(unsafe: string): string {
         return unsafe
             .replace(/&/g, "&amp;")
@@ -391,23 +581,47 @@ export abstract class BaseEditorProvider implements vscode.CustomReadonlyEditorP
             .replace(/'/g, "&#039;");
     }
 
-    protected syntaxHighlight(json: string): string {
-        json = this.escapeHtml(json);
-        return json.replace(/("(\\u[a-zA-Z0-9]{4}|\\[^u]|[^\\"])*"(\s*:)?|\b(true|false|null)\b|-?\d+(?:\.\d*)?(?:[eE][+\-]?\d+)?)/g, (match) => {
-            let cls = 'json-number';
-            if (/^"/.test(match)) {
-                if (/:$/.test(match)) {
-                    cls = 'json-key';
-                } else {
-                    cls = 'json-string';
-                }
-            } else if (/true|false/.test(match)) {
-                cls = 'json-boolean';
-            } else if (/null/.test(match)) {
-                cls = 'json-null';
-            }
-            return `<span class="${cls}">${match}</span>`;
-        });
+    protected formatPerf(perf: any): string {
+        const host = perf.host || {};
+        const phases: string[] = [];
+        if (host.interpreter_ms !== undefined) {
+            phases.push(`interpreter ${Math.round(host.interpreter_ms)} ms`);
+        }
+        (perf.phases || []).forEach((phase: any) => phases.push(`${this.escapeHtml(String(phase.name))} ${Math.round(phase.ms)} ms`));
+        if (host.transfer_ms !== undefined) {
+            phases.push(`transfer ${Math.round(host.transfer_ms)} ms`);
+            phases.push(`JSON.parse ${Math.round(host.json_parse_ms)} ms`);
+        }
+        phases.push(`fetch <span id="perf-fetch">…</span>`);
+        phases.push(`render <span id="perf-render">…</span>`);
+
+        let html = `Timing: ${phases.join(' · ')}`;
+        if (perf.peak_rss_bytes) {
+            html += ` | Peak memory: ${this.formatBytes(perf.peak_rss_bytes)}`;
+        }
+        if (host.profile) {
+            html += ` | Profile: ${this.escapeHtml(host.profile)}`;
+        }
+        return html;
+    }
+
+    protected formatMemoryBudget(report: any): string {
+        const skipped = (report.skipped || []).map((entry: any) =>
+            `${this.escapeHtml(String(entry.item))} (~${this.formatBytes(entry.estimated_bytes)}): ${this.escapeHtml(String(entry.action))}`
+        );
+        return `Memory budget of ${this.formatBytes(report.budget_bytes)} exceeded: ${skipped.join('; ')}. ` +
+            `Raise dataFileViewer.memoryBudgetMB to load everything.`;
+    }
+
+    protected formatOutputBudget(report: any): string {
+        const truncated = (report.truncated || []).slice(0, 5).map((entry: any) =>
+            `${this.escapeHtml(String(entry.path))} (${Number(entry.shown).toLocaleString()} of ${Number(entry.total).toLocaleString()} ${this.escapeHtml(String(entry.unit))})`
+        );
+        if (report.num_truncated > truncated.length) {
+            truncated.push(`${(report.num_truncated - truncated.length).toLocaleString()} more`);
+        }
+        return `Output budget of ${this.formatBytes(report.budget_bytes)} reached, values cut short: ${truncated.join('; ')}. ` +
+            `Raise dataFileViewer.outputBudgetMB to see more.`;
     }
 
     protected formatBytes(bytes: number): string {
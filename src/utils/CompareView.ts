@@ -0,0 +1,218 @@
+import * as vscode from 'vscode';
+import * as path from 'path';
+import { PythonRunner } from './PythonRunner';
+
+// Python modules diff_files.py needs, by file extension
+const COMPARE_MODULES: { [extension: string]: string[] } = {
+    '.parquet': ['pyarrow', 'numpy'],
+    '.arrow': ['pyarrow', 'numpy'],
+    '.feather': ['pyarrow', 'numpy'],
+    '.avro': ['avro', 'snappy', 'pyarrow', 'numpy'],
+    '.h5': ['h5py', 'numpy'],
+    '.hdf5': ['h5py', 'numpy'],
+    '.nc': ['h5py', 'numpy'],
+    '.nc4': ['h5py', 'numpy'],
+    '.netcdf': ['h5py', 'numpy'],
+    '.npy': ['numpy'],
+    '.npz': ['numpy']
+};
+
+const DATA_FILE_EXTENSIONS = [
+    'pkl', 'pickle', 'h5', 'hdf5', 'parquet', 'feather', 'joblib', 'npy', 'npz',
+    'msgpack', 'arrow', 'avro', 'nc', 'nc4', 'netcdf', 'mat'
+];
+
+/**
+ * "Compare with…": diffs two files of the same format with python/diff_files.py,
+ * which hashes raw storage units in parallel and only decodes the ones that
+ * differ, and shows the result in a webview panel.
+ */
+export class CompareView {
+    static register(context: vscode.ExtensionContext): vscode.Disposable {
+        return vscode.commands.registerCommand('dataFileViewer.compareWith', (uri?: vscode.Uri) => this.compareWith(uri));
+    }
+
+    static async compareWith(left?: vscode.Uri): Promise<void> {
+        left = left ?? this.getActiveFile() ?? (await vscode.window.showOpenDialog({
+            canSelectMany: false,
+            openLabel: 'Select File',
+            filters: { 'Data Files': DATA_FILE_EXTENSIONS }
+        }))?.[0];
+        if (!left) {
+            return;
+        }
+
+        const extension = path.extname(left.fsPath).toLowerCase();
+        const right = (await vscode.window.showOpenDialog({
+            canSelectMany: false,
+            openLabel: 'Compare',
+            defaultUri: vscode.Uri.file(path.dirname(left.fsPath)),
+            filters: { [`${extension} files`]: [extension.slice(1)] }
+        }))?.[0];
+        if (!right) {
+            return;
+        }
+
+        const modules = COMPARE_MODULES[extension] ?? [];
+        if (!await PythonRunner.checkAndInstallPackages(modules)) {
+            vscode.window.showErrorMessage(
+                `Comparing ${extension} files requires: pip install ${modules.map(name => PythonRunner.getInstallPackageName(name)).join(' ')}`
+            );
+            return;
+        }
+
+        const title = `${path.basename(left.fsPath)} ↔ ${path.basename(right.fsPath)}`;
+        let result: any;
+        try {
+            result = await vscode.window.withProgress({
+                location: vscode.ProgressLocation.Notification,
+                title: `Comparing ${title}`,
+                cancellable: true
+            }, async (progress, token) => {
+                const output = await PythonRunner.runScript(
+                    PythonRunner.getScriptPath('diff_files.py'),
+                    [left!.fsPath, right.fsPath],
+                    { token, onProgress: (message) => progress.report({ message }) }
+                );
+                return JSON.parse(output);
+            });
+        } catch (error) {
+            if (!(error instanceof vscode.CancellationError)) {
+                vscode.window.showErrorMessage(error instanceof Error ? error.message : String(error));
+            }
+            return;
+        }
+        if (result.error) {
+            vscode.window.showErrorMessage(result.error);
+            return;
+        }
+
+        const panel = vscode.window.createWebviewPanel('dataFileViewer.compare', title, vscode.ViewColumn.Active, {});
+        panel.webview.html = this.getHtml(result);
+    }
+
+    // The file shown in the focused data file editor, if any
+    private static getActiveFile(): vscode.Uri | undefined {
+        const input = vscode.window.tabGroups.activeTabGroup.activeTab?.input;
+        if (input instanceof vscode.TabInputCustom && input.viewType.startsWith('dataFileViewer.')) {
+            return input.uri;
+        }
+        return undefined;
+    }
+
+    static getHtml(result: any): string {
+        const content = result.content;
+        const structure = result.structure.length === 0
+            ? '<p class="same">Same structure.</p>'
+            : `<table>
+            <tr><th>Item</th><th>Left</th><th>Right</th></tr>
+            ${result.structure.map((entry: any) => `<tr><td>${this.escapeHtml(entry.item)}</td><td>${this.formatValue(entry.left)}</td><td>${this.formatValue(entry.right)}</td></tr>`).join('')}
+        </table>`;
+        const units = content.units
+            .filter((unit: any) => !unit.identical_after_decoding)
+            .map((unit: any) => this.getUnitHtml(unit))
+            .join('');
+
+        return `<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: var(--vscode-font-family);
+            color: var(--vscode-foreground);
+            background-color: var(--vscode-editor-background);
+            padding: 20px;
+        }
+        .files {
+            font-family: var(--vscode-editor-font-family);
+            color: var(--vscode-descriptionForeground);
+        }
+        .verdict {
+            font-size: 16px;
+            font-weight: bold;
+            margin: 12px 0;
+        }
+        .same {
+            color: var(--vscode-testing-iconPassed, #73c991);
+        }
+        .different {
+            color: var(--vscode-errorForeground);
+        }
+        .stats {
+            padding: 10px;
+            background-color: var(--vscode-textBlockQuote-background);
+            border-left: 4px solid var(--vscode-textBlockQuote-border);
+            font-size: 12px;
+            color: var(--vscode-descriptionForeground);
+        }
+        table {
+            border-collapse: collapse;
+            margin: 8px 0 16px;
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+        }
+        th, td {
+            border: 1px solid var(--vscode-panel-border);
+            padding: 3px 8px;
+            text-align: left;
+            vertical-align: top;
+        }
+        th {
+            background-color: var(--vscode-editor-inactiveSelectionBackground);
+        }
+    </style>
+</head>
+<body>
+    <div class="files">${this.escapeHtml(result.left)}<br>${this.escapeHtml(result.right)}</div>
+    <div class="verdict ${result.identical ? 'same' : 'different'}">${result.identical ? 'The files are identical' : 'The files differ'}</div>
+    <h3>Structure</h3>
+    ${structure}
+    <h3>Content</h3>
+    <div class="stats">
+        ${content.compared} ${this.escapeHtml(content.unit)}s compared |
+        ${content.hash_equal} equal by hash |
+        ${content.decoded} decoded |
+        ${content.different} different${content.truncated ? ' | Only the first differences are listed' : ''}
+    </div>
+    ${units}
+</body>
+</html>`;
+    }
+
+    private static getUnitHtml(unit: any): string {
+        const heading = `<h4>${this.escapeHtml(unit.unit)}${unit.total_differences !== null ? ` (${unit.total_differences} differences)` : ''}</h4>`;
+        if (unit._note) {
+            return `${heading}<p>${this.escapeHtml(unit._note)}</p>`;
+        }
+        if (unit.differences.length === 0) {
+            return heading;
+        }
+        if (unit.differences[0].columns) {
+            const rows = unit.differences.map((difference: any) =>
+                Object.entries(difference.columns).map(([column, values]: [string, any]) =>
+                    `<tr><td>${difference.row}</td><td>${this.escapeHtml(column)}</td><td>${this.formatValue(values.left)}</td><td>${this.formatValue(values.right)}</td></tr>`
+                ).join('')
+            ).join('');
+            return `${heading}<table><tr><th>Row</th><th>Column</th><th>Left</th><th>Right</th></tr>${rows}</table>`;
+        }
+        const rows = unit.differences.map((difference: any) =>
+            `<tr><td>[${difference.index.join(', ')}]</td><td>${this.formatValue(difference.left)}</td><td>${this.formatValue(difference.right)}</td></tr>`
+        ).join('');
+        return `${heading}<table><tr><th>Index</th><th>Left</th><th>Right</th></tr>${rows}</table>`;
+    }
+
+    private static formatValue(value: any): string {
+        return this.escapeHtml(typeof value === 'string' ? value : JSON.stringify(value));
+    }
+
+    private static escapeHtml(unsafe: string): string {
+        return String(unsafe)
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/"/g, "&quot;")
+            .replace(/'/g, "&#039;");
+    }
+}
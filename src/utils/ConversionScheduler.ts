@@ -0,0 +1,194 @@
+import * as vscode from 'vscode';
+
+export interface ScheduledTask<T> {
+    // Requests with the same key while one is queued or running share its result
+    key: string;
+    // Rough peak memory of the task, used for admission
+    estimatedBytes: number;
+    // Higher runs first; re-read whenever a slot frees up so the active editor can jump the queue
+    priority?: () => number;
+    token?: vscode.CancellationToken;
+    onProgress?: (message: string) => void;
+    onPartial?: (result: any) => void;
+    run: (
+        token: vscode.CancellationToken,
+        onProgress: (message: string) => void,
+        onPartial: (result: any) => void
+    ) => Promise<T>;
+}
+
+export interface SchedulerLimits {
+    concurrency: number;
+    memoryBytes: number;
+}
+
+interface Job {
+    key: string;
+    order: number;
+    estimatedBytes: number;
+    priorities: (() => number)[];
+    progressListeners: ((message: string) => void)[];
+    partialListeners: ((result: any) => void)[];
+    // The latest partial result, replayed to requests that join the job later
+    partial?: any;
+    subscribers: number;
+    source: vscode.CancellationTokenSource;
+    start: () => void;
+    promise: Promise<any>;
+}
+
+/**
+ * Runs at most `concurrency` tasks at a time, highest priority first, and only
+ * starts a task if its estimated memory fits next to the ones already running.
+ * A task is always admitted when nothing else runs, so an oversized file still
+ * opens, just on its own.
+ */
+export class ConversionScheduler {
+    private queue: Job[] = [];
+    private running = new Set<Job>();
+    private jobs = new Map<string, Job>();
+    private nextOrder = 0;
+
+    constructor(private readonly getLimits: () => SchedulerLimits) {}
+
+    schedule<T>(task: ScheduledTask<T>): Promise<T> {
+        let job = this.jobs.get(task.key);
+        if (!job) {
+            job = this.createJob(task);
+            this.jobs.set(task.key, job);
+            this.queue.push(job);
+        }
+        const shared = job;
+        shared.subscribers++;
+        if (task.priority) {
+            shared.priorities.push(task.priority);
+        }
+        if (task.onProgress) {
+            shared.progressListeners.push(task.onProgress);
+        }
+        if (task.onPartial) {
+            shared.partialListeners.push(task.onPartial);
+            if (shared.partial !== undefined) {
+                task.onPartial(shared.partial);
+            }
+        }
+
+        return new Promise<T>((resolve, reject) => {
+            let settled = false;
+            // A shared job is only cancelled once every request for it has been cancelled
+            const cancellation = task.token?.onCancellationRequested(() => {
+                if (settled) {
+                    return;
+                }
+                settled = true;
+                reject(new vscode.CancellationError());
+                shared.priorities = shared.priorities.filter(priority => priority !== task.priority);
+                shared.progressListeners = shared.progressListeners.filter(listener => listener !== task.onProgress);
+                shared.partialListeners = shared.partialListeners.filter(listener => listener !== task.onPartial);
+                if (--shared.subscribers === 0) {
+                    this.cancelJob(shared);
+                }
+            });
+            shared.promise.then(
+                (value) => {
+                    cancellation?.dispose();
+                    if (!settled) {
+                        settled = true;
+                        resolve(value);
+                    }
+                },
+                (error) => {
+                    cancellation?.dispose();
+                    if (!settled) {
+                        settled = true;
+                        reject(error);
+                    }
+                }
+            );
+            this.pump();
+        });
+    }
+
+    // Start queued jobs while there are free slots and memory
+    pump(): void {
+        const { concurrency, memoryBytes } = this.getLimits();
+        while (this.queue.length > 0 && this.running.size < concurrency) {
+            const runningBytes = [...this.running].reduce((total, job) => total + job.estimatedBytes, 0);
+            // Highest priority first, oldest first among equals
+            const candidates = [...this.queue].sort(
+                (a, b) => this.priorityOf(b) - this.priorityOf(a) || a.order - b.order
+            );
+            const next = candidates.find(
+                job => this.running.size === 0 || runningBytes + job.estimatedBytes <= memoryBytes
+            );
+            if (!next) {
+                break; // Wait for a running job to release memory
+            }
+            this.queue.splice(this.queue.indexOf(next), 1);
+            this.running.add(next);
+            next.start();
+        }
+    }
+
+    private createJob<T>(task: ScheduledTask<T>): Job {
+        let start: () => void = () => {};
+        const job: Job = {
+            key: task.key,
+            order: this.nextOrder++,
+            estimatedBytes: task.estimatedBytes,
+            priorities: [],
+            progressListeners: [],
+            partialListeners: [],
+            subscribers: 0,
+            source: new vscode.CancellationTokenSource(),
+            start: () => start(),
+            promise: Promise.resolve()
+        };
+        job.promise = new Promise<T>((resolve, reject) => {
+            start = () => {
+                const report = (message: string) => job.progressListeners.forEach(listener => listener(message));
+                const reportPartial = (result: any) => {
+                    job.partial = result;
+                    job.partialListeners.forEach(listener => listener(result));
+                };
+                task.run(job.source.token, report, reportPartial).then(resolve, reject).finally(() => this.finishJob(job));
+            };
+            // Settles queued jobs that are cancelled before they ever start
+            job.source.token.onCancellationRequested(() => {
+                if (!this.running.has(job)) {
+                    reject(new vscode.CancellationError());
+                }
+            });
+        });
+        // Rejections are delivered to each subscriber; avoid an unhandled rejection on the shared promise
+        job.promise.catch(() => {});
+        return job;
+    }
+
+    private cancelJob(job: Job): void {
+        const queued = this.queue.indexOf(job);
+        if (queued !== -1) {
+            this.queue.splice(queued, 1);
+        }
+        if (this.jobs.get(job.key) === job) {
+            this.jobs.delete(job.key);
+        }
+        job.source.cancel();
+        if (queued !== -1) {
+            job.source.dispose();
+        }
+    }
+
+    private finishJob(job: Job): void {
+        this.running.delete(job);
+        if (this.jobs.get(job.key) === job) {
+            this.jobs.delete(job.key);
+        }
+        job.source.dispose();
+        this.pump();
+    }
+
+    private priorityOf(job: Job): number {
+        return job.priorities.reduce((best, priority) => Math.max(best, priority()), 0);
+    }
+}
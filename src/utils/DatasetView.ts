@@ -0,0 +1,274 @@
+import * as vscode from 'vscode';
+import * as path from 'path';
+import { PythonRunner } from './PythonRunner';
+
+const PAGE_SIZE = 100;
+
+/**
+ * "Open Folder as Dataset": pages through a directory of Parquet or Arrow/Feather
+ * files as one table with python/read_dataset.py. Hive partition directories
+ * become columns, the filter prunes partitions and row groups before anything
+ * is read, row counts come from the file footers, and each page reads only the
+ * fragments that hold it.
+ */
+export class DatasetView {
+    static register(context: vscode.ExtensionContext): vscode.Disposable {
+        return vscode.commands.registerCommand('dataFileViewer.openDataset', (uri?: vscode.Uri) => this.open(uri));
+    }
+
+    static async open(folder?: vscode.Uri): Promise<void> {
+        folder = folder ?? (await vscode.window.showOpenDialog({
+            canSelectFiles: false,
+            canSelectFolders: true,
+            canSelectMany: false,
+            openLabel: 'Open as Dataset'
+        }))?.[0];
+        if (!folder) {
+            return;
+        }
+        if (!await PythonRunner.checkAndInstallPackages(['pyarrow'])) {
+            vscode.window.showErrorMessage(`Opening a dataset requires: pip install ${PythonRunner.getInstallPackageName('pyarrow')}`);
+            return;
+        }
+
+        const directory = folder.fsPath;
+        const panel = vscode.window.createWebviewPanel('dataFileViewer.dataset', path.basename(directory), vscode.ViewColumn.Active, {
+            enableScripts: true,
+            retainContextWhenHidden: true
+        });
+        panel.webview.html = this.getHtml(directory);
+
+        // One page read at a time; a new page or filter cancels the one still running
+        let current: vscode.CancellationTokenSource | undefined;
+        panel.webview.onDidReceiveMessage(async (message: any) => {
+            if (message.command !== 'datasetPage') {
+                return;
+            }
+            current?.cancel();
+            const request = current = new vscode.CancellationTokenSource();
+            const args = [
+                directory,
+                `--offset=${message.offset}`,
+                `--limit=${PAGE_SIZE}`,
+                `--cache-dir=${PythonRunner.getStoragePath('dataset-cache')}`
+            ];
+            if (message.filter) {
+                args.push(`--filter=${message.filter}`);
+            }
+            try {
+                const output = await PythonRunner.runScript(PythonRunner.getScriptPath('read_dataset.py'), args, {
+                    token: request.token,
+                    onProgress: (progress) => panel.webview.postMessage({ command: 'datasetProgress', message: progress })
+                });
+                panel.webview.postMessage({ command: 'datasetPage', ...JSON.parse(output) });
+            } catch (error) {
+                if (!(error instanceof vscode.CancellationError)) {
+                    panel.webview.postMessage({ command: 'datasetError', error: error instanceof Error ? error.message : String(error) });
+                }
+            } finally {
+                if (current === request) {
+                    current = undefined;
+                }
+                request.dispose();
+            }
+        });
+        panel.onDidDispose(() => current?.cancel());
+    }
+
+    static getHtml(directory: string): string {
+        return `<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: var(--vscode-font-family);
+            color: var(--vscode-foreground);
+            background-color: var(--vscode-editor-background);
+            padding: 20px;
+        }
+        .directory {
+            font-family: var(--vscode-editor-font-family);
+            color: var(--vscode-descriptionForeground);
+            margin-bottom: 12px;
+        }
+        .filter-bar, .pager {
+            display: flex;
+            gap: 8px;
+            align-items: center;
+            margin-bottom: 12px;
+            font-size: 12px;
+        }
+        .filter-bar input {
+            flex: 1;
+            background-color: var(--vscode-input-background);
+            color: var(--vscode-input-foreground);
+            border: 1px solid var(--vscode-input-border, transparent);
+            font-family: var(--vscode-editor-font-family);
+            padding: 4px;
+        }
+        button {
+            background-color: var(--vscode-button-background);
+            color: var(--vscode-button-foreground);
+            border: none;
+            padding: 4px 12px;
+            border-radius: 2px;
+            cursor: pointer;
+            font-family: var(--vscode-font-family);
+        }
+        button:disabled {
+            opacity: 0.5;
+            cursor: default;
+        }
+        .stats {
+            padding: 10px;
+            margin-bottom: 12px;
+            background-color: var(--vscode-textBlockQuote-background);
+            border-left: 4px solid var(--vscode-textBlockQuote-border);
+            font-size: 12px;
+            color: var(--vscode-descriptionForeground);
+        }
+        .error {
+            color: var(--vscode-errorForeground);
+        }
+        table {
+            border-collapse: collapse;
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+        }
+        th, td {
+            border: 1px solid var(--vscode-panel-border);
+            padding: 3px 8px;
+            text-align: left;
+            vertical-align: top;
+            white-space: nowrap;
+        }
+        th {
+            background-color: var(--vscode-editor-inactiveSelectionBackground);
+        }
+        th.partition {
+            font-style: italic;
+        }
+    </style>
+</head>
+<body>
+    <div class="directory">${this.escapeHtml(directory)}</div>
+    <div class="filter-bar">
+        <input type="text" id="filter" placeholder="Filter, e.g. year >= 2023 and region in ('eu', 'us') and amount > 10">
+        <button onclick="applyFilter()">Apply</button>
+    </div>
+    <div class="stats" id="stats">Listing files…</div>
+    <div class="pager">
+        <button id="first" onclick="showPage(0)" disabled>First</button>
+        <button id="previous" onclick="showPage(offset - PAGE_SIZE)" disabled>Previous</button>
+        <button id="next" onclick="showPage(offset + PAGE_SIZE)" disabled>Next</button>
+        <span id="rows"></span>
+    </div>
+    <div id="table"></div>
+    <script>
+        const vscode = acquireVsCodeApi();
+        const PAGE_SIZE = ${PAGE_SIZE};
+        let offset = 0;
+        let filter = '';
+
+        function showPage(newOffset) {
+            offset = Math.max(0, newOffset);
+            ['first', 'previous', 'next'].forEach(id => document.getElementById(id).disabled = true);
+            document.getElementById('rows').textContent = 'Reading…';
+            vscode.postMessage({ command: 'datasetPage', offset, filter });
+        }
+
+        function applyFilter() {
+            filter = document.getElementById('filter').value.trim();
+            document.getElementById('stats').classList.remove('error');
+            showPage(0);
+        }
+
+        document.getElementById('filter').addEventListener('keydown', event => {
+            if (event.key === 'Enter') {
+                applyFilter();
+            }
+        });
+
+        function formatCell(value) {
+            if (value === null || value === undefined) {
+                return '';
+            }
+            return typeof value === 'object' ? JSON.stringify(value) : String(value);
+        }
+
+        function renderPage(page) {
+            const partitions = Object.keys(page.partitioning);
+            const total = page.num_rows !== null
+                ? page.num_rows.toLocaleString() + ' rows'
+                : 'at most ' + page.num_rows_upper_bound.toLocaleString() + ' rows (row groups left after pruning)';
+            document.getElementById('stats').textContent =
+                (page.format === 'parquet' ? 'Parquet' : 'Arrow') + ' dataset · ' +
+                page.num_files.toLocaleString() + ' files' +
+                (page.filter ? ' · ' + page.num_fragments.toLocaleString() + ' left after pruning' : '') +
+                (page.num_row_groups !== undefined ? ' · ' + page.num_row_groups.toLocaleString() + ' row groups' : '') +
+                ' · ' + total +
+                (partitions.length ? ' · partitioned by ' + partitions.join(', ') : '');
+
+            const last = page.offset + page.data.length;
+            document.getElementById('rows').textContent = page.data.length
+                ? 'Rows ' + (page.offset + 1).toLocaleString() + '–' + last.toLocaleString() +
+                  (page.num_rows !== null ? ' of ' + page.num_rows.toLocaleString() : '')
+                : 'No rows';
+            document.getElementById('first').disabled = page.offset === 0;
+            document.getElementById('previous').disabled = page.offset === 0;
+            document.getElementById('next').disabled = page.num_rows !== null
+                ? last >= page.num_rows
+                : page.data.length < PAGE_SIZE;
+
+            const table = document.createElement('table');
+            const header = table.insertRow();
+            ['#', ...page.columns].forEach(column => {
+                const th = document.createElement('th');
+                th.textContent = column;
+                if (partitions.includes(column)) {
+                    th.className = 'partition';
+                    th.title = 'Partition column';
+                }
+                header.appendChild(th);
+            });
+            page.data.forEach((record, i) => {
+                const row = table.insertRow();
+                row.insertCell().textContent = String(page.offset + i);
+                page.columns.forEach(column => {
+                    row.insertCell().textContent = formatCell(record[column]);
+                });
+            });
+            document.getElementById('table').replaceChildren(table);
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            if (message.command === 'datasetPage') {
+                renderPage(message);
+            } else if (message.command === 'datasetProgress') {
+                document.getElementById('rows').textContent = message.message + '…';
+            } else if (message.command === 'datasetError') {
+                const stats = document.getElementById('stats');
+                stats.textContent = message.error;
+                stats.classList.add('error');
+                document.getElementById('rows').textContent = '';
+            }
+        });
+
+        showPage(0);
+    </script>
+</body>
+</html>`;
+    }
+
+    private static escapeHtml(unsafe: string): string {
+        return String(unsafe)
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/"/g, "&quot;")
+            .replace(/'/g, "&#039;");
+    }
+}
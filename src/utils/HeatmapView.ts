@@ -0,0 +1,399 @@
+import * as vscode from 'vscode';
+import { PythonRunner } from './PythonRunner';
+
+// Must match TILE_SIZE in python/heatmap_tiles.py
+const TILE_SIZE = 256;
+
+export class HeatmapView {
+    // Tile requests in flight per webview, keyed by the view (variable, index, mode) they draw.
+    // Several can run at once while panning; switching views cancels the old view's requests.
+    private static requests = new Map<vscode.Webview, Map<string, Set<vscode.CancellationTokenSource>>>();
+
+    static async handleMessage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        const scriptPath = PythonRunner.getScriptPath('heatmap_tiles.py');
+
+        try {
+            if (message.command === 'heatmapList') {
+                const output = await PythonRunner.runScript(scriptPath, [uri.fsPath, '--list']);
+                webview.postMessage({ command: 'heatmapList', ...JSON.parse(output) });
+            } else if (message.command === 'heatmapTiles') {
+                await this.requestTiles(message, uri, webview);
+            }
+        } catch (error) {
+            webview.postMessage({
+                command: 'heatmapError',
+                requestKey: message.requestKey,
+                error: error instanceof Error ? error.message : String(error)
+            });
+        }
+    }
+
+    static cancel(webview: vscode.Webview, keepKey?: string): void {
+        const views = this.requests.get(webview);
+        if (!views) {
+            return;
+        }
+        views.forEach((requests, key) => {
+            if (key !== keepKey) {
+                requests.forEach(request => {
+                    request.cancel();
+                    request.dispose();
+                });
+                views.delete(key);
+            }
+        });
+        if (views.size === 0) {
+            this.requests.delete(webview);
+        }
+    }
+
+    private static async requestTiles(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        const key = String(message.requestKey);
+        this.cancel(webview, key);
+        const request = new vscode.CancellationTokenSource();
+        const views = this.requests.get(webview) ?? new Map<string, Set<vscode.CancellationTokenSource>>();
+        const requests = views.get(key) ?? new Set<vscode.CancellationTokenSource>();
+        requests.add(request);
+        views.set(key, requests);
+        this.requests.set(webview, views);
+
+        let reportedError = false;
+        try {
+            // Streamed rather than run with a timeout: the first request builds the overview
+            // levels in a full pass over the array, which takes minutes for large files
+            await PythonRunner.streamScript(
+                PythonRunner.getScriptPath('heatmap_tiles.py'),
+                [
+                    uri.fsPath,
+                    `--variable=${message.variable}`,
+                    `--index=${message.index}`,
+                    `--level=${message.level}`,
+                    `--tiles=${message.tiles}`,
+                    `--mode=${message.mode}`,
+                    `--tile-size=${TILE_SIZE}`,
+                    `--cache-dir=${PythonRunner.getStoragePath('heatmap-cache')}`
+                ],
+                (line) => {
+                    const result = JSON.parse(line);
+                    if (result.error) {
+                        reportedError = true;
+                        webview.postMessage({ command: 'heatmapError', requestKey: message.requestKey, error: result.error });
+                    } else if (result.progress) {
+                        webview.postMessage({ command: 'heatmapProgress', requestKey: message.requestKey, progress: result.progress });
+                    } else {
+                        webview.postMessage({ command: 'heatmapTiles', requestKey: message.requestKey, ...result });
+                    }
+                },
+                request.token
+            );
+        } catch (error) {
+            if (!reportedError) {
+                throw error;
+            }
+        } finally {
+            if (requests.delete(request)) {
+                request.dispose();
+                if (requests.size === 0 && views.get(key) === requests) {
+                    views.delete(key);
+                }
+                if (views.size === 0 && this.requests.get(webview) === views) {
+                    this.requests.delete(webview);
+                }
+            }
+        }
+    }
+
+    static getStyles(): string {
+        return `
+        .heatmap-panel {
+            display: none;
+            flex-direction: column;
+            position: fixed;
+            top: 52px;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background-color: var(--vscode-editor-background);
+            z-index: 10;
+        }
+        .heatmap-toolbar {
+            display: flex;
+            gap: 10px;
+            align-items: center;
+            padding: 8px 20px;
+            border-bottom: 1px solid var(--vscode-panel-border);
+            font-size: 12px;
+        }
+        .heatmap-toolbar select, .heatmap-toolbar input {
+            background-color: var(--vscode-input-background);
+            color: var(--vscode-input-foreground);
+            border: 1px solid var(--vscode-input-border, transparent);
+            font-family: var(--vscode-font-family);
+        }
+        .heatmap-status {
+            color: var(--vscode-descriptionForeground);
+            margin-left: auto;
+        }
+        #heatmap-canvas {
+            flex: 1;
+            width: 100%;
+            cursor: grab;
+            image-rendering: pixelated;
+        }`;
+    }
+
+    static getMarkup(): string {
+        return `
+    <div class="heatmap-panel" id="heatmap-panel">
+        <div class="heatmap-toolbar">
+            <select id="heatmap-variable" onchange="selectHeatmapVariable()"></select>
+            <label id="heatmap-index-label" style="display: none;">Index <input id="heatmap-index" size="8" onchange="selectHeatmapVariable()"></label>
+            <select id="heatmap-mode" onchange="selectHeatmapVariable()">
+                <option value="mean">Block mean</option>
+                <option value="max">Block max</option>
+            </select>
+            <button onclick="zoomHeatmap(-1)">+</button>
+            <button onclick="zoomHeatmap(1)">−</button>
+            <button onclick="closeHeatmap()">Close</button>
+            <span class="heatmap-status" id="heatmap-status"></span>
+        </div>
+        <canvas id="heatmap-canvas"></canvas>
+    </div>`;
+    }
+
+    static getScript(): string {
+        return `
+        const HEATMAP_TILE_SIZE = ${TILE_SIZE};
+        const HEATMAP_COLORS = [[68, 1, 84], [59, 82, 139], [33, 145, 140], [94, 201, 98], [253, 231, 37]];
+        const heatmap = {
+            variables: [], variable: null, shape: null, index: '', mode: 'mean',
+            numLevels: 1, level: 0, offsetX: 0, offsetY: 0, min: null, max: null,
+            tiles: new Map(), pending: new Set(), drag: null
+        };
+
+        function openHeatmap() {
+            document.getElementById('heatmap-panel').style.display = 'flex';
+            document.getElementById('heatmap-status').textContent = 'Finding 2-D arrays...';
+            vscode.postMessage({ command: 'heatmapList' });
+        }
+
+        function closeHeatmap() {
+            document.getElementById('heatmap-panel').style.display = 'none';
+        }
+
+        function heatmapKey() {
+            return heatmap.variable + '|' + heatmap.index + '|' + heatmap.mode;
+        }
+
+        function heatmapLevelShape(level) {
+            const factor = Math.pow(2, level);
+            return [Math.ceil(heatmap.shape[0] / factor), Math.ceil(heatmap.shape[1] / factor)];
+        }
+
+        function selectHeatmapVariable() {
+            const select = document.getElementById('heatmap-variable');
+            const info = heatmap.variables[select.selectedIndex];
+            if (!info) return;
+            const canvas = document.getElementById('heatmap-canvas');
+
+            document.getElementById('heatmap-index-label').style.display = info.shape.length > 2 ? 'inline' : 'none';
+            heatmap.variable = info.name;
+            heatmap.index = info.shape.length > 2 ? document.getElementById('heatmap-index').value : '';
+            heatmap.mode = document.getElementById('heatmap-mode').value;
+            heatmap.shape = info.shape.slice(-2);
+            const largest = Math.max(heatmap.shape[0], heatmap.shape[1]);
+            heatmap.numLevels = largest <= HEATMAP_TILE_SIZE ? 1 : Math.ceil(Math.log2(largest / HEATMAP_TILE_SIZE)) + 1;
+            heatmap.level = heatmap.numLevels - 1;
+            heatmap.min = null;
+            heatmap.max = null;
+            heatmap.tiles.clear();
+            heatmap.pending.clear();
+
+            // Start at the coarsest level, centred in the viewport
+            const levelShape = heatmapLevelShape(heatmap.level);
+            heatmap.offsetX = Math.floor((levelShape[1] - canvas.clientWidth) / 2);
+            heatmap.offsetY = Math.floor((levelShape[0] - canvas.clientHeight) / 2);
+            document.getElementById('heatmap-status').textContent = 'Building overview (first open of a large array reads it once)...';
+            drawHeatmap();
+        }
+
+        function zoomHeatmap(delta, anchorX, anchorY) {
+            const canvas = document.getElementById('heatmap-canvas');
+            const newLevel = heatmap.level + delta;
+            if (!heatmap.shape || newLevel < 0 || newLevel >= heatmap.numLevels) return;
+            const ax = anchorX === undefined ? canvas.clientWidth / 2 : anchorX;
+            const ay = anchorY === undefined ? canvas.clientHeight / 2 : anchorY;
+            const scale = delta < 0 ? 2 : 0.5;
+            heatmap.offsetX = Math.floor((heatmap.offsetX + ax) * scale - ax);
+            heatmap.offsetY = Math.floor((heatmap.offsetY + ay) * scale - ay);
+            heatmap.level = newLevel;
+            drawHeatmap();
+        }
+
+        function heatmapColor(value) {
+            if (value === null || heatmap.min === null) return null;
+            const span = heatmap.max - heatmap.min;
+            const t = span > 0 ? Math.min(1, Math.max(0, (value - heatmap.min) / span)) : 0.5;
+            const pos = t * (HEATMAP_COLORS.length - 1);
+            const i = Math.min(Math.floor(pos), HEATMAP_COLORS.length - 2);
+            const f = pos - i;
+            const a = HEATMAP_COLORS[i];
+            const b = HEATMAP_COLORS[i + 1];
+            return [a[0] + (b[0] - a[0]) * f, a[1] + (b[1] - a[1]) * f, a[2] + (b[2] - a[2]) * f];
+        }
+
+        function renderHeatmapTile(tile) {
+            const image = document.createElement('canvas');
+            image.width = tile.shape[1];
+            image.height = tile.shape[0];
+            const ctx = image.getContext('2d');
+            const pixels = ctx.createImageData(image.width, image.height);
+            for (let i = 0; i < tile.data.length; i++) {
+                const color = heatmapColor(tile.data[i]);
+                if (color) {
+                    pixels.data[i * 4] = color[0];
+                    pixels.data[i * 4 + 1] = color[1];
+                    pixels.data[i * 4 + 2] = color[2];
+                    pixels.data[i * 4 + 3] = 255;
+                }
+            }
+            ctx.putImageData(pixels, 0, 0);
+            tile.image = image;
+            return tile;
+        }
+
+        function drawHeatmap() {
+            const canvas = document.getElementById('heatmap-canvas');
+            canvas.width = canvas.clientWidth;
+            canvas.height = canvas.clientHeight;
+            const ctx = canvas.getContext('2d');
+            ctx.imageSmoothingEnabled = false;
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            if (!heatmap.shape) return;
+
+            const levelShape = heatmapLevelShape(heatmap.level);
+            const rows = Math.ceil(levelShape[0] / HEATMAP_TILE_SIZE);
+            const cols = Math.ceil(levelShape[1] / HEATMAP_TILE_SIZE);
+            const r0 = Math.max(0, Math.floor(heatmap.offsetY / HEATMAP_TILE_SIZE));
+            const c0 = Math.max(0, Math.floor(heatmap.offsetX / HEATMAP_TILE_SIZE));
+            const r1 = Math.min(rows - 1, Math.floor((heatmap.offsetY + canvas.height - 1) / HEATMAP_TILE_SIZE));
+            const c1 = Math.min(cols - 1, Math.floor((heatmap.offsetX + canvas.width - 1) / HEATMAP_TILE_SIZE));
+
+            const missing = [];
+            for (let r = r0; r <= r1; r++) {
+                for (let c = c0; c <= c1; c++) {
+                    const key = heatmap.level + ':' + r + ':' + c;
+                    const tile = heatmap.tiles.get(key);
+                    if (tile) {
+                        ctx.drawImage(tile.image, c * HEATMAP_TILE_SIZE - heatmap.offsetX, r * HEATMAP_TILE_SIZE - heatmap.offsetY);
+                    } else if (!heatmap.pending.has(key)) {
+                        heatmap.pending.add(key);
+                        missing.push(r + ':' + c);
+                    }
+                }
+            }
+
+            if (missing.length > 0) {
+                vscode.postMessage({
+                    command: 'heatmapTiles',
+                    requestKey: heatmapKey(),
+                    variable: heatmap.variable,
+                    index: heatmap.index,
+                    mode: heatmap.mode,
+                    level: heatmap.level,
+                    tiles: missing.join(',')
+                });
+            }
+            updateHeatmapStatus();
+        }
+
+        function updateHeatmapStatus(extra) {
+            if (!heatmap.shape) return;
+            let text = heatmap.shape[0] + '×' + heatmap.shape[1] +
+                ' | zoom 1:' + Math.pow(2, heatmap.level) + ' (' + heatmap.mode + ')';
+            if (heatmap.min !== null) {
+                text += ' | range ' + heatmap.min.toPrecision(4) + ' … ' + heatmap.max.toPrecision(4);
+            }
+            if (extra) text += ' | ' + extra;
+            document.getElementById('heatmap-status').textContent = text;
+        }
+
+        function heatmapValueAt(x, y) {
+            const px = heatmap.offsetX + x;
+            const py = heatmap.offsetY + y;
+            const r = Math.floor(py / HEATMAP_TILE_SIZE);
+            const c = Math.floor(px / HEATMAP_TILE_SIZE);
+            const tile = heatmap.tiles.get(heatmap.level + ':' + r + ':' + c);
+            if (!tile || px < 0 || py < 0) return null;
+            const i = py - r * HEATMAP_TILE_SIZE;
+            const j = px - c * HEATMAP_TILE_SIZE;
+            if (i >= tile.shape[0] || j >= tile.shape[1]) return null;
+            const factor = Math.pow(2, heatmap.level);
+            return '[' + (py * factor) + ', ' + (px * factor) + '] = ' + tile.data[i * tile.shape[1] + j];
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            if (message.command === 'heatmapList') {
+                heatmap.variables = message.variables || [];
+                const select = document.getElementById('heatmap-variable');
+                select.innerHTML = '';
+                heatmap.variables.forEach(info => {
+                    const option = document.createElement('option');
+                    option.textContent = (info.name || 'array') + ' ' + JSON.stringify(info.shape) + ' ' + info.dtype;
+                    select.appendChild(option);
+                });
+                if (heatmap.variables.length === 0) {
+                    document.getElementById('heatmap-status').textContent = 'No 2-D numeric arrays found';
+                } else {
+                    selectHeatmapVariable();
+                }
+            } else if (message.command === 'heatmapTiles') {
+                if (message.requestKey !== heatmapKey()) return;
+                heatmap.min = message.min;
+                heatmap.max = message.max;
+                message.tiles.forEach(tile => {
+                    const key = tile.level + ':' + tile.row + ':' + tile.col;
+                    heatmap.pending.delete(key);
+                    heatmap.tiles.set(key, renderHeatmapTile(tile));
+                });
+                drawHeatmap();
+            } else if (message.command === 'heatmapProgress') {
+                if (message.requestKey !== heatmapKey()) return;
+                updateHeatmapStatus(message.progress);
+            } else if (message.command === 'heatmapError') {
+                if (message.requestKey && message.requestKey !== heatmapKey()) return;
+                heatmap.pending.clear();
+                document.getElementById('heatmap-status').textContent = message.error;
+            }
+        });
+
+        (function initHeatmapCanvas() {
+            const canvas = document.getElementById('heatmap-canvas');
+            canvas.addEventListener('wheel', event => {
+                event.preventDefault();
+                zoomHeatmap(event.deltaY < 0 ? -1 : 1, event.offsetX, event.offsetY);
+            });
+            canvas.addEventListener('mousedown', event => {
+                heatmap.drag = { x: event.clientX, y: event.clientY, offsetX: heatmap.offsetX, offsetY: heatmap.offsetY };
+                canvas.style.cursor = 'grabbing';
+            });
+            window.addEventListener('mouseup', () => {
+                heatmap.drag = null;
+                canvas.style.cursor = 'grab';
+            });
+            canvas.addEventListener('mousemove', event => {
+                if (heatmap.drag) {
+                    heatmap.offsetX = heatmap.drag.offsetX - (event.clientX - heatmap.drag.x);
+                    heatmap.offsetY = heatmap.drag.offsetY - (event.clientY - heatmap.drag.y);
+                    drawHeatmap();
+                } else {
+                    updateHeatmapStatus(heatmapValueAt(event.offsetX, event.offsetY));
+                }
+            });
+            window.addEventListener('resize', () => {
+                if (document.getElementById('heatmap-panel').style.display === 'flex') drawHeatmap();
+            });
+        })();`;
+    }
+}
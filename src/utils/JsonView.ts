@@ -0,0 +1,548 @@
+import { TypedBuffers } from './TypedBuffers';
+
+// Highlighted HTML is sent to the page in pieces of about this many characters
+const CHUNK_CHARS = 256 * 1024;
+// Keys and leaves the search index covers; larger payloads are indexed up to here
+const MAX_INDEX_ENTRIES = 2000000;
+const MAX_RESULTS = 200;
+// Values simplified or indexed between yields to the worker's message loop
+const WORK_CHUNK = 50000;
+
+/**
+ * The JSON view's work runs in a Web Worker: parsing the converter output
+ * (fetched from the result file, so it never passes through the extension host),
+ * simplifying it, serializing and syntax-highlighting it (sent back in chunks
+ * the page appends as they arrive), and an inverted index over keys and
+ * string/number leaves that answers "Search data" queries with highlighted
+ * paths. Words are looked up by prefix in the sorted token list; matching
+ * inside words scans every token and is only done when asked for. Simplifying
+ * and indexing yield every WORK_CHUNK values and report progress, so renders
+ * and searches are not held up behind them. The page itself never parses the
+ * data. Where workers are unavailable the same code runs on the page.
+ */
+export class JsonView {
+    // Embeds a string in an inline script as a JS string literal ('<' escaped so it cannot close the tag)
+    static literal(text: string): string {
+        return JSON.stringify(text).replace(/</g, '\\u003c');
+    }
+
+    static getStyles(): string {
+        return `
+        .json-search {
+            background-color: var(--vscode-input-background);
+            color: var(--vscode-input-foreground);
+            border: 1px solid var(--vscode-input-border, transparent);
+            font-family: var(--vscode-font-family);
+            padding: 4px;
+            width: 180px;
+        }
+        .json-search-anywhere {
+            font-size: 12px;
+            color: var(--vscode-descriptionForeground);
+        }
+        .json-search-results {
+            display: none;
+            margin-bottom: 12px;
+            max-height: 240px;
+            overflow: auto;
+            border-left: 4px solid var(--vscode-textBlockQuote-border);
+            padding-left: 8px;
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+        }
+        .json-search-status {
+            color: var(--vscode-descriptionForeground);
+            font-family: var(--vscode-font-family);
+            margin-bottom: 4px;
+        }
+        .json-search-path {
+            color: var(--vscode-symbolIcon-propertyForeground, #9cdcfe);
+        }
+        .json-search-value {
+            color: var(--vscode-descriptionForeground);
+        }
+        .json-search-results mark {
+            background-color: var(--vscode-editor-findMatchHighlightBackground);
+            color: inherit;
+        }`;
+    }
+
+    static getControls(): string {
+        return `
+            <input type="search" class="json-search" id="json-search" placeholder="Search data" oninput="searchJson()">
+            <label class="json-search-anywhere" title="Also match text in the middle of words (slower on large files)">
+                <input type="checkbox" id="json-search-anywhere" onchange="searchJson()"> Anywhere
+            </label>`;
+    }
+
+    static getMarkup(): string {
+        return `
+        <div class="json-search-results" id="json-search-results"></div>`;
+    }
+
+    // Also used on the page for the small snippets other views render
+    static getHighlightScript(): string {
+        return `
+        function syntaxHighlight(json) {
+            json = json.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+            return json.replace(/(\"(\\u[a-zA-Z0-9]{4}|\\[^u]|[^\\\"])*\"(\\s*:)?|\\b(true|false|null|NaN)\\b|-?Infinity|-?\\d+(?:\\.\\d*)?(?:[eE][+\\-]?\\d+)?)/g, function (match) {
+                let cls = 'json-number';
+                if (/^\"/.test(match)) {
+                    if (/:$/.test(match)) {
+                        cls = 'json-key';
+                    } else {
+                        cls = 'json-string';
+                    }
+                } else if (/true|false/.test(match)) {
+                    cls = 'json-boolean';
+                } else if (/null/.test(match)) {
+                    cls = 'json-null';
+                }
+                return '<span class="' + cls + '">' + match + '</span>';
+            });
+        }`;
+    }
+
+    // Page side: fetches the converter output into the worker and shows what it sends back
+    static getScript(resultUrl: string): string {
+        return `
+        const RESULT_URL = ${this.literal(resultUrl)};
+        const WORKER_SOURCE = ${this.literal(this.getWorkerSource())};
+        let isSimplified = false;
+        let indent = 2;
+        let renderId = 0;
+        let searchId = 0;
+        let searchPending = false;
+        let searchTimer;
+        let copyButton;
+        let loaded = false;
+
+        function createJsonWorker() {
+            try {
+                return new Worker(URL.createObjectURL(new Blob([WORKER_SOURCE], { type: 'text/javascript' })));
+            } catch (error) {
+                // Same messages, handled on this thread
+                const page = { onmessage: null, postMessage: message => setTimeout(() => worker.onmessage({ data: message })) };
+                const worker = { onmessage: null, postMessage: message => setTimeout(() => page.onmessage({ data: message })) };
+                new Function('self', WORKER_SOURCE)(worker);
+                return page;
+            }
+        }
+        const jsonWorker = createJsonWorker();
+
+        function renderJson() {
+            if (!loaded) return;
+            renderId++;
+            jsonWorker.postMessage({ command: 'render', id: renderId, simplified: isSimplified, indent: indent });
+        }
+
+        function toggleSimplify() {
+            isSimplified = !isSimplified;
+            simplifyButtonText();
+            renderJson();
+        }
+
+        function simplifyButtonText() {
+            document.getElementById('simplifyBtn').textContent = isSimplified ? 'Show Details' : 'Simplify';
+        }
+
+        function copyToClipboard(button) {
+            if (!loaded) return;
+            copyButton = button;
+            jsonWorker.postMessage({ command: 'copy', simplified: isSimplified });
+        }
+
+        function toggleCollapse() {
+            indent = undefined;
+            renderJson();
+        }
+
+        function toggleExpand() {
+            indent = 2;
+            renderJson();
+        }
+
+        function searchJson() {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => {
+                const query = document.getElementById('json-search').value;
+                searchId++;
+                if (!loaded || !query.trim()) {
+                    searchPending = false;
+                    document.getElementById('json-search-results').style.display = 'none';
+                    return;
+                }
+                searchPending = true;
+                jsonWorker.postMessage({
+                    command: 'search',
+                    id: searchId,
+                    query: query,
+                    anywhere: document.getElementById('json-search-anywhere').checked
+                });
+            }, 150);
+        }
+
+        jsonWorker.onmessage = event => {
+            const message = event.data;
+            if (message.command === 'chunk' && message.id === renderId) {
+                const content = document.getElementById('json-content');
+                if (message.first) {
+                    simplifyButtonText();
+                    content.innerHTML = message.html;
+                } else {
+                    content.insertAdjacentHTML('beforeend', message.html);
+                }
+                if (message.first && message.id === 1) {
+                    // Time from navigation start to the first frame with content laid out
+                    requestAnimationFrame(() => {
+                        const render = document.getElementById('perf-render');
+                        if (render) {
+                            render.textContent = Math.round(performance.now()) + ' ms';
+                        }
+                    });
+                }
+            } else if (message.command === 'copy') {
+                navigator.clipboard.writeText(message.text).then(() => {
+                    const originalText = copyButton.textContent;
+                    copyButton.textContent = '✓ Copied!';
+                    setTimeout(() => {
+                        copyButton.textContent = originalText;
+                    }, 2000);
+                });
+            } else if (message.command === 'progress') {
+                if (message.task === 'simplify') {
+                    document.getElementById('simplifyBtn').textContent = 'Simplifying… ' + message.done.toLocaleString();
+                } else if (searchPending) {
+                    const results = document.getElementById('json-search-results');
+                    results.innerHTML = '<div class="json-search-status">Indexing… ' + message.done.toLocaleString() + ' keys and values</div>';
+                    results.style.display = 'block';
+                }
+            } else if (message.command === 'results' && message.id === searchId) {
+                searchPending = false;
+                const results = document.getElementById('json-search-results');
+                results.innerHTML = '<div class="json-search-status">' + message.total.toLocaleString() + ' matches' +
+                    (message.total > message.shown ? ', showing the first ' + message.shown : '') +
+                    ' (' + message.ms + ' ms)' +
+                    (message.truncated ? ' · only the first ' + message.indexed.toLocaleString() + ' keys and values are indexed' : '') +
+                    '</div>' + message.html;
+                results.style.display = 'block';
+            } else if (message.command === 'error') {
+                document.getElementById('json-content').textContent = message.error;
+            }
+        };
+        // The bytes go to the worker without a copy and are only decoded there
+        const fetchStart = performance.now();
+        fetch(RESULT_URL)
+            .then(response => {
+                if (!response.ok) throw new Error('HTTP ' + response.status);
+                return response.arrayBuffer();
+            })
+            .then(buffer => {
+                const fetched = document.getElementById('perf-fetch');
+                if (fetched) {
+                    fetched.textContent = Math.round(performance.now() - fetchStart) + ' ms';
+                }
+                jsonWorker.postMessage({ command: 'load', buffer: buffer }, [buffer]);
+                loaded = true;
+                renderJson();
+            })
+            .catch(error => {
+                document.getElementById('json-content').textContent = 'Failed to load the converter output: ' + error;
+            });`;
+    }
+
+    private static getWorkerSource(): string {
+        return `${TypedBuffers.getScript()}${this.getHighlightScript()}
+        const CHUNK_CHARS = ${CHUNK_CHARS};
+        const MAX_INDEX_ENTRIES = ${MAX_INDEX_ENTRIES};
+        const MAX_RESULTS = ${MAX_RESULTS};
+        const WORK_CHUNK = ${WORK_CHUNK};
+        const WORD_SEPARATORS = /[^\\p{L}\\p{N}_.\\-]+/u;
+        const IDENTIFIER = /^[A-Za-z_$][\\w$]*$/;
+
+        let data = null;
+        let simplifiedData = null;
+        let lastText = { key: null, text: '' };
+        let currentRender = 0;
+        let simplifying = null;
+        let index = null;
+        let indexing = null;
+
+        // Runs a generator that yields every WORK_CHUNK values, letting other messages in between
+        async function runInChunks(task, name) {
+            const counter = { done: 0 };
+            const steps = task(counter);
+            let step = steps.next();
+            while (!step.done) {
+                self.postMessage({ command: 'progress', task: name, done: counter.done });
+                await new Promise(resolve => setTimeout(resolve, 0));
+                step = steps.next();
+            }
+            return step.value;
+        }
+
+        function* simplifyData(obj, counter) {
+            if (obj === null || obj === undefined) return obj;
+            if (obj instanceof TypedBuffer) return obj;
+            if (++counter.done % WORK_CHUNK === 0) yield;
+
+            if (Array.isArray(obj)) {
+                const simplified = new Array(obj.length);
+                for (let i = 0; i < obj.length; i++) {
+                    const item = obj[i];
+                    simplified[i] = item !== null && typeof item === 'object' ? yield* simplifyData(item, counter) : item;
+                }
+                return simplified;
+            }
+
+            if (typeof obj === 'object') {
+                // Unwrap the converters' type wrappers
+                if (['numpy.ndarray', 'pandas.DataFrame', 'pandas.Series', 'tuple', 'set'].includes(obj._type) && obj.data) {
+                    return yield* simplifyData(obj.data, counter);
+                }
+
+                // Remove metadata fields
+                const simplified = {};
+                for (let key in obj) {
+                    if (!key.startsWith('_') && key !== 'file_type' && key !== 'metadata' && key !== 'schema') {
+                        simplified[key] = yield* simplifyData(obj[key], counter);
+                    }
+                }
+                return simplified;
+            }
+
+            return obj;
+        }
+
+        async function viewText(simplified, indent) {
+            const key = simplified + ':' + indent;
+            if (simplified && simplifiedData === null) {
+                if (simplifying === null) {
+                    simplifying = runInChunks(counter => simplifyData(data, counter), 'simplify');
+                }
+                simplifiedData = await simplifying;
+            }
+            if (lastText.key !== key) {
+                lastText = { key: key, text: displayJson(simplified ? simplifiedData : data, indent) };
+            }
+            return lastText.text;
+        }
+
+        // Highlights and sends the text in chunks, yielding in between so a newer render or a search can start
+        async function render(id, simplified, indent) {
+            currentRender = id;
+            const text = await viewText(simplified, indent);
+            if (currentRender !== id) return;
+            let start = 0;
+            let first = true;
+            while (first || start < text.length) {
+                // Strings never contain raw newlines, so cutting after one never splits a token
+                let end = text.indexOf('\\n', start + CHUNK_CHARS);
+                end = end === -1 ? text.length : end + 1;
+                self.postMessage({ command: 'chunk', id: id, first: first, html: syntaxHighlight(text.slice(start, end)) });
+                first = false;
+                start = end;
+                if (start < text.length) {
+                    await new Promise(resolve => setTimeout(resolve, 0));
+                    if (currentRender !== id) return;
+                }
+            }
+            // Build the search index while the user reads, rather than on the first keystroke
+            if (indexing === null) setTimeout(ensureIndex, 0);
+        }
+
+        function ensureIndex() {
+            if (indexing === null) {
+                indexing = runInChunks(buildIndex, 'index').then(built => index = built);
+            }
+            return indexing;
+        }
+
+        function memberPath(key) {
+            return IDENTIFIER.test(key) ? '.' + key : '[' + JSON.stringify(key) + ']';
+        }
+
+        function elementPath(shape, i) {
+            const indices = [];
+            for (let axis = shape.length - 1; axis >= 0; axis--) {
+                indices.unshift('[' + (i % shape[axis]) + ']');
+                i = Math.floor(i / shape[axis]);
+            }
+            return indices.join('');
+        }
+
+        function formatLeaf(value) {
+            if (typeof value === 'string' && value.startsWith(RAW_VALUE)) return value.slice(1);
+            if (value && typeof value === 'object') {
+                const imag = formatLeaf(value.imag);
+                return formatLeaf(value.real) + (imag.startsWith('-') ? '' : '+') + imag + 'j';
+            }
+            return String(value);
+        }
+
+        // Inverted index: token -> entries (path id * 2, + 1 when the key rather than the value matched),
+        // with the tokens also kept sorted for prefix lookups
+        function* buildIndex(counter) {
+            const postings = new Map();
+            const paths = [];
+            const values = [];
+            let truncated = false;
+
+            function add(token, entry) {
+                const list = postings.get(token);
+                if (list === undefined) {
+                    postings.set(token, [entry]);
+                } else if (list[list.length - 1] !== entry) {
+                    list.push(entry);
+                }
+            }
+
+            function addTokens(text, entry) {
+                const lower = text.toLowerCase();
+                add(lower.slice(0, 200), entry);
+                for (const word of lower.split(WORD_SEPARATORS)) {
+                    if (word && word !== lower) add(word, entry);
+                }
+            }
+
+            // Leaves are indexed here; only containers recurse (and so make generators)
+            function node(value, path, key) {
+                if (paths.length >= MAX_INDEX_ENTRIES) {
+                    truncated = true;
+                    return -1;
+                }
+                const id = paths.push(path) - 1;
+                values.push(value);
+                counter.done++;
+                if (key !== null) addTokens(key, id * 2 + 1);
+                if (value === null || typeof value !== 'object') {
+                    addTokens(formatLeaf(value), id * 2);
+                }
+                return id;
+            }
+
+            function* child(value, path, key) {
+                if (node(value, path, key) !== -1 && value !== null && typeof value === 'object') {
+                    yield* visit(value, path);
+                }
+                if (counter.done % WORK_CHUNK === 0) yield;
+            }
+
+            function* visit(value, path) {
+                if (value instanceof TypedBuffer) {
+                    const count = value.shape.reduce((a, b) => a * b, 1);
+                    for (let i = 0; i < count && !truncated; i++) {
+                        node(value.element(i), path + elementPath(value.shape, i), null);
+                        if (counter.done % WORK_CHUNK === 0) yield;
+                    }
+                } else if (Array.isArray(value)) {
+                    for (let i = 0; i < value.length && !truncated; i++) {
+                        yield* child(value[i], path + '[' + i + ']', null);
+                    }
+                } else {
+                    for (const key in value) {
+                        if (truncated) break;
+                        yield* child(value[key], path + memberPath(key), key);
+                    }
+                }
+            }
+
+            if (data !== null && typeof data === 'object') yield* visit(data, '$');
+            const tokens = Array.from(postings.keys()).sort();
+            return { postings: postings, tokens: tokens, paths: paths, values: values, truncated: truncated };
+        }
+
+        // First position in the sorted tokens not before term
+        function lowerBound(tokens, term) {
+            let low = 0;
+            let high = tokens.length;
+            while (low < high) {
+                const mid = (low + high) >>> 1;
+                if (tokens[mid] < term) low = mid + 1; else high = mid;
+            }
+            return low;
+        }
+
+        function escapeHtml(text) {
+            return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+        }
+
+        function markTerm(text, term) {
+            const lower = text.toLowerCase();
+            let html = '';
+            let start = 0;
+            let at = lower.indexOf(term);
+            while (at !== -1 && term) {
+                html += escapeHtml(text.slice(start, at)) + '<mark>' + escapeHtml(text.slice(at, at + term.length)) + '</mark>';
+                start = at + term.length;
+                at = lower.indexOf(term, start);
+            }
+            return html + escapeHtml(text.slice(start));
+        }
+
+        function preview(value) {
+            if (value instanceof TypedBuffer) return value.dtype + ' array (' + value.shape.join(' × ') + ')';
+            if (Array.isArray(value)) return 'Array(' + value.length + ')';
+            if (value !== null && typeof value === 'object' && !('real' in value)) return 'Object';
+            const text = typeof value === 'string' && !value.startsWith(RAW_VALUE) ? JSON.stringify(value) : formatLeaf(value);
+            return text.length > 120 ? text.slice(0, 120) + '…' : text;
+        }
+
+        async function search(id, query, anywhere) {
+            const started = performance.now();
+            await ensureIndex();
+            const term = query.trim().toLowerCase();
+            // Each path once, in document order; key and value matches are kept apart for highlighting
+            const matched = new Map();
+            const collect = list => list.forEach(entry => matched.set(entry >> 1, (matched.get(entry >> 1) || 0) | (entry & 1 ? 2 : 1)));
+            if (anywhere) {
+                index.postings.forEach((list, token) => {
+                    if (token.includes(term)) collect(list);
+                });
+            } else {
+                // The tokens starting with the term are next to each other in sorted order
+                for (let i = lowerBound(index.tokens, term); i < index.tokens.length && index.tokens[i].startsWith(term); i++) {
+                    collect(index.postings.get(index.tokens[i]));
+                }
+            }
+            const ids = Array.from(matched.keys()).sort((a, b) => a - b);
+            const html = ids.slice(0, MAX_RESULTS).map(pathId => {
+                const how = matched.get(pathId);
+                const path = index.paths[pathId];
+                const value = preview(index.values[pathId]);
+                return '<div><span class="json-search-path">' + (how & 2 ? markTerm(path, term) : escapeHtml(path)) + '</span>' +
+                    ' <span class="json-search-value">' + (how & 1 ? markTerm(value, term) : escapeHtml(value)) + '</span></div>';
+            }).join('');
+            self.postMessage({
+                command: 'results',
+                id: id,
+                total: ids.length,
+                shown: Math.min(ids.length, MAX_RESULTS),
+                indexed: index.paths.length,
+                truncated: index.truncated,
+                ms: Math.round(performance.now() - started),
+                html: html
+            });
+        }
+
+        self.onmessage = event => {
+            const message = event.data;
+            try {
+                if (message.command === 'load') {
+                    data = decodeTypedBuffers(JSON.parse(new TextDecoder().decode(message.buffer)));
+                } else if (message.command === 'render') {
+                    render(message.id, message.simplified, message.indent).catch(error => self.postMessage({ command: 'error', error: String(error) }));
+                } else if (message.command === 'copy') {
+                    viewText(message.simplified, 2)
+                        .then(text => self.postMessage({ command: 'copy', text: text }))
+                        .catch(error => self.postMessage({ command: 'error', error: String(error) }));
+                } else if (message.command === 'search') {
+                    search(message.id, message.query, message.anywhere)
+                        .catch(error => self.postMessage({ command: 'error', error: String(error) }));
+                }
+            } catch (error) {
+                self.postMessage({ command: 'error', error: String(error) });
+            }
+        };`;
+    }
+}
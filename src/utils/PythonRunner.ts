@@ -1,23 +1,104 @@
 import * as vscode from 'vscode';
-import { exec } from 'child_process';
+import { exec, execFile, spawn } from 'child_process';
 import { promisify } from 'util';
 import * as path from 'path';
 import * as fs from 'fs';
+import * as os from 'os';
+import { ConversionScheduler } from './ConversionScheduler';
 
 const execAsync = promisify(exec);
+const execFileAsync = promisify(execFile);
+
+export interface ScriptTimings {
+    spawnedAt?: number;
+    exitedAt?: number;
+}
+
+export interface RunScriptOptions {
+    // Filled in with wall-clock timestamps (ms since epoch) around the child process
+    timings?: ScriptTimings;
+    // Run the script under cProfile and write the pstats dump here
+    profileOutput?: string;
+    // Kills the child when cancelled. Scripts tied to a token run without the 30 s timeout,
+    // since whoever owns the token can stop them
+    token?: vscode.CancellationToken;
+    // Receives progress messages the script writes to stderr as {"progress": ...} lines
+    onProgress?: (message: string) => void;
+    // Receives the first partial result a script may write to stderr as a {"partial": ...} line
+    onPartial?: (result: any) => void;
+    // Extra environment variables for the script
+    env?: { [name: string]: string };
+}
+
+export interface ConversionRequest extends RunScriptOptions {
+    // Size of the input file, used to estimate the conversion's memory
+    fileSize: number;
+    // Higher runs first (the active editor, then visible ones)
+    priority?: () => number;
+    // Bytes the converter may allocate before it falls back to a preview (see python/memory_budget.py)
+    memoryBudget?: number;
+    // Preview a seeded random sample instead of the first rows/elements (see python/sampling.py)
+    sampleSeed?: number;
+    // Bytes of JSON the converter may print before it cuts values short (see python/output_budget.py)
+    outputBudget?: number;
+    // Directory the converter writes its JSON result to; stdout then only carries a small
+    // descriptor pointing at the file (see python/perf.py)
+    resultDir?: string;
+}
+
+// Peak memory of a conversion is estimated as a multiple of the file size on top of
+// the interpreter and imported libraries
+const CONVERSION_BASE_BYTES = 150 * 1024 * 1024;
+const CONVERSION_SIZE_FACTOR = 4;
+const MEMORY_BUDGET_ENV = 'DATA_FILE_VIEWER_MEMORY_BUDGET';
+const SAMPLE_SEED_ENV = 'DATA_FILE_VIEWER_SAMPLE_SEED';
+const OUTPUT_BUDGET_ENV = 'DATA_FILE_VIEWER_OUTPUT_BUDGET';
+const RESULT_FILE_ENV = 'DATA_FILE_VIEWER_RESULT_FILE';
+// Result files a crashed window left behind are removed once they are this old
+const RESULT_MAX_AGE_MS = 24 * 60 * 60 * 1000;
+
+const MAX_OUTPUT_BYTES = 50 * 1024 * 1024; // 50MB buffer for large outputs
+const SCRIPT_TIMEOUT_MS = 30000; // 30 second timeout
+
+// The modules the extension offers to install, and the pip package providing each. A
+// pickle can name any module, so nothing outside this map is installed on its say-so
+const INSTALL_PACKAGES: { [moduleName: string]: string } = {
+    'h5py': 'h5py',
+    'numpy': 'numpy',
+    'pandas': 'pandas',
+    'pyarrow': 'pyarrow',
+    'msgpack': 'msgpack',
+    'joblib': 'joblib',
+    'tables': 'tables',
+    'avro': 'avro-python3',
+    'snappy': 'python-snappy',
+    'netCDF4': 'netCDF4',
+    'scipy': 'scipy',
+    // Decompressors for .zst/.lz4 inputs, offered when such a file is opened
+    'zstandard': 'zstandard',
+    'lz4': 'lz4',
+    'rapidgzip': 'rapidgzip'
+};
+
+const MODULE_NAME = /^[A-Za-z_][A-Za-z0-9_]*$/;
+
+// Raised when a script fails because a Python module is not installed
+export class MissingModuleError extends Error {
+    constructor(message: string, public readonly moduleName: string) {
+        super(message);
+    }
+}
 
 export class PythonRunner {
     private static pythonPath: string | null = null;
     private static venvPath: string | null = null;
     private static extensionContext: vscode.ExtensionContext | null = null;
-    private static packagesInstalled: boolean | null = null;
     private static checkingPackages: Promise<boolean> | null = null;
+    private static resultsCleaned = false;
+    private static scheduler = new ConversionScheduler(() => PythonRunner.getSchedulerLimits());
 
     static initialize(context: vscode.ExtensionContext) {
         this.extensionContext = context;
-        // Load cached package installation status from persistent storage
-        this.packagesInstalled = context.globalState.get('packagesInstalled', null);
-        console.log('PythonRunner initialized. Packages installed:', this.packagesInstalled);
         console.log('Global storage path:', context.globalStorageUri.fsPath);
     }
 
@@ -29,6 +110,78 @@ export class PythonRunner {
         return path.join(this.extensionContext.globalStorageUri.fsPath, 'python-venv');
     }
 
+    static getScriptPath(scriptName: string): string {
+        if (!this.extensionContext) {
+            throw new Error('PythonRunner not initialized');
+        }
+        return path.join(this.extensionContext.extensionPath, 'python', scriptName);
+    }
+
+    static getStoragePath(name: string): string {
+        if (!this.extensionContext) {
+            throw new Error('PythonRunner not initialized');
+        }
+        // Caches live next to the venv in global storage
+        const storagePath = path.join(this.extensionContext.globalStorageUri.fsPath, name);
+        if (!fs.existsSync(storagePath)) {
+            fs.mkdirSync(storagePath, { recursive: true });
+        }
+        return storagePath;
+    }
+
+    // Converter results that webviews fetch directly (see BaseEditorProvider)
+    static getResultsPath(): string {
+        const resultsPath = this.getStoragePath('results');
+        if (!this.resultsCleaned) {
+            this.resultsCleaned = true;
+            const cutoff = Date.now() - RESULT_MAX_AGE_MS;
+            for (const name of fs.readdirSync(resultsPath)) {
+                const file = path.join(resultsPath, name);
+                try {
+                    if (fs.statSync(file).mtimeMs < cutoff) {
+                        fs.rmSync(file, { force: true });
+                    }
+                } catch {
+                    // Removed by another window in the meantime
+                }
+            }
+        }
+        return resultsPath;
+    }
+
+    private static getManifestPath(): string {
+        // Inside the venv so that recreating the venv discards it
+        return path.join(this.getVenvPath(), 'data-file-viewer-manifest.json');
+    }
+
+    // True if the last check found every module and no site-packages directory changed since
+    private static isManifestFresh(modules: string[]): boolean {
+        try {
+            const manifest = JSON.parse(fs.readFileSync(this.getManifestPath(), 'utf8'));
+            if (!fs.existsSync(manifest.stamp.executable)) {
+                return false;
+            }
+            for (const [directory, mtime] of Object.entries(manifest.stamp.site_packages)) {
+                if (fs.statSync(directory, { bigint: true }).mtimeNs.toString() !== mtime) {
+                    return false;
+                }
+            }
+            return modules.every(name => manifest.modules[name] === true);
+        } catch (error) {
+            return false;
+        }
+    }
+
+    // Locate (without importing) each module and refresh the manifest; returns the missing ones
+    static async findMissingModules(python: string, modules: string[]): Promise<string[]> {
+        const { stdout } = await execFileAsync(
+            python,
+            [this.getScriptPath('check_env.py'), ...modules, '--manifest', this.getManifestPath()],
+            { timeout: 10000 }
+        );
+        return JSON.parse(stdout).missing;
+    }
+
     private static getVenvPythonPath(): string {
         const venvPath = this.getVenvPath();
         // Windows: venv\Scripts\python.exe, Unix: venv/bin/python
@@ -37,6 +190,11 @@ export class PythonRunner {
             : path.join(venvPath, 'bin', 'python');
     }
 
+    // Whether the venv exists, for background work that should not create it (and prompt) on its own
+    static hasEnvironment(): boolean {
+        return this.extensionContext !== null && fs.existsSync(this.getVenvPythonPath());
+    }
+
     static async findSystemPython(): Promise<string> {
         // Find system Python (not the venv)
         const pythonCommands = ['python', 'python3', 'py'];
@@ -120,203 +278,171 @@ export class PythonRunner {
         return await this.ensureVenv();
     }
 
-    static async checkAndInstallPackages(): Promise<boolean> {
-        // If a check is already in progress, wait for it
-        if (this.checkingPackages) {
-            console.log('Package check already in progress, waiting...');
-            return await this.checkingPackages;
+    static async checkAndInstallPackages(modules: string[]): Promise<boolean> {
+        if (!modules.every(moduleName => this.isInstallable(moduleName))) {
+            console.log('Not offering to install unknown modules:', modules);
+            return false;
         }
-        
-        // Create the check promise
-        this.checkingPackages = this._doCheckAndInstallPackages();
+        // Checks run one after another, so two formats opened together never run pip in the venv at once
+        const previous = this.checkingPackages;
+        const check = (async () => {
+            if (previous) {
+                console.log('Package check already in progress, waiting...');
+                await previous.catch(() => false);
+            }
+            return this._doCheckAndInstallPackages(modules);
+        })();
+        this.checkingPackages = check;
         
         try {
-            const result = await this.checkingPackages;
-            return result;
+            return await check;
         } finally {
             // Clear the promise when done
-            this.checkingPackages = null;
+            if (this.checkingPackages === check) {
+                this.checkingPackages = null;
+            }
         }
     }
     
-    private static async _doCheckAndInstallPackages(): Promise<boolean> {
+    private static async _doCheckAndInstallPackages(modules: string[]): Promise<boolean> {
         try {
-            console.log('checkAndInstallPackages called. Cached status:', this.packagesInstalled);
-            
-            // First, ensure we can find system Python (needed for venv creation)
-            let systemPython: string;
+            // Fastest path: the last check found these modules and nothing was installed or
+            // removed since, so there is no need to start Python at all
+            const venvPython = this.getVenvPythonPath();
+            if (fs.existsSync(venvPython) && this.isManifestFresh(modules)) {
+                this.pythonPath = venvPython;
+                return true;
+            }
+
+            // Reuse the venv if it is valid, otherwise create it with the system Python
+            let python: string;
             try {
-                systemPython = await this.findSystemPython();
-                console.log('System Python found:', systemPython);
+                python = await this.ensureVenv();
             } catch (error) {
-                console.error('System Python not found:', error);
+                console.error('Could not set up the virtual environment:', error);
                 vscode.window.showErrorMessage(
-                    'Python 3 not found. Please install Python 3.7 or higher and restart VS Code.'
+                    error instanceof Error ? error.message : String(error)
                 );
-                this.packagesInstalled = false;
-                await this.extensionContext?.globalState.update('packagesInstalled', false);
                 return false;
             }
 
-            // Check if venv exists and is valid
-            const venvPath = this.getVenvPath();
-            const venvPython = this.getVenvPythonPath();
-            console.log('Checking venv at:', venvPython);
-            
-            const venvExists = fs.existsSync(venvPython);
-            
-            // If we have a cached "installed" status AND venv exists, trust it
-            // Only verify if venv doesn't exist or cache says not installed
-            if (this.packagesInstalled === true && venvExists) {
-                try {
-                    // Quick validation: just check if Python executable exists and is valid
-                    await execAsync(`"${venvPython}" --version`);
-                    this.pythonPath = venvPython;
-                    console.log('Using cached package installation status - venv exists and is valid');
-                    return true;
-                } catch (error) {
-                    console.log('Venv exists but is invalid, will recreate:', error);
-                    // Venv is corrupted, reset cache and continue with setup
-                    this.packagesInstalled = false;
-                    await this.extensionContext?.globalState.update('packagesInstalled', false);
-                }
-            }
-            
-            // If we get here, either:
-            // 1. Cache says not installed, OR
-            // 2. Venv doesn't exist, OR
-            // 3. Venv exists but is invalid
-            
-            let python: string | null = null;
-            let packagesOk = false;
-            
-            if (venvExists) {
-                console.log('Venv exists, verifying packages...');
-                try {
-                    await execAsync(`"${venvPython}" --version`);
-                    python = venvPython;
-                    console.log('Venv is valid');
-                    
-                    // Check if packages are installed
-                    const checkScript = 'import sys; import numpy, pandas, h5py, pyarrow, msgpack, joblib, avro, snappy, netCDF4, scipy; print(\'OK\')';
-                    try {
-                        const { stdout } = await execAsync(`"${python}" -c "${checkScript}"`, {
-                            timeout: 10000
-                        });
-                        
-                        if (stdout.includes('OK')) {
-                            packagesOk = true;
-                            console.log('All packages are installed');
-                        } else {
-                            console.log('Package check returned unexpected output:', stdout);
-                        }
-                    } catch (checkError) {
-                        console.log('Package check failed:', checkError);
-                    }
-                } catch (error) {
-                    console.log('Venv exists but is invalid, will recreate:', error);
-                }
-            } else {
-                console.log('Venv does not exist yet');
-            }
-            
-            // If packages are OK, cache and return
-            if (packagesOk && python) {
-                this.packagesInstalled = true;
-                this.pythonPath = python;
-                await this.extensionContext?.globalState.update('packagesInstalled', true);
-                console.log('Packages verified and cached');
+            const missing = await this.findMissingModules(python, modules);
+            if (missing.length === 0) {
                 return true;
             }
             
-            // Packages missing or venv doesn't exist, offer to install
-            console.log('Showing installation popup...');
+            // Only the packages this format needs are offered, e.g. just numpy for .npy files
+            const packages = missing.map(moduleName => this.getInstallPackageName(moduleName));
+            console.log('Missing modules:', missing);
             const install = await vscode.window.showWarningMessage(
-                'Data File Viewer needs to install Python packages in its own environment. This is a one-time setup.',
+                `Data File Viewer needs to install ${packages.join(', ')} in its own Python environment to open this file.`,
                 'Install',
                 'Cancel'
             );
             
-            console.log('User response:', install);
-            
-            if (install === 'Install') {
-                const success = await vscode.window.withProgress({
-                    location: vscode.ProgressLocation.Notification,
-                    title: 'Setting up Python environment (this may take a few minutes)...',
-                    cancellable: false
-                }, async (progress) => {
-                    try {
-                        // Ensure venv exists (create if needed)
-                        if (!python || !fs.existsSync(python)) {
-                            python = await this.ensureVenv((msg) => progress.report({ increment: 10, message: msg }));
-                        }
-                        
-                        progress.report({ increment: 20, message: 'Upgrading pip...' });
-                        // Upgrade pip first
-                        await execAsync(`"${python}" -m pip install --upgrade pip`, {
-                            timeout: 60000
-                        });
-                        
-                        progress.report({ increment: 30, message: 'Installing packages...' });
-                        // Install packages
-                        await execAsync(`"${python}" -m pip install numpy pandas h5py pyarrow msgpack joblib avro-python3 python-snappy netCDF4 scipy`, {
-                            timeout: 300000 // 5 minutes for installation
-                        });
-                        
-                        // Verify installation succeeded (non-blocking - pip success is sufficient)
-                        try {
-                            const verifyScript = 'import sys; import numpy, pandas, h5py, pyarrow, msgpack, joblib, avro, snappy, netCDF4, scipy; print(\'OK\')';
-                            const { stdout } = await execAsync(`"${python}" -c "${verifyScript}"`, {
-                                timeout: 10000
-                            });
-                            
-                            if (stdout.includes('OK')) {
-                                console.log('Package verification passed');
-                            } else {
-                                console.log('Package verification returned unexpected output, but pip install succeeded');
-                            }
-                        } catch (verifyError) {
-                            // Verification failed, but pip install succeeded, so packages are likely installed
-                            // This can happen due to quote escaping issues on Windows, but packages work fine
-                            console.log('Package verification failed, but pip install succeeded:', verifyError);
-                        }
-                        
-                        vscode.window.showInformationMessage('Python packages installed successfully! You can now view data files.');
-                        this.packagesInstalled = true;
-                        // Persist to storage for cross-session
-                        await this.extensionContext?.globalState.update('packagesInstalled', true);
-                        this.pythonPath = python; // Cache the path
-                        console.log('Packages installed and cached successfully');
-                        return true;
-                    } catch (error) {
-                        vscode.window.showErrorMessage(`Failed to install packages: ${error}`);
-                        this.packagesInstalled = false;
-                        await this.extensionContext?.globalState.update('packagesInstalled', false);
-                        return false;
-                    }
-                });
-                return success;
+            if (install !== 'Install') {
+                return false; // User clicked Cancel
             }
             
-            return false; // User clicked Cancel
+            return await vscode.window.withProgress({
+                location: vscode.ProgressLocation.Notification,
+                title: `Installing ${packages.join(', ')}...`,
+                cancellable: false
+            }, async (progress) => {
+                try {
+                    await this.installPackages(python, packages, (message) => progress.report({ message }));
+                    
+                    // Verification is non-blocking: pip succeeding is sufficient
+                    const stillMissing = await this.findMissingModules(python, modules).catch(() => []);
+                    if (stillMissing.length > 0) {
+                        console.log('Package verification found missing modules, but pip install succeeded:', stillMissing);
+                    }
+                    
+                    vscode.window.showInformationMessage(`Installed ${packages.join(', ')}. You can now view this file.`);
+                    return true;
+                } catch (error) {
+                    vscode.window.showErrorMessage(`Failed to install packages: ${error}`);
+                    return false;
+                }
+            });
         } catch (error) {
             vscode.window.showErrorMessage(`Error setting up Python environment: ${error}`);
-            this.packagesInstalled = false;
-            await this.extensionContext?.globalState.update('packagesInstalled', false);
             return false;
         }
     }
 
-    static async runScript(scriptPath: string, args: string[] = []): Promise<string> {
+    // Wheel directories pip may install from: the user's configured wheelhouse (e.g. a shared
+    // offline cache) and the one this extension fills with every wheel it downloads
+    private static getWheelhouses(): string[] {
+        const configured = vscode.workspace.getConfiguration('dataFileViewer').get<string>('wheelhouse', '');
+        const wheelhouses = [this.getStoragePath('wheelhouse')];
+        if (configured && fs.existsSync(configured)) {
+            wheelhouses.unshift(configured);
+        }
+        return wheelhouses;
+    }
+
+    private static async installPackages(python: string, packages: string[], report: (message: string) => void): Promise<void> {
+        const wheelhouses = this.getWheelhouses();
+        // Argument arrays (execFile, no shell), so nothing in a package name is interpreted
+        const findLinks = wheelhouses.flatMap(dir => ['--find-links', dir]);
+        const install = ['-m', 'pip', 'install', '--disable-pip-version-check', '--no-index', ...findLinks, '--', ...packages];
+
+        // Offline first: when the wheelhouse already has every wheel this takes seconds
+        try {
+            report('Installing from the local wheel cache...');
+            await execFileAsync(python, install, { timeout: 120000 });
+            return;
+        } catch (error) {
+            console.log('Wheel cache incomplete, downloading:', error);
+        }
+
+        report('Upgrading pip...');
+        await execFileAsync(python, ['-m', 'pip', 'install', '--upgrade', 'pip'], { timeout: 60000 }).catch(
+            (error) => console.log('pip upgrade failed, continuing:', error)
+        );
+
+        // Build wheels for each package in parallel. Each pip process gets its own directory so
+        // shared dependencies (numpy for pandas and h5py, say) never collide mid-write
+        report(`Downloading ${packages.join(', ')}...`);
+        const staging = fs.mkdtempSync(path.join(this.getStoragePath('wheel-staging'), 'run-'));
+        try {
+            await Promise.all(packages.map((pkg, i) => execFileAsync(
+                python,
+                ['-m', 'pip', 'wheel', '--disable-pip-version-check', ...findLinks, '-w', path.join(staging, String(i)), '--', pkg],
+                { timeout: 300000 } // 5 minutes per package
+            )));
+
+            // Keep every wheel so later installs (and new venvs) can be set up offline
+            const wheelhouse = this.getStoragePath('wheelhouse');
+            for (const dir of fs.readdirSync(staging)) {
+                for (const file of fs.readdirSync(path.join(staging, dir))) {
+                    const target = path.join(wheelhouse, file);
+                    if (!fs.existsSync(target)) {
+                        fs.copyFileSync(path.join(staging, dir, file), target);
+                    }
+                }
+            }
+        } finally {
+            fs.rmSync(staging, { recursive: true, force: true });
+        }
+
+        report('Installing packages...');
+        await execFileAsync(python, install, { timeout: 120000 });
+    }
+
+    static async runScript(scriptPath: string, args: string[] = [], options: RunScriptOptions = {}): Promise<string> {
         const python = await this.findPython();
-        // Always quote paths for safety
-        const command = `"${python}" "${scriptPath}" ${args.map(arg => `"${arg}"`).join(' ')}`;
+        const profile = options.profileOutput ? ['-m', 'cProfile', '-o', options.profileOutput] : [];
         
         try {
-            const { stdout, stderr } = await execAsync(command, {
-                maxBuffer: 50 * 1024 * 1024, // 50MB buffer for large outputs
-                timeout: 30000 // 30 second timeout
-            });
+            if (options.timings) {
+                options.timings.spawnedAt = Date.now();
+            }
+            const { stdout, stderr } = await this.spawnScript(python, [...profile, scriptPath, ...args], options);
+            if (options.timings) {
+                options.timings.exitedAt = Date.now();
+            }
             
             if (stderr && !stderr.includes('Warning')) {
                 console.error('Python stderr:', stderr);
@@ -324,16 +450,23 @@ export class PythonRunner {
             
             return stdout;
         } catch (error: any) {
-            const errorMessage = error.stderr || error.message || String(error);
+            if (error instanceof vscode.CancellationError) {
+                throw error;
+            }
+            // Converters report handled failures as JSON on stdout, e.g. a pickle that
+            // needs a module which is not installed
+            const errorMessage = error.stderr || this.getReportedError(error.stdout) || error.message || String(error);
             
             // Check for missing package errors
             if (errorMessage.includes('ModuleNotFoundError') || errorMessage.includes('No module named')) {
                 const match = errorMessage.match(/No module named ['"](.+?)['"]/);
-                const moduleName = match ? match[1] : 'required package';
-                throw new Error(
+                const topLevel = match ? match[1].split('.')[0] : '';
+                const moduleName = MODULE_NAME.test(topLevel) ? topLevel : 'required package';
+                throw new MissingModuleError(
                     `Missing Python package: ${moduleName}\n\n` +
                     `Install with: pip install ${this.getInstallPackageName(moduleName)}\n\n` +
-                    `Full error: ${errorMessage}`
+                    `Full error: ${errorMessage}`,
+                    moduleName
                 );
             }
             
@@ -341,18 +474,209 @@ export class PythonRunner {
         }
     }
 
-    private static getInstallPackageName(moduleName: string): string {
-        const packageMap: { [key: string]: string } = {
-            'h5py': 'h5py',
-            'numpy': 'numpy',
-            'pandas': 'pandas',
-            'pyarrow': 'pyarrow',
-            'msgpack': 'msgpack',
-            'joblib': 'joblib',
-            'tables': 'tables'
+    private static getSchedulerLimits() {
+        const configured = vscode.workspace.getConfiguration('dataFileViewer').get<number>('maxConcurrentConversions', 0);
+        return {
+            // 0 means automatic: half the cores, between 1 and 4
+            concurrency: configured > 0 ? configured : Math.max(1, Math.min(4, Math.floor(os.cpus().length / 2))),
+            // Conversions running together may use up to half the machine's memory
+            memoryBytes: os.totalmem() / 2
         };
-        
-        return packageMap[moduleName] || moduleName;
+    }
+
+    // Run a converter through the scheduler: bounded concurrency, active editor first, memory-aware
+    // admission, and identical requests in flight share one Python process
+    static runConversion(scriptPath: string, args: string[], request: ConversionRequest): Promise<string> {
+        const { fileSize, memoryBudget, sampleSeed, outputBudget, resultDir, priority, token, onProgress, onPartial, timings, ...options } = request;
+        let dataBytes = fileSize * CONVERSION_SIZE_FACTOR;
+        if (memoryBudget !== undefined) {
+            options.env = { ...options.env, [MEMORY_BUDGET_ENV]: String(memoryBudget) };
+            // Converters preview instead of loading anything larger than their budget
+            dataBytes = Math.min(dataBytes, memoryBudget);
+        }
+        if (sampleSeed !== undefined) {
+            options.env = { ...options.env, [SAMPLE_SEED_ENV]: String(sampleSeed) };
+        }
+        if (outputBudget !== undefined) {
+            options.env = { ...options.env, [OUTPUT_BUDGET_ENV]: String(outputBudget) };
+        }
+        return this.scheduler.schedule({
+            key: JSON.stringify([scriptPath, args, options]),
+            estimatedBytes: CONVERSION_BASE_BYTES + dataBytes,
+            priority,
+            token,
+            onProgress,
+            onPartial,
+            run: async (jobToken, report, reportPartial) => {
+                const jobTimings: ScriptTimings = {};
+                // One result file per process, so editors sharing a conversion share its file
+                const resultFile = resultDir
+                    ? path.join(resultDir, `${Date.now()}-${Math.random().toString(36).slice(2)}.json`)
+                    : undefined;
+                const env = resultFile ? { ...options.env, [RESULT_FILE_ENV]: resultFile } : options.env;
+                try {
+                    const stdout = await this.runScript(scriptPath, args, {
+                        ...options, env, timings: jobTimings, token: jobToken, onProgress: report, onPartial: reportPartial
+                    });
+                    return { stdout, timings: jobTimings };
+                } catch (error) {
+                    if (resultFile) {
+                        fs.rm(resultFile, { force: true }, () => {});
+                    }
+                    throw error;
+                }
+            }
+        }).then(({ stdout, timings: jobTimings }) => {
+            if (timings) {
+                Object.assign(timings, jobTimings);
+            }
+            return stdout;
+        });
+    }
+
+    // spawn (not exec) so the child can be killed on cancellation and its progress read as it runs
+    private static spawnScript(python: string, args: string[], options: RunScriptOptions): Promise<{ stdout: string; stderr: string }> {
+        return new Promise((resolve, reject) => {
+            const child = spawn(python, args, options.env ? { env: { ...process.env, ...options.env } } : {});
+            const stdoutChunks: Buffer[] = [];
+            let stdoutBytes = 0;
+            let stderr = '';
+            let pendingStderr = '';
+            let failure: Error | null = null;
+
+            const stop = (error: Error) => {
+                failure = failure || error;
+                child.kill();
+            };
+            const cancellation = options.token?.onCancellationRequested(() => stop(new vscode.CancellationError()));
+            const timer = options.token ? undefined : setTimeout(
+                () => stop(new Error(`Timed out after ${SCRIPT_TIMEOUT_MS / 1000} seconds`)),
+                SCRIPT_TIMEOUT_MS
+            );
+
+            child.stdout.on('data', (chunk: Buffer) => {
+                stdoutBytes += chunk.length;
+                if (stdoutBytes > MAX_OUTPUT_BYTES) {
+                    stop(new Error('stdout maxBuffer length exceeded'));
+                    return;
+                }
+                stdoutChunks.push(chunk);
+            });
+            child.stderr.setEncoding('utf8');
+            child.stderr.on('data', (chunk: string) => {
+                pendingStderr += chunk;
+                const lines = pendingStderr.split('\n');
+                pendingStderr = lines.pop() ?? '';
+                for (const line of lines) {
+                    const progress = this.parseReport(line, 'progress');
+                    const partial = progress === undefined ? this.parseReport(line, 'partial') : undefined;
+                    if (progress !== undefined) {
+                        options.onProgress?.(progress);
+                    } else if (partial !== undefined) {
+                        options.onPartial?.(partial);
+                    } else {
+                        stderr += line + '\n';
+                    }
+                }
+            });
+            child.on('error', (error) => {
+                failure = failure || error;
+            });
+            child.on('close', (code, signal) => {
+                cancellation?.dispose();
+                if (timer) {
+                    clearTimeout(timer);
+                }
+                stderr += pendingStderr;
+                const stdout = Buffer.concat(stdoutChunks).toString('utf8');
+                if (failure instanceof vscode.CancellationError) {
+                    reject(failure);
+                } else if (!failure && signal === 'SIGKILL') {
+                    // Usually the kernel's out-of-memory killer rather than anything we did
+                    reject(Object.assign(new Error(
+                        'Python was killed by the system, most likely because it ran out of memory. ' +
+                        'Lower dataFileViewer.memoryBudgetMB so large data is previewed instead of loaded.'
+                    ), { stdout, stderr }));
+                } else if (failure || code !== 0) {
+                    reject(Object.assign(failure || new Error(`Python exited with code ${code}`), { stdout, stderr }));
+                } else {
+                    resolve({ stdout, stderr });
+                }
+            });
+        });
+    }
+
+    // The value of a {"progress": ...} or {"partial": ...} line, or undefined for other output
+    private static parseReport(line: string, key: 'progress' | 'partial'): any {
+        if (!line.startsWith(`{"${key}"`)) {
+            return undefined;
+        }
+        try {
+            return JSON.parse(line)[key];
+        } catch (error) {
+            return undefined;
+        }
+    }
+
+    private static getReportedError(stdout?: string): string | undefined {
+        try {
+            return stdout ? JSON.parse(stdout).error : undefined;
+        } catch (error) {
+            return undefined;
+        }
+    }
+
+    static async streamScript(
+        scriptPath: string,
+        args: string[],
+        onLine: (line: string) => void,
+        token?: vscode.CancellationToken
+    ): Promise<void> {
+        const python = await this.findPython();
+
+        return new Promise<void>((resolve, reject) => {
+            // spawn (not exec) so output can be consumed line by line while the script runs
+            const child = spawn(python, [scriptPath, ...args]);
+            const cancellation = token?.onCancellationRequested(() => child.kill());
+            let pending = '';
+            let stderr = '';
+
+            child.stdout.setEncoding('utf8');
+            child.stdout.on('data', (chunk: string) => {
+                pending += chunk;
+                const lines = pending.split('\n');
+                pending = lines.pop() ?? '';
+                lines.filter(line => line.trim()).forEach(onLine);
+            });
+            child.stderr.setEncoding('utf8');
+            child.stderr.on('data', (chunk: string) => {
+                stderr += chunk;
+            });
+            child.on('error', (error) => {
+                cancellation?.dispose();
+                reject(error);
+            });
+            child.on('close', (code) => {
+                cancellation?.dispose();
+                if (pending.trim()) {
+                    onLine(pending);
+                }
+                if (code === 0 || token?.isCancellationRequested) {
+                    resolve();
+                } else {
+                    reject(new Error(`Python script failed: ${stderr || `exit code ${code}`}`));
+                }
+            });
+        });
+    }
+
+    static getInstallPackageName(moduleName: string): string {
+        return this.isInstallable(moduleName) ? INSTALL_PACKAGES[moduleName] : moduleName;
+    }
+
+    // Only known modules with plain names are ever passed to pip
+    static isInstallable(moduleName: string): boolean {
+        return MODULE_NAME.test(moduleName) && Object.prototype.hasOwnProperty.call(INSTALL_PACKAGES, moduleName);
     }
 
     static async runInlineScript(script: string): Promise<string> {
@@ -0,0 +1,171 @@
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import { PythonRunner } from './PythonRunner';
+
+// Formats python/quick_look.py can describe from their headers
+const QUICK_LOOK_PATTERN = /\.(npy|npz|parquet|feather|arrow|avro|h5|hdf5|nc|nc4|netcdf)$|\.npy\.(gz|bz2|xz|zst|lz4)$/i;
+// Requests arriving within this window (a folder expanding in the Explorer) share one process
+const BATCH_DELAY_MS = 50;
+const MAX_BATCH = 64;
+const TOOLTIP_FIELDS = 12;
+const LOADING_FIELDS = 50;
+
+interface Pending {
+    path: string;
+    resolve: (info: any) => void;
+}
+
+/**
+ * Shape and schema of a data file read from its header by python/quick_look.py,
+ * without numpy or pyarrow and without reading any data. Shown as the Explorer
+ * tooltip and on the loading screen of the viewer while the conversion runs.
+ * Results are cached per file size and modification time.
+ */
+export class QuickLook implements vscode.FileDecorationProvider {
+    private static cache = new Map<string, { stamp: string; info: Promise<any> }>();
+    private static queue: Pending[] = [];
+    private static timer: ReturnType<typeof setTimeout> | undefined;
+
+    private readonly changed = new vscode.EventEmitter<vscode.Uri | vscode.Uri[]>();
+    readonly onDidChangeFileDecorations = this.changed.event;
+
+    static register(context: vscode.ExtensionContext): vscode.Disposable {
+        if (!vscode.workspace.getConfiguration('dataFileViewer').get<boolean>('explorerTooltips', true)) {
+            return new vscode.Disposable(() => {});
+        }
+        const provider = new QuickLook();
+        const watcher = vscode.workspace.createFileSystemWatcher('**/*.{npy,npz,parquet,feather,arrow,avro,h5,hdf5,nc,nc4,netcdf}');
+        watcher.onDidChange(uri => provider.changed.fire(uri));
+        watcher.onDidCreate(uri => provider.changed.fire(uri));
+        return vscode.Disposable.from(vscode.window.registerFileDecorationProvider(provider), watcher, provider.changed);
+    }
+
+    static supports(uri: vscode.Uri): boolean {
+        return uri.scheme === 'file' && QUICK_LOOK_PATTERN.test(uri.fsPath);
+    }
+
+    // Header summary of the file, or undefined if it has none (or Python is not set up yet)
+    static get(uri: vscode.Uri): Promise<any> {
+        if (!this.supports(uri) || !PythonRunner.hasEnvironment()) {
+            return Promise.resolve(undefined);
+        }
+        let stamp: string;
+        try {
+            const stat = fs.statSync(uri.fsPath);
+            stamp = `${stat.size}:${stat.mtimeMs}`;
+        } catch {
+            return Promise.resolve(undefined);
+        }
+        const cached = this.cache.get(uri.fsPath);
+        if (cached && cached.stamp === stamp) {
+            return cached.info;
+        }
+        const info = new Promise<any>(resolve => {
+            this.queue.push({ path: uri.fsPath, resolve });
+            if (this.queue.length >= MAX_BATCH) {
+                this.flush();
+            } else if (!this.timer) {
+                this.timer = setTimeout(() => this.flush(), BATCH_DELAY_MS);
+            }
+        });
+        this.cache.set(uri.fsPath, { stamp, info });
+        return info;
+    }
+
+    private static async flush(): Promise<void> {
+        if (this.timer) {
+            clearTimeout(this.timer);
+            this.timer = undefined;
+        }
+        const batch = this.queue.splice(0, MAX_BATCH);
+        if (batch.length === 0) {
+            return;
+        }
+        if (this.queue.length > 0) {
+            this.timer = setTimeout(() => this.flush(), 0);
+        }
+        let results: any = {};
+        try {
+            const paths = [...new Set(batch.map(pending => pending.path))];
+            const output = await PythonRunner.runScript(PythonRunner.getScriptPath('quick_look.py'), paths);
+            results = JSON.parse(output).results ?? {};
+        } catch (error) {
+            console.error('Quick look failed:', error);
+        }
+        batch.forEach(pending => {
+            const info = results[pending.path];
+            pending.resolve(info && !info.error ? info : undefined);
+        });
+    }
+
+    async provideFileDecoration(uri: vscode.Uri): Promise<vscode.FileDecoration | undefined> {
+        const info = await QuickLook.get(uri);
+        return info ? new vscode.FileDecoration(undefined, QuickLook.formatTooltip(info)) : undefined;
+    }
+
+    static formatTooltip(info: any): string {
+        const fields = info.fields.slice(0, TOOLTIP_FIELDS).map((field: any) => `${field.name}: ${field.type}`);
+        const more = info.fields.length + info.more - fields.length;
+        if (more > 0) {
+            fields.push(`… ${more} more`);
+        }
+        return [`${info.format}: ${info.summary}`, ...fields].join('\n');
+    }
+
+    static getStyles(): string {
+        return `
+        .quick-look {
+            display: none;
+            margin-top: 24px;
+            max-width: 90vw;
+            max-height: 50vh;
+            overflow: auto;
+            text-align: left;
+            font-size: 12px;
+        }
+        .quick-look-summary {
+            margin-bottom: 8px;
+            color: var(--vscode-descriptionForeground);
+        }
+        .quick-look table {
+            border-collapse: collapse;
+            font-family: var(--vscode-editor-font-family);
+        }
+        .quick-look td {
+            padding: 1px 12px 1px 0;
+            white-space: nowrap;
+        }
+        .quick-look td:last-child {
+            color: var(--vscode-descriptionForeground);
+        }`;
+    }
+
+    static getMarkup(): string {
+        return `
+        <div class="quick-look" id="quick-look"></div>`;
+    }
+
+    static getScript(): string {
+        return `
+        window.addEventListener('message', event => {
+            if (event.data.command !== 'quickLook') return;
+            const info = event.data.info;
+            const panel = document.getElementById('quick-look');
+            const summary = document.createElement('div');
+            summary.className = 'quick-look-summary';
+            summary.textContent = info.format + ': ' + info.summary;
+            const table = document.createElement('table');
+            info.fields.slice(0, ${LOADING_FIELDS}).forEach(field => {
+                const row = table.insertRow();
+                row.insertCell().textContent = field.name;
+                row.insertCell().textContent = field.type;
+            });
+            const more = info.fields.length + info.more - Math.min(info.fields.length, ${LOADING_FIELDS});
+            if (more > 0) {
+                table.insertRow().insertCell().textContent = '… ' + more.toLocaleString() + ' more';
+            }
+            panel.replaceChildren(summary, table);
+            panel.style.display = 'block';
+        });`;
+    }
+}
@@ -0,0 +1,198 @@
+import * as vscode from 'vscode';
+import { PythonRunner } from './PythonRunner';
+
+const PAGE_SIZE = 100;
+
+/**
+ * Key lookups through python/key_index.py: "Build Index" makes one pass over a
+ * column and stores a sorted key index in the extension's storage (keyed by
+ * file identity, so it is rebuilt after the file changes); lookups by value or
+ * range then read only the row groups, batches or Avro blocks holding matches.
+ */
+export class TableIndexView {
+    // One in-flight build or lookup per webview; a new request cancels the previous one
+    private static requests = new Map<vscode.Webview, vscode.CancellationTokenSource>();
+
+    static async handleMessage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        if (message.command === 'indexBuild') {
+            await this.run(['--build'], message, uri, webview);
+        } else if (message.command === 'indexLookup') {
+            const args = message.mode === 'range'
+                ? [message.from !== '' ? `--min=${message.from}` : '', message.to !== '' ? `--max=${message.to}` : ''].filter(arg => arg)
+                : [`--equals=${message.from}`];
+            await this.run([...args, `--limit=${PAGE_SIZE}`], message, uri, webview);
+        }
+    }
+
+    static cancel(webview: vscode.Webview): void {
+        const request = this.requests.get(webview);
+        if (request) {
+            request.cancel();
+            request.dispose();
+            this.requests.delete(webview);
+        }
+    }
+
+    private static async run(extraArgs: string[], message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        this.cancel(webview);
+        const request = new vscode.CancellationTokenSource();
+        this.requests.set(webview, request);
+
+        const args = [
+            uri.fsPath,
+            `--column=${message.column}`,
+            `--cache-dir=${PythonRunner.getStoragePath('index-cache')}`,
+            ...extraArgs
+        ];
+
+        let reportedError = false;
+        try {
+            // Streamed: building the index of a large file takes as long as an external sort
+            await PythonRunner.streamScript(
+                PythonRunner.getScriptPath('key_index.py'),
+                args,
+                (line) => {
+                    const result = JSON.parse(line);
+                    if (result.error) {
+                        reportedError = true;
+                        webview.postMessage({ command: 'indexError', error: result.error });
+                    } else if (result.progress) {
+                        webview.postMessage({ command: 'indexProgress', progress: result.progress });
+                    } else if (result.built) {
+                        webview.postMessage({ command: 'indexBuilt', ...result });
+                    } else {
+                        webview.postMessage({ command: 'indexResult', ...result });
+                    }
+                },
+                request.token
+            );
+        } catch (error) {
+            if (!reportedError) {
+                webview.postMessage({
+                    command: 'indexError',
+                    error: error instanceof Error ? error.message : String(error)
+                });
+            }
+        } finally {
+            if (this.requests.get(webview) === request) {
+                this.requests.delete(webview);
+                request.dispose();
+            }
+        }
+    }
+
+    static getStyles(): string {
+        return `
+        .index-bar {
+            display: none;
+            gap: 8px;
+            align-items: center;
+            margin-bottom: 12px;
+            font-size: 12px;
+        }
+        .index-bar select, .index-bar input[type="text"] {
+            background-color: var(--vscode-input-background);
+            color: var(--vscode-input-foreground);
+            border: 1px solid var(--vscode-input-border, transparent);
+            font-family: var(--vscode-font-family);
+            padding: 4px;
+        }
+        .index-status {
+            color: var(--vscode-descriptionForeground);
+        }
+        .index-page {
+            margin-bottom: 12px;
+            border-left: 4px solid var(--vscode-textBlockQuote-border);
+            padding-left: 8px;
+        }
+        .index-row {
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+            white-space: pre;
+        }
+        .index-row-index {
+            color: var(--vscode-descriptionForeground);
+            display: inline-block;
+            min-width: 80px;
+        }`;
+    }
+
+    static getMarkup(): string {
+        return `
+        <div class="index-bar" id="index-bar">
+            <select id="index-column"></select>
+            <select id="index-mode" onchange="document.getElementById('index-to').style.display = this.value === 'range' ? '' : 'none'">
+                <option value="equals">Equals</option>
+                <option value="range">Between</option>
+            </select>
+            <input type="text" id="index-from" placeholder="Key" onkeydown="if (event.key === 'Enter') lookUpKey()">
+            <input type="text" id="index-to" placeholder="and (optional)" style="display: none;" onkeydown="if (event.key === 'Enter') lookUpKey()">
+            <button onclick="lookUpKey()">Look Up</button>
+            <button onclick="buildKeyIndex()">Build Index</button>
+            <span class="index-status" id="index-status"></span>
+        </div>
+        <div class="index-page" id="index-page" style="display: none;"></div>`;
+    }
+
+    static getScript(): string {
+        return `
+        function toggleKeyIndex() {
+            const bar = document.getElementById('index-bar');
+            const select = document.getElementById('index-column');
+            if (select.options.length === 0) {
+                TABLE_COLUMNS.forEach(column => {
+                    const option = document.createElement('option');
+                    option.value = column;
+                    option.textContent = column;
+                    select.appendChild(option);
+                });
+            }
+            bar.style.display = bar.style.display === 'flex' ? 'none' : 'flex';
+        }
+
+        function buildKeyIndex() {
+            const column = document.getElementById('index-column').value;
+            if (!column) return;
+            document.getElementById('index-status').textContent = 'Indexing ' + column + '...';
+            vscode.postMessage({ command: 'indexBuild', column: column });
+        }
+
+        function lookUpKey() {
+            const column = document.getElementById('index-column').value;
+            const mode = document.getElementById('index-mode').value;
+            const from = document.getElementById('index-from').value;
+            const to = document.getElementById('index-to').value;
+            if (!column || (mode === 'equals' ? from === '' : from === '' && to === '')) return;
+            document.getElementById('index-status').textContent = 'Looking up...';
+            vscode.postMessage({ command: 'indexLookup', column: column, mode: mode, from: from, to: to });
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            const status = document.getElementById('index-status');
+            if (message.command === 'indexProgress') {
+                status.textContent = message.progress;
+            } else if (message.command === 'indexError') {
+                status.textContent = message.error;
+            } else if (message.command === 'indexBuilt') {
+                status.textContent = 'Indexed ' + message.num_keys.toLocaleString() + ' keys of ' + message.column +
+                    (message.num_nulls ? ' (' + message.num_nulls.toLocaleString() + ' nulls not indexed)' : '');
+            } else if (message.command === 'indexResult') {
+                const page = document.getElementById('index-page');
+                page.innerHTML = '';
+                message.data.forEach((record, i) => {
+                    const div = document.createElement('div');
+                    div.className = 'index-row';
+                    const [unit, offset] = message.locations[i];
+                    div.title = 'Row group / block ' + unit + ', row ' + offset + ' within it';
+                    div.innerHTML = '<span class="index-row-index">row ' + message.row_ids[i] + '</span> ' + syntaxHighlight(JSON.stringify(record));
+                    page.appendChild(div);
+                });
+                page.style.display = message.data.length ? 'block' : 'none';
+                status.textContent = message.total_matches.toLocaleString() + ' matches' +
+                    (message.total_matches > message.data.length ? ', showing the first ' + message.data.length : '') +
+                    ' · read ' + message.units_read + ' of ' + message.num_units + ' row groups/blocks';
+            }
+        });`;
+    }
+}
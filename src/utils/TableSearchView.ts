@@ -0,0 +1,249 @@
+import * as vscode from 'vscode';
+import { PythonRunner } from './PythonRunner';
+
+const PAGE_SIZE = 100;
+
+export class TableSearchView {
+    // One in-flight search per webview; starting a new one cancels the previous
+    private static searches = new Map<vscode.Webview, vscode.CancellationTokenSource>();
+
+    static async handleMessage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        if (message.command === 'searchStart') {
+            await this.startSearch(message, uri, webview);
+        } else if (message.command === 'searchCancel') {
+            this.cancel(webview);
+        } else if (message.command === 'searchPage') {
+            await this.readPage(message, uri, webview);
+        }
+    }
+
+    static cancel(webview: vscode.Webview): void {
+        const search = this.searches.get(webview);
+        if (search) {
+            search.cancel();
+            search.dispose();
+            this.searches.delete(webview);
+        }
+    }
+
+    private static async startSearch(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        this.cancel(webview);
+        const search = new vscode.CancellationTokenSource();
+        this.searches.set(webview, search);
+
+        const args = [uri.fsPath, `--query=${message.query}`, `--mode=${message.mode}`];
+        if (message.caseSensitive) {
+            args.push('--case-sensitive');
+        }
+
+        let reportedError = false;
+        try {
+            await PythonRunner.streamScript(
+                PythonRunner.getScriptPath('search_table.py'),
+                args,
+                (line) => {
+                    const result = JSON.parse(line);
+                    if (result.error) {
+                        reportedError = true;
+                        webview.postMessage({ command: 'searchError', searchId: message.searchId, error: result.error });
+                    } else if (result.done) {
+                        webview.postMessage({ command: 'searchDone', searchId: message.searchId, ...result });
+                    } else {
+                        webview.postMessage({ command: 'searchMatches', searchId: message.searchId, ...result });
+                    }
+                },
+                search.token
+            );
+            if (search.token.isCancellationRequested) {
+                webview.postMessage({ command: 'searchDone', searchId: message.searchId, cancelled: true });
+            }
+        } catch (error) {
+            if (!reportedError) {
+                webview.postMessage({
+                    command: 'searchError',
+                    searchId: message.searchId,
+                    error: error instanceof Error ? error.message : String(error)
+                });
+            }
+        } finally {
+            if (this.searches.get(webview) === search) {
+                this.searches.delete(webview);
+                search.dispose();
+            }
+        }
+    }
+
+    private static async readPage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        try {
+            const offset = Math.max(0, message.row - Math.floor(PAGE_SIZE / 2));
+            const output = await PythonRunner.runScript(PythonRunner.getScriptPath('read_page.py'), [
+                uri.fsPath,
+                `--offset=${offset}`,
+                `--limit=${PAGE_SIZE}`
+            ]);
+            webview.postMessage({ command: 'searchPage', row: message.row, ...JSON.parse(output) });
+        } catch (error) {
+            webview.postMessage({
+                command: 'searchError',
+                error: error instanceof Error ? error.message : String(error)
+            });
+        }
+    }
+
+    static getStyles(): string {
+        return `
+        .search-bar {
+            display: none;
+            gap: 8px;
+            align-items: center;
+            margin-bottom: 12px;
+            font-size: 12px;
+        }
+        .search-bar input[type="text"], .search-bar select {
+            background-color: var(--vscode-input-background);
+            color: var(--vscode-input-foreground);
+            border: 1px solid var(--vscode-input-border, transparent);
+            font-family: var(--vscode-font-family);
+            padding: 4px;
+        }
+        .search-bar input[type="text"] {
+            flex: 1;
+        }
+        .search-status {
+            color: var(--vscode-descriptionForeground);
+        }
+        .search-results {
+            display: flex;
+            flex-wrap: wrap;
+            gap: 4px;
+            margin-bottom: 12px;
+            max-height: 120px;
+            overflow: auto;
+        }
+        .search-results a {
+            cursor: pointer;
+            color: var(--vscode-textLink-foreground);
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+        }
+        .search-page {
+            margin-bottom: 12px;
+            border-left: 4px solid var(--vscode-textBlockQuote-border);
+            padding-left: 8px;
+        }
+        .search-row {
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+            white-space: pre;
+        }
+        .search-row.match {
+            background-color: var(--vscode-editor-findMatchHighlightBackground);
+        }
+        .search-row-index {
+            color: var(--vscode-descriptionForeground);
+            display: inline-block;
+            min-width: 80px;
+        }`;
+    }
+
+    static getMarkup(): string {
+        return `
+        <div class="search-bar" id="search-bar">
+            <input type="text" id="search-query" placeholder="Find in whole file" onkeydown="if (event.key === 'Enter') startFileSearch()">
+            <select id="search-mode">
+                <option value="substring">Contains</option>
+                <option value="regex">Regex</option>
+                <option value="equals">Equals</option>
+            </select>
+            <label><input type="checkbox" id="search-case"> Match case</label>
+            <button onclick="startFileSearch()">Search</button>
+            <button onclick="cancelFileSearch()">Cancel</button>
+            <span class="search-status" id="search-status"></span>
+        </div>
+        <div class="search-results" id="search-results"></div>
+        <div class="search-page" id="search-page" style="display: none;"></div>`;
+    }
+
+    static getScript(): string {
+        return `
+        const MAX_LISTED_MATCHES = 1000;
+        const fileSearch = { id: 0, running: false, matches: 0, listed: 0 };
+
+        function toggleFileSearch() {
+            const bar = document.getElementById('search-bar');
+            bar.style.display = bar.style.display === 'flex' ? 'none' : 'flex';
+            if (bar.style.display === 'flex') document.getElementById('search-query').focus();
+        }
+
+        function startFileSearch() {
+            const query = document.getElementById('search-query').value;
+            if (!query) return;
+            fileSearch.id++;
+            fileSearch.running = true;
+            fileSearch.matches = 0;
+            fileSearch.listed = 0;
+            document.getElementById('search-results').innerHTML = '';
+            document.getElementById('search-page').style.display = 'none';
+            document.getElementById('search-status').textContent = 'Searching...';
+            vscode.postMessage({
+                command: 'searchStart',
+                searchId: fileSearch.id,
+                query: query,
+                mode: document.getElementById('search-mode').value,
+                caseSensitive: document.getElementById('search-case').checked
+            });
+        }
+
+        function cancelFileSearch() {
+            if (fileSearch.running) vscode.postMessage({ command: 'searchCancel' });
+        }
+
+        function showSearchMatch(row) {
+            document.getElementById('search-status').textContent = 'Loading row ' + row + '...';
+            vscode.postMessage({ command: 'searchPage', row: row });
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            const status = document.getElementById('search-status');
+            if (message.command === 'searchMatches' && message.searchId === fileSearch.id) {
+                const results = document.getElementById('search-results');
+                fileSearch.matches += message.matches.length;
+                message.matches.forEach(row => {
+                    if (fileSearch.listed >= MAX_LISTED_MATCHES) return;
+                    const link = document.createElement('a');
+                    link.textContent = 'row ' + row;
+                    link.onclick = () => showSearchMatch(row);
+                    results.appendChild(link);
+                    fileSearch.listed++;
+                });
+                status.textContent = fileSearch.matches + ' matches, ' + message.rows_scanned.toLocaleString() + ' rows scanned...';
+            } else if (message.command === 'searchDone' && message.searchId === fileSearch.id) {
+                fileSearch.running = false;
+                if (message.cancelled) {
+                    status.textContent = 'Cancelled after ' + fileSearch.matches + ' matches';
+                } else {
+                    status.textContent = message.total_matches + ' matches in ' + message.rows_scanned.toLocaleString() + ' rows' +
+                        (message.row_groups_skipped ? ' (' + message.row_groups_skipped + ' row groups skipped by statistics)' : '') +
+                        (message.truncated ? ' (stopped at match limit)' : '');
+                }
+            } else if (message.command === 'searchError') {
+                fileSearch.running = false;
+                status.textContent = message.error;
+            } else if (message.command === 'searchPage') {
+                const page = document.getElementById('search-page');
+                page.innerHTML = '';
+                message.data.forEach((record, i) => {
+                    const rowIndex = message.offset + i;
+                    const div = document.createElement('div');
+                    div.className = 'search-row' + (rowIndex === message.row ? ' match' : '');
+                    div.innerHTML = '<span class="search-row-index">' + rowIndex + '</span>' + syntaxHighlight(JSON.stringify(record));
+                    page.appendChild(div);
+                    if (rowIndex === message.row) setTimeout(() => div.scrollIntoView({ block: 'center' }), 0);
+                });
+                page.style.display = 'block';
+                status.textContent = 'Rows ' + message.offset + '–' + (message.offset + message.data.length - 1) + ' of ' + message.num_rows.toLocaleString();
+            }
+        });`;
+    }
+}
@@ -0,0 +1,183 @@
+import * as vscode from 'vscode';
+import { PythonRunner } from './PythonRunner';
+
+const PAGE_SIZE = 100;
+
+export class TableSortView {
+    // One in-flight sort per webview; requesting another page cancels the previous one
+    private static sorts = new Map<vscode.Webview, vscode.CancellationTokenSource>();
+
+    static async handleMessage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        if (message.command === 'sortPage') {
+            await this.sortPage(message, uri, webview);
+        }
+    }
+
+    static cancel(webview: vscode.Webview): void {
+        const sort = this.sorts.get(webview);
+        if (sort) {
+            sort.cancel();
+            sort.dispose();
+            this.sorts.delete(webview);
+        }
+    }
+
+    private static async sortPage(message: any, uri: vscode.Uri, webview: vscode.Webview): Promise<void> {
+        this.cancel(webview);
+        const sort = new vscode.CancellationTokenSource();
+        this.sorts.set(webview, sort);
+
+        const args = [
+            uri.fsPath,
+            `--column=${message.column}`,
+            `--offset=${message.offset}`,
+            `--limit=${PAGE_SIZE}`,
+            `--cache-dir=${PythonRunner.getStoragePath('sort-cache')}`
+        ];
+        if (message.descending) {
+            args.push('--descending');
+        }
+
+        let reportedError = false;
+        try {
+            // Streamed rather than run with a timeout: the first external sort of a large file can take minutes
+            await PythonRunner.streamScript(
+                PythonRunner.getScriptPath('sort_table.py'),
+                args,
+                (line) => {
+                    const result = JSON.parse(line);
+                    if (result.error) {
+                        reportedError = true;
+                        webview.postMessage({ command: 'sortError', error: result.error });
+                    } else if (result.progress) {
+                        webview.postMessage({ command: 'sortProgress', progress: result.progress });
+                    } else {
+                        webview.postMessage({ command: 'sortPage', ...result });
+                    }
+                },
+                sort.token
+            );
+        } catch (error) {
+            if (!reportedError) {
+                webview.postMessage({
+                    command: 'sortError',
+                    error: error instanceof Error ? error.message : String(error)
+                });
+            }
+        } finally {
+            if (this.sorts.get(webview) === sort) {
+                this.sorts.delete(webview);
+                sort.dispose();
+            }
+        }
+    }
+
+    static getStyles(): string {
+        return `
+        .sort-bar {
+            display: none;
+            gap: 8px;
+            align-items: center;
+            margin-bottom: 12px;
+            font-size: 12px;
+        }
+        .sort-bar select {
+            background-color: var(--vscode-input-background);
+            color: var(--vscode-input-foreground);
+            border: 1px solid var(--vscode-input-border, transparent);
+            font-family: var(--vscode-font-family);
+            padding: 4px;
+        }
+        .sort-status {
+            color: var(--vscode-descriptionForeground);
+        }
+        .sort-page {
+            margin-bottom: 12px;
+            border-left: 4px solid var(--vscode-textBlockQuote-border);
+            padding-left: 8px;
+        }
+        .sort-row {
+            font-family: var(--vscode-editor-font-family);
+            font-size: 12px;
+            white-space: pre;
+        }
+        .sort-row-index {
+            color: var(--vscode-descriptionForeground);
+            display: inline-block;
+            min-width: 80px;
+        }`;
+    }
+
+    static getMarkup(): string {
+        return `
+        <div class="sort-bar" id="sort-bar">
+            <select id="sort-column"></select>
+            <select id="sort-order">
+                <option value="desc">Largest first</option>
+                <option value="asc">Smallest first</option>
+            </select>
+            <button onclick="requestSortPage(0)">Sort</button>
+            <button onclick="requestSortPage(sortState.offset - ${PAGE_SIZE})">Previous</button>
+            <button onclick="requestSortPage(sortState.offset + ${PAGE_SIZE})">Next</button>
+            <span class="sort-status" id="sort-status"></span>
+        </div>
+        <div class="sort-page" id="sort-page" style="display: none;"></div>`;
+    }
+
+    static getScript(): string {
+        return `
+        const sortState = { offset: 0, numRows: null };
+
+        function toggleSort() {
+            const bar = document.getElementById('sort-bar');
+            const select = document.getElementById('sort-column');
+            if (select.options.length === 0) {
+                TABLE_COLUMNS.forEach(column => {
+                    const option = document.createElement('option');
+                    option.value = column;
+                    option.textContent = column;
+                    select.appendChild(option);
+                });
+            }
+            bar.style.display = bar.style.display === 'flex' ? 'none' : 'flex';
+        }
+
+        function requestSortPage(offset) {
+            const column = document.getElementById('sort-column').value;
+            if (!column) return;
+            if (sortState.numRows !== null && offset >= sortState.numRows) return;
+            sortState.offset = Math.max(0, offset);
+            document.getElementById('sort-status').textContent = 'Sorting by ' + column + '...';
+            vscode.postMessage({
+                command: 'sortPage',
+                column: column,
+                descending: document.getElementById('sort-order').value === 'desc',
+                offset: sortState.offset
+            });
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            const status = document.getElementById('sort-status');
+            if (message.command === 'sortProgress') {
+                status.textContent = message.progress;
+            } else if (message.command === 'sortError') {
+                status.textContent = message.error;
+            } else if (message.command === 'sortPage') {
+                sortState.numRows = message.num_rows;
+                const page = document.getElementById('sort-page');
+                page.innerHTML = '';
+                message.data.forEach((record, i) => {
+                    const div = document.createElement('div');
+                    div.className = 'sort-row';
+                    div.innerHTML = '<span class="sort-row-index">#' + (message.offset + i + 1) + ' (row ' + message.row_ids[i] + ')</span> ' + syntaxHighlight(JSON.stringify(record));
+                    page.appendChild(div);
+                });
+                page.style.display = 'block';
+                status.textContent = 'Rows ' + (message.offset + 1) + '–' + (message.offset + message.data.length) +
+                    ' of ' + message.num_rows.toLocaleString() + ' sorted by ' + message.column +
+                    (message.method === 'top-k' ? ' (top-k)' : message.cached ? ' (cached sort)' : ' (external sort)');
+            }
+        });`;
+    }
+}
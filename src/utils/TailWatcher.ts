@@ -0,0 +1,236 @@
+import * as vscode from 'vscode';
+import * as fs from 'fs';
+import * as path from 'path';
+import { PythonRunner } from './PythonRunner';
+
+// A burst of writes is read once, DEBOUNCE_MS after the last write but no later
+// than MAX_WAIT_MS after the first, so a file written continuously still updates
+const DEBOUNCE_MS = 500;
+const MAX_WAIT_MS = 2000;
+
+/**
+ * Follows a file that is being appended to. python/tail_file.py records where
+ * the file ends; on every change only what was appended since then is read
+ * and pushed to the webview. If the file was rewritten instead, onReset
+ * converts it again.
+ */
+export class TailWatcher implements vscode.Disposable {
+    private state: any;
+    private ready: Promise<void>;
+    private readonly watcher: vscode.FileSystemWatcher;
+    private readonly source = new vscode.CancellationTokenSource();
+    private timer: ReturnType<typeof setTimeout> | undefined;
+    private pendingSince = 0;
+    private running = false;
+    private dirty = false;
+
+    constructor(
+        private readonly uri: vscode.Uri,
+        private readonly webview: vscode.Webview,
+        private readonly onReset: () => Promise<void>
+    ) {
+        // Runs alongside the conversion: anything appended from now on is shown as the tail
+        this.ready = this.init();
+        this.watcher = vscode.workspace.createFileSystemWatcher(
+            new vscode.RelativePattern(vscode.Uri.file(path.dirname(uri.fsPath)), path.basename(uri.fsPath))
+        );
+        this.watcher.onDidChange(() => this.schedule());
+        this.watcher.onDidCreate(() => this.schedule());
+    }
+
+    dispose(): void {
+        if (this.timer) {
+            clearTimeout(this.timer);
+        }
+        this.watcher.dispose();
+        this.source.cancel();
+        this.source.dispose();
+    }
+
+    private schedule(): void {
+        const now = Date.now();
+        if (this.timer) {
+            if (now - this.pendingSince >= MAX_WAIT_MS) {
+                return; // Already due
+            }
+            clearTimeout(this.timer);
+        } else {
+            this.pendingSince = now;
+        }
+        const delay = Math.min(DEBOUNCE_MS, this.pendingSince + MAX_WAIT_MS - now);
+        this.timer = setTimeout(() => {
+            this.timer = undefined;
+            this.refresh();
+        }, delay);
+    }
+
+    // One read at a time; changes that arrive meanwhile trigger one more read afterwards
+    private async refresh(): Promise<void> {
+        if (this.running) {
+            this.dirty = true;
+            return;
+        }
+        this.running = true;
+        try {
+            do {
+                this.dirty = false;
+                await this.readTail();
+            } while (this.dirty && !this.source.token.isCancellationRequested);
+        } finally {
+            this.running = false;
+        }
+    }
+
+    private async init(): Promise<void> {
+        try {
+            this.state = (await this.run()).state;
+        } catch (error) {
+            this.state = undefined;
+            this.reportError(error);
+        }
+    }
+
+    private async readTail(): Promise<void> {
+        await this.ready;
+        if (this.state === undefined) {
+            // The file could not be read when it was opened; start following it from here
+            this.ready = this.init();
+            return;
+        }
+        let result: any;
+        try {
+            result = await this.run(this.state);
+        } catch (error) {
+            this.reportError(error);
+            return;
+        }
+        if (result.reset) {
+            this.state = undefined;
+            this.ready = this.init();
+            await this.onReset();
+            return;
+        }
+        this.state = result.state;
+        if (result.appended.length > 0) {
+            this.webview.postMessage({
+                command: 'tailAppend',
+                time: new Date().toLocaleTimeString(),
+                appended: result.appended
+            });
+        }
+    }
+
+    private async run(state?: any): Promise<any> {
+        const args = [this.uri.fsPath];
+        // Passed in a file: the state of a file with many datasets or row groups outgrows a command-line argument
+        let stateFile: string | undefined;
+        if (state !== undefined) {
+            stateFile = path.join(
+                PythonRunner.getStoragePath('tail-state'),
+                `${Date.now()}-${Math.random().toString(36).slice(2)}.json`
+            );
+            await fs.promises.writeFile(stateFile, JSON.stringify(state));
+            args.push(`--state-file=${stateFile}`);
+        }
+        try {
+            const output = await PythonRunner.runScript(PythonRunner.getScriptPath('tail_file.py'), args, {
+                token: this.source.token
+            });
+            return JSON.parse(output);
+        } finally {
+            if (stateFile) {
+                fs.rm(stateFile, { force: true }, () => {});
+            }
+        }
+    }
+
+    private reportError(error: unknown): void {
+        if (!(error instanceof vscode.CancellationError)) {
+            this.webview.postMessage({ command: 'tailError', error: error instanceof Error ? error.message : String(error) });
+        }
+    }
+
+    static getStyles(): string {
+        return `
+        .tail-panel {
+            display: none;
+            margin-bottom: 16px;
+            border-left: 4px solid var(--vscode-textLink-foreground);
+            background-color: var(--vscode-textBlockQuote-background);
+        }
+        .tail-header {
+            display: flex;
+            gap: 10px;
+            align-items: center;
+            padding: 6px 10px;
+            font-size: 12px;
+        }
+        .tail-status {
+            color: var(--vscode-errorForeground);
+            margin-left: auto;
+        }
+        .tail-title {
+            padding: 4px 10px;
+            font-size: 12px;
+            color: var(--vscode-descriptionForeground);
+            border-top: 1px solid var(--vscode-panel-border);
+        }
+        .tail-entry pre {
+            max-height: 300px;
+            overflow: auto;
+            padding: 0 10px 6px;
+        }`;
+    }
+
+    static getMarkup(): string {
+        return `
+        <div class="tail-panel" id="tail-panel">
+            <div class="tail-header">
+                <strong>Appended since opened</strong>
+                <span class="tail-status" id="tail-status"></span>
+                <button onclick="clearTail()">Clear</button>
+            </div>
+            <div id="tail-entries"></div>
+        </div>`;
+    }
+
+    static getScript(): string {
+        return `
+        const MAX_TAIL_ENTRIES = 20;
+
+        function clearTail() {
+            document.getElementById('tail-entries').innerHTML = '';
+            document.getElementById('tail-status').textContent = '';
+            document.getElementById('tail-panel').style.display = 'none';
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            if (message.command === 'tailAppend') {
+                document.getElementById('tail-panel').style.display = 'block';
+                document.getElementById('tail-status').textContent = '';
+                const entries = document.getElementById('tail-entries');
+                message.appended.forEach(item => {
+                    const entry = document.createElement('div');
+                    entry.className = 'tail-entry';
+                    const title = document.createElement('div');
+                    title.className = 'tail-title';
+                    title.textContent = message.time + ' · ' + item.label +
+                        (item.shown !== undefined && item.shown < item.count
+                            ? ' (' + item.count.toLocaleString() + ' new, showing the last ' + item.shown.toLocaleString() + ')'
+                            : '');
+                    const pre = document.createElement('pre');
+                    pre.innerHTML = syntaxHighlight(displayJson(decodeTypedBuffers(item.data), 2));
+                    entry.append(title, pre);
+                    entries.prepend(entry);
+                });
+                while (entries.children.length > MAX_TAIL_ENTRIES) {
+                    entries.lastElementChild.remove();
+                }
+            } else if (message.command === 'tailError') {
+                document.getElementById('tail-panel').style.display = 'block';
+                document.getElementById('tail-status').textContent = message.error;
+            }
+        });`;
+    }
+}
@@ -0,0 +1,85 @@
+/**
+ * Webview side of the compact array encoding in python/array_encoding.py.
+ *
+ * Numeric arrays arrive as {"_buffer": base64, "dtype", "shape"}: the bytes are
+ * wrapped in the matching typed array without parsing any element, and only
+ * expanded into nested lists (complex elements as {"real", "imag"}) when the
+ * JSON view is rendered or copied. NaN, ±Infinity and 64-bit integers beyond
+ * 2^53 are written out exactly rather than as null or rounded numbers.
+ */
+export class TypedBuffers {
+    static getScript(): string {
+        return `
+        const TYPED_ARRAYS = {
+            bool: Uint8Array, int8: Int8Array, int16: Int16Array, int32: Int32Array, int64: BigInt64Array,
+            uint8: Uint8Array, uint16: Uint16Array, uint32: Uint32Array, uint64: BigUint64Array,
+            float32: Float32Array, float64: Float64Array, complex64: Float32Array, complex128: Float64Array
+        };
+        // Marks values JSON cannot represent (NaN, Infinity, large 64-bit integers) so that
+        // displayJson can write them out unquoted
+        const RAW_VALUE = '\\uE000';
+
+        class TypedBuffer {
+            constructor(encoded) {
+                const text = atob(encoded._buffer);
+                const bytes = new Uint8Array(text.length);
+                for (let i = 0; i < text.length; i++) {
+                    bytes[i] = text.charCodeAt(i);
+                }
+                this.dtype = encoded.dtype;
+                this.shape = encoded.shape;
+                this.values = new TYPED_ARRAYS[encoded.dtype](bytes.buffer);
+            }
+
+            element(i) {
+                if (this.dtype === 'bool') {
+                    return this.values[i] !== 0;
+                }
+                if (this.dtype.startsWith('complex')) {
+                    return { real: rawNumber(this.values[2 * i]), imag: rawNumber(this.values[2 * i + 1]) };
+                }
+                return rawNumber(this.values[i]);
+            }
+
+            // Called by JSON.stringify: nested lists in the array's shape
+            toJSON() {
+                let next = 0;
+                const nest = (axis) => {
+                    if (axis === this.shape.length) {
+                        return this.element(next++);
+                    }
+                    const items = new Array(this.shape[axis]);
+                    for (let i = 0; i < items.length; i++) {
+                        items[i] = nest(axis + 1);
+                    }
+                    return items;
+                };
+                return nest(0);
+            }
+        }
+
+        function rawNumber(value) {
+            if (typeof value === 'bigint') {
+                return Number.isSafeInteger(Number(value)) ? Number(value) : RAW_VALUE + value;
+            }
+            return Number.isFinite(value) ? value : RAW_VALUE + value;
+        }
+
+        // Replace every encoded array in the converter output with a TypedBuffer
+        function decodeTypedBuffers(value) {
+            if (value && typeof value === 'object') {
+                if (typeof value._buffer === 'string') {
+                    return new TypedBuffer(value);
+                }
+                for (const key in value) {
+                    value[key] = decodeTypedBuffers(value[key]);
+                }
+            }
+            return value;
+        }
+
+        function displayJson(data, indent) {
+            return JSON.stringify(data, null, indent).replace(/"\\uE000([^"]*)"/g, '$1');
+        }`;
+    }
+}